@@ -1,12 +1,115 @@
+import hashlib
+import logging
 import os
-from typing import List, Dict, Any
-from pydantic import BaseSettings, Field
+import re
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from pydantic import BaseSettings, Field, PrivateAttr
 import yaml
 
+logger = logging.getLogger(__name__)
+
+
+class ConfigSnapshot:
+    """Role and repository configuration as loaded at one point in time"""
+    
+    __slots__ = ("role_config", "repository_config", "version", "loaded_at")
+    
+    def __init__(self, role_config: Dict[str, Any], repository_config: Dict[str, Any], version: str):
+        self.role_config = role_config
+        self.repository_config = repository_config
+        self.version = version
+        self.loaded_at = datetime.utcnow()
+
+
+def _read_yaml(path: str) -> Dict[str, Any]:
+    """Parse a YAML file; a missing file is an empty config"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _check_mapping(value: Any, where: str) -> Dict[str, Any]:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} must be a mapping")
+    return value
+
+
+def _check_positive(section: Dict[str, Any], key: str, where: str, integer: bool = False, allow_zero: bool = False):
+    value = section.get(key)
+    if value is None:
+        return
+    valid_type = int if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, valid_type) or value < 0 or (value == 0 and not allow_zero):
+        kind = "integer" if integer else "number"
+        raise ValueError(f"{where}.{key} must be a {'non-negative' if allow_zero else 'positive'} {kind}, got {value!r}")
+
+
+def _check_retry(retry: Dict[str, Any], where: str):
+    _check_positive(retry, "max_attempts", where, integer=True)
+    for key in ("backoff_base", "backoff_multiplier", "backoff_max", "jitter"):
+        _check_positive(retry, key, where, allow_zero=True)
+
+
+def validate_role_config(config: Any) -> Dict[str, Any]:
+    """Validate roles.yml; raises ValueError describing the first problem"""
+    config = _check_mapping(config, "roles.yml")
+    
+    for role, role_config in _check_mapping(config.get("roles"), "roles").items():
+        where = f"roles.{role}"
+        role_config = _check_mapping(role_config, where)
+        _check_positive(role_config, "timeout", where)
+        _check_positive(role_config, "max_concurrent", where, integer=True)
+        _check_positive(role_config, "weight", where)
+        cli_args = role_config.get("cli_args") or []
+        if not isinstance(cli_args, list) or not all(isinstance(arg, str) for arg in cli_args):
+            raise ValueError(f"{where}.cli_args must be a list of strings")
+        retry = dict(_check_mapping(role_config.get("retry"), f"{where}.retry"))
+        task_types = _check_mapping(retry.pop("task_types", None), f"{where}.retry.task_types")
+        _check_retry(retry, f"{where}.retry")
+        for task_type, overrides in task_types.items():
+            _check_retry(_check_mapping(overrides, f"{where}.retry.task_types.{task_type}"), f"{where}.retry.task_types.{task_type}")
+    
+    _check_retry(_check_mapping(config.get("retry_defaults"), "retry_defaults"), "retry_defaults")
+    
+    classification = _check_mapping(config.get("failure_classification"), "failure_classification")
+    for key in ("transient_patterns", "permanent_patterns"):
+        for pattern in classification.get(key) or []:
+            try:
+                re.compile(pattern)
+            except (re.error, TypeError) as e:
+                raise ValueError(f"failure_classification.{key}: invalid pattern {pattern!r}: {e}")
+    returncodes = classification.get("transient_returncodes") or []
+    if not isinstance(returncodes, list) or not all(isinstance(code, int) for code in returncodes):
+        raise ValueError("failure_classification.transient_returncodes must be a list of integers")
+    
+    return config
+
+
+def validate_repository_config(config: Any) -> Dict[str, Any]:
+    """Validate repositories.yml; raises ValueError describing the first problem"""
+    config = _check_mapping(config, "repositories.yml")
+    
+    sections = {"default": _check_mapping(config.get("default"), "default")}
+    for repository, repository_config in _check_mapping(config.get("repositories"), "repositories").items():
+        sections[f"repositories.{repository}"] = _check_mapping(repository_config, f"repositories.{repository}")
+    
+    for where, section in sections.items():
+        _check_positive(section, "max_concurrent", where, integer=True)
+        _check_positive(section, "weight", where)
+    
+    return config
+
 
 class Settings(BaseSettings):
     port: int = Field(default=4045, env="PORT")
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_file: Optional[str] = Field(default=None, env="LOG_FILE")  # Rotated log file; stderr when unset
+    log_max_bytes: int = Field(default=10 * 1024 * 1024, env="LOG_MAX_BYTES")
+    log_backup_count: int = Field(default=5, env="LOG_BACKUP_COUNT")
     debug: bool = Field(default=False, env="DEBUG")
     
     # Claude CLI configuration
@@ -20,39 +123,163 @@ class Settings(BaseSettings):
     job_timeout: int = Field(default=1800, env="JOB_TIMEOUT")  # 30 minutes
     max_concurrent_jobs: int = Field(default=3, env="MAX_CONCURRENT_JOBS")
     
+    # ETA estimation
+    eta_quantile: float = Field(default=0.5, env="ETA_QUANTILE")  # Duration quantile used for estimates
+    eta_min_samples: int = Field(default=3, env="ETA_MIN_SAMPLES")  # History needed before trusting a bucket
+    eta_fallback_duration: int = Field(default=600, env="ETA_FALLBACK_DURATION")  # Seconds, used without history
+    
+    # Completion notifications
+    long_poll_max_wait: float = Field(default=60.0, env="LONG_POLL_MAX_WAIT")  # Seconds
+    callback_timeout: float = Field(default=10.0, env="CALLBACK_TIMEOUT")  # Seconds per attempt
+    callback_max_attempts: int = Field(default=5, env="CALLBACK_MAX_ATTEMPTS")
+    callback_backoff: float = Field(default=1.0, env="CALLBACK_BACKOFF")  # Initial retry delay in seconds
+    callback_max_connections: int = Field(default=20, env="CALLBACK_MAX_CONNECTIONS")
+    
+    # Pipelines
+    upstream_output_max_chars: int = Field(default=20000, env="UPSTREAM_OUTPUT_MAX_CHARS")  # Per upstream job in prompts
+    output_poll_interval: float = Field(default=0.5, env="OUTPUT_POLL_INTERVAL")  # Seconds between reads of CLI output
+    
+    # Admission control for job creation (rates in jobs per second; unset disables a limit)
+    client_rate_limit: Optional[float] = Field(default=None, env="CLIENT_RATE_LIMIT")  # Per X-Client-ID or address
+    client_rate_burst: int = Field(default=20, env="CLIENT_RATE_BURST")
+    repository_rate_limit: Optional[float] = Field(default=None, env="REPOSITORY_RATE_LIMIT")
+    repository_rate_burst: int = Field(default=20, env="REPOSITORY_RATE_BURST")
+    max_queue_depth: Optional[int] = Field(default=None, env="MAX_QUEUE_DEPTH")  # Queued and waiting jobs
+    queue_shed_fractions: Dict[str, float] = Field(
+        default={"low": 0.5, "normal": 0.8, "high": 1.0}, env="QUEUE_SHED_FRACTIONS"
+    )  # Share of MAX_QUEUE_DEPTH at which each priority is refused
+    queue_retry_after: float = Field(default=30.0, env="QUEUE_RETRY_AFTER")  # Seconds, sent with queue-full 429s
+    
+    # Repository context (layout, symbols, recent changes, excerpts) added to prompts, cached per commit
+    repo_context_enabled: bool = Field(default=False, env="REPO_CONTEXT_ENABLED")
+    repo_context_max_chars: int = Field(default=12000, env="REPO_CONTEXT_MAX_CHARS")  # Per prompt
+    repo_context_cache_size: int = Field(default=32, env="REPO_CONTEXT_CACHE_SIZE")  # Commits kept in memory
+    repo_context_disk_commits: int = Field(default=20, env="REPO_CONTEXT_DISK_COMMITS")  # Commits kept on disk per repository
+    
+    # Tracing: spans from request intake to result persistence ("none", "stdout" or "file" as JSON lines)
+    tracing_exporter: str = Field(default="none", env="TRACING_EXPORTER")
+    tracing_file: str = Field(default="logs/traces.jsonl", env="TRACING_FILE")
+    
+    # Admin endpoints (/debug/profile, /debug/loop) require this token in X-Admin-Token; unset disables them
+    admin_token: Optional[str] = Field(default=None, env="ADMIN_TOKEN")
+    profile_max_seconds: float = Field(default=60.0, env="PROFILE_MAX_SECONDS")
+    loop_lag_threshold: float = Field(default=0.5, env="LOOP_LAG_THRESHOLD")  # Seconds; 0 disables the watchdog
+    
+    # Job list and result responses: gzip or br for bodies of at least this many bytes (0 disables)
+    response_compression_min_bytes: int = Field(default=1024, env="RESPONSE_COMPRESSION_MIN_BYTES")
+    
     # Paths
     prompts_dir: str = Field(default="prompts", env="PROMPTS_DIR")
     config_file: str = Field(default="config/roles.yml", env="CONFIG_FILE")
+    repositories_config_file: str = Field(default="config/repositories.yml", env="REPOSITORIES_CONFIG_FILE")
     
     # Storage
     jobs_storage_path: str = Field(default="jobs", env="JOBS_STORAGE_PATH")
+    io_threads: int = Field(default=4, env="IO_THREADS")  # Threads for job storage and CLI output file I/O
+    
+    # Retention: finished jobs are moved from the jobs directory into compressed archive segments
+    retention_enabled: bool = Field(default=True, env="RETENTION_ENABLED")
+    retention_interval: float = Field(default=3600.0, env="RETENTION_INTERVAL")  # Seconds between passes
+    retention_max_age_days: Optional[float] = Field(default=14.0, env="RETENTION_MAX_AGE_DAYS")
+    retention_status_max_age_days: Dict[str, float] = Field(default={}, env="RETENTION_STATUS_MAX_AGE_DAYS")  # JSON, e.g. {"failed": 30}
+    retention_max_jobs: Optional[int] = Field(default=None, env="RETENTION_MAX_JOBS")  # Finished jobs kept unarchived
+    archive_segment_max_bytes: int = Field(default=64 * 1024 * 1024, env="ARCHIVE_SEGMENT_MAX_BYTES")
+    search_index_path: Optional[str] = Field(default=None, env="SEARCH_INDEX_PATH")  # Default: <jobs>/search.db
     
-    # Dynamic role config (loaded at runtime)
-    role_config: Dict[str, Any] = {}
+    # Coordination between instances ("local" or "sqlite" to share one queue on a host)
+    coordination_backend: str = Field(default="local", env="COORDINATION_BACKEND")
+    coordination_db_path: Optional[str] = Field(default=None, env="COORDINATION_DB_PATH")  # Default: <jobs>/coordination.db
+    coordination_poll_interval: float = Field(default=1.0, env="COORDINATION_POLL_INTERVAL")  # Seconds
+    global_max_concurrent_jobs: Optional[int] = Field(default=None, env="GLOBAL_MAX_CONCURRENT_JOBS")  # Across instances
+    lease_duration: float = Field(default=60.0, env="LEASE_DURATION")  # Seconds a claim survives without a heartbeat
+    lease_heartbeat_interval: float = Field(default=15.0, env="LEASE_HEARTBEAT_INTERVAL")  # Seconds
+    
+    # Shutdown and restart recovery
+    instance_id: str = Field(default="1", env="INSTANCE_ID")  # Jobs are recovered by the instance that last ran them
+    drain_timeout: float = Field(default=20.0, env="DRAIN_TIMEOUT")  # Seconds to let running jobs finish on shutdown
+    attach_poll_interval: float = Field(default=1.0, env="ATTACH_POLL_INTERVAL")  # Seconds, for re-attached CLI processes
+    
+    # Startup
+    hydration_batch_size: int = Field(default=200, env="HYDRATION_BATCH_SIZE")  # Stored jobs loaded per batch
+    
+    # Hot reload of roles.yml, repositories.yml and prompts
+    config_watch: bool = Field(default=True, env="CONFIG_WATCH")
+    config_poll_interval: float = Field(default=2.0, env="CONFIG_POLL_INTERVAL")  # Seconds, without inotify
+    
+    # Dynamic role config (loaded on first use, swapped on reload)
+    _config: Optional[ConfigSnapshot] = PrivateAttr(default=None)
     
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
     
-    def __init__(self, **values):
-        super().__init__(**values)
-        self._load_role_config()
-        self._ensure_directories()
+    def load_config(self):
+        """Load role and repository configuration from YAML files"""
+        role_config = self._load_yaml_file(self.config_file, "role", validate_role_config)
+        repository_config = self._load_yaml_file(self.repositories_config_file, "repository", validate_repository_config)
+        self.apply_config(ConfigSnapshot(role_config, repository_config, self._compute_config_version()))
+    
+    def _ensure_config_loaded(self):
+        """Load configuration on first use so importing settings stays cheap"""
+        if self._config is None:
+            self.load_config()
+    
+    def _load_yaml_file(self, path: str, name: str, validate) -> Dict[str, Any]:
+        """Load one YAML config file at startup, falling back to an empty config"""
+        try:
+            return validate(_read_yaml(path))
+        except Exception as e:
+            print(f"Warning: Could not load {name} config: {e}")
+            return {}
+    
+    def read_config(self) -> ConfigSnapshot:
+        """Read and validate configuration files without applying them; raises ValueError"""
+        role_config = validate_role_config(_read_yaml(self.config_file))
+        repository_config = validate_repository_config(_read_yaml(self.repositories_config_file))
+        return ConfigSnapshot(role_config, repository_config, self._compute_config_version())
     
-    def _load_role_config(self):
-        """Load role configuration from YAML file"""
-        config_path = self.config_file
-        if os.path.exists(config_path):
+    def apply_config(self, snapshot: ConfigSnapshot):
+        """Swap in a validated configuration snapshot; running jobs keep the one they started with"""
+        previous = self._config
+        self._config = snapshot
+        if previous is not None and previous.version != snapshot.version:
+            logger.info(f"Applied configuration version {snapshot.version} (was {previous.version})")
+    
+    def _compute_config_version(self) -> str:
+        """Content hash of the config files and role prompts"""
+        digest = hashlib.sha256()
+        paths = [self.config_file, self.repositories_config_file]
+        if os.path.isdir(self.prompts_dir):
+            paths.extend(os.path.join(self.prompts_dir, name) for name in sorted(os.listdir(self.prompts_dir)))
+        for path in paths:
+            digest.update(path.encode("utf-8"))
             try:
-                with open(config_path, 'r') as f:
-                    self.role_config = yaml.safe_load(f) or {}
-            except Exception as e:
-                print(f"Warning: Could not load role config: {e}")
-                self.role_config = {}
-        else:
-            self.role_config = {}
-    
-    def _ensure_directories(self):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b"\0")
+        return digest.hexdigest()[:12]
+    
+    @property
+    def config_snapshot(self) -> ConfigSnapshot:
+        """The active configuration snapshot"""
+        self._ensure_config_loaded()
+        return self._config
+    
+    @property
+    def config_version(self) -> str:
+        """Version of the active configuration"""
+        return self.config_snapshot.version
+    
+    @property
+    def role_config(self) -> Dict[str, Any]:
+        return self.config_snapshot.role_config
+    
+    @property
+    def repository_config(self) -> Dict[str, Any]:
+        return self.config_snapshot.repository_config
+    
+    def ensure_directories(self):
         """Ensure required directories exist"""
         os.makedirs(self.prompts_dir, exist_ok=True)
         os.makedirs(self.jobs_storage_path, exist_ok=True)
@@ -72,6 +299,41 @@ class Settings(BaseSettings):
         """Get timeout for a specific role"""
         role_config = self.get_role_config(role)
         return role_config.get("timeout", self.job_timeout)
+    
+    def get_role_concurrency(self, role: str) -> Optional[int]:
+        """Get the maximum number of concurrently running jobs for a role"""
+        return self.get_role_config(role).get("max_concurrent")
+    
+    def get_role_weight(self, role: str) -> float:
+        """Get the fair-share scheduling weight for a role"""
+        return float(self.get_role_config(role).get("weight", 1.0))
+    
+    def get_retry_config(self, role: str, task_type: str) -> Dict[str, Any]:
+        """Get the retry policy for a role and task type, layered over the defaults"""
+        retry_config = dict(self.role_config.get("retry_defaults", {}) or {})
+        role_retry = dict(self.get_role_config(role).get("retry", {}) or {})
+        task_overrides = role_retry.pop("task_types", {}) or {}
+        retry_config.update(role_retry)
+        retry_config.update(task_overrides.get(task_type, {}) or {})
+        return retry_config
+    
+    def get_failure_classification(self) -> Dict[str, Any]:
+        """Get the patterns used to classify job failures as transient or permanent"""
+        return self.role_config.get("failure_classification", {}) or {}
+    
+    def get_repository_config(self, repository: str) -> Dict[str, Any]:
+        """Get configuration for a repository, falling back to the defaults"""
+        repository_config = dict(self.repository_config.get("default", {}) or {})
+        repository_config.update(self.repository_config.get("repositories", {}).get(repository, {}) or {})
+        return repository_config
+    
+    def get_repository_concurrency(self, repository: str) -> Optional[int]:
+        """Get the maximum number of concurrently running jobs for a repository"""
+        return self.get_repository_config(repository).get("max_concurrent")
+    
+    def get_repository_weight(self, repository: str) -> float:
+        """Get the fair-share scheduling weight for a repository"""
+        return float(self.get_repository_config(repository).get("weight", 1.0))
 
 
 settings = Settings()
\ No newline at end of file
@@ -1,15 +1,34 @@
 import logging
+import os
+from logging.handlers import RotatingFileHandler
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app.config import settings
-from app.routers import jobs, health
+from app.routers import debug, jobs, health
+from app.services.admission import AdmissionController
+from app.services.config_watcher import ConfigWatcher
+from app.services.file_io import file_io
+from app.services.job_manager import JobManager
+from app.services.profiler import LoopWatchdog, SamplingProfiler
+from app.services.retention import RetentionManager
+from app.services.tracing import TracingMiddleware, tracer
+from app.startup import StartupTimer
+
+log_handlers = None
+if settings.log_file:
+    # Size-capped rotation; uvicorn's loggers propagate here when run through __main__
+    os.makedirs(os.path.dirname(os.path.abspath(settings.log_file)), exist_ok=True)
+    log_handlers = [RotatingFileHandler(
+        settings.log_file, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count
+    )]
 
 logging.basicConfig(
     level=getattr(logging, settings.log_level.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=log_handlers
 )
 
 logger = logging.getLogger(__name__)
@@ -18,10 +37,64 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Agent Service")
+    timer = StartupTimer()
+    
+    # Started first so slow startup work is caught as well
+    loop_watchdog = None
+    if settings.loop_lag_threshold:
+        loop_watchdog = LoopWatchdog(settings.loop_lag_threshold)
+        await loop_watchdog.start()
+    app.state.loop_watchdog = loop_watchdog
+    app.state.profiler = SamplingProfiler()
+    
+    with timer.phase("config"):
+        settings.load_config()
+    with timer.phase("directories"):
+        settings.ensure_directories()
+    with timer.phase("job_manager"):
+        job_manager = JobManager()
+        app.state.job_manager = job_manager
+        app.state.admission = AdmissionController()
+    with timer.phase("hydration_start"):
+        # Stored jobs are loaded in the background; new jobs are served immediately
+        await job_manager.start()
+    
+    config_watcher = None
+    if settings.config_watch:
+        with timer.phase("config_watcher"):
+            config_watcher = ConfigWatcher(
+                [settings.config_file, settings.repositories_config_file, settings.prompts_dir],
+                load=settings.read_config,
+                apply=settings.apply_config,
+                poll_interval=settings.config_poll_interval
+            )
+            await config_watcher.start()
+    app.state.config_watcher = config_watcher
+    
+    retention = None
+    if settings.retention_enabled:
+        retention = RetentionManager(job_manager)
+        await retention.start()
+    app.state.retention = retention
+    
+    logger.info(timer.report())
     logger.info(f"Service running on port {settings.port}")
     logger.info(f"Available roles: {', '.join(settings.available_roles)}")
+    logger.info(f"Configuration version {settings.config_version}")
     yield
     logger.info("Shutting down Agent Service")
+    if config_watcher is not None:
+        await config_watcher.stop()
+    if retention is not None:
+        await retention.stop()
+    # Give running jobs a chance to finish; the rest are re-attached by the next instance
+    await job_manager.drain(settings.drain_timeout)
+    tracer.close()
+    if loop_watchdog is not None:
+        await loop_watchdog.stop()
+    await job_manager.close()
+    # Checkpoints written in the background land before the process exits
+    await file_io.close()
 
 
 app = FastAPI(
@@ -38,9 +111,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so request spans include the time spent in other middleware
+app.add_middleware(TracingMiddleware, tracer=tracer)
 
 app.include_router(health.router, tags=["health"])
 app.include_router(jobs.router, prefix="/agent", tags=["agent"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 
 @app.get("/")
@@ -58,5 +134,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        log_config=None if settings.log_file else uvicorn.config.LOGGING_CONFIG
     )
\ No newline at end of file
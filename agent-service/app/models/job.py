@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, HttpUrl
 from typing import Dict, List, Optional, Any
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timezone
+import sys
 import uuid
 
 
@@ -58,15 +59,54 @@ class JobRequest(BaseModel):
     task: JobTask = Field(..., description="Task details")
     environment: Optional[JobEnvironment] = Field(default=JobEnvironment(), description="Environment configuration")
     metadata: Dict[str, Any] = Field(default={}, description="Additional metadata")
+    callback_url: Optional[HttpUrl] = Field(None, description="URL notified with a POST when the job finishes")
+    depends_on: List[str] = Field(default=[], description="IDs of jobs that must complete before this one starts")
 
 
 class JobResponse(BaseModel):
     job_id: str = Field(..., description="Unique job identifier")
     status: JobStatus = Field(..., description="Current job status")
     message: str = Field(..., description="Status message")
+    estimated_start: Optional[datetime] = Field(None, description="Estimated start time")
     estimated_completion: Optional[datetime] = Field(None, description="Estimated completion time")
 
 
+class CodeBlock(BaseModel):
+    language: Optional[str] = Field(None, description="Language tag of the fence")
+    content: str = Field(..., description="Code inside the fence")
+    start_line: int = Field(..., description="Output line of the opening fence")
+
+
+class DiffSection(BaseModel):
+    old_path: Optional[str] = Field(None, description="File before the change (None if created)")
+    new_path: Optional[str] = Field(None, description="File after the change (None if deleted)")
+    hunks: int = Field(default=0, description="Number of hunks")
+    additions: int = Field(default=0, description="Added lines")
+    deletions: int = Field(default=0, description="Removed lines")
+    content: str = Field(..., description="Unified diff text")
+
+
+class FileReference(BaseModel):
+    path: str = Field(..., description="Referenced file path")
+    line: Optional[int] = Field(None, description="Referenced line, if given as path:line")
+
+
+class Finding(BaseModel):
+    severity: str = Field(..., description="critical, high, medium, low, warning or info")
+    message: str = Field(..., description="Finding text")
+    path: Optional[str] = Field(None, description="First file referenced by the finding")
+    line: Optional[int] = Field(None, description="Line in that file, if given")
+    output_line: int = Field(..., description="Output line the finding was reported on")
+
+
+class OutputSections(BaseModel):
+    code_blocks: List[CodeBlock] = Field(default=[], description="Fenced code blocks")
+    diffs: List[DiffSection] = Field(default=[], description="Unified diffs")
+    file_references: List[FileReference] = Field(default=[], description="Distinct file references")
+    findings: List[Finding] = Field(default=[], description="Severity-tagged findings")
+    truncated: bool = Field(default=False, description="Whether a section hit its item limit")
+
+
 class JobResult(BaseModel):
     job_id: str = Field(..., description="Job identifier")
     status: JobStatus = Field(..., description="Final job status")
@@ -82,6 +122,7 @@ class JobResult(BaseModel):
     output: Optional[str] = Field(None, description="Job output/result")
     error: Optional[str] = Field(None, description="Error message if failed")
     logs: List[str] = Field(default=[], description="Execution logs")
+    sections: Optional[OutputSections] = Field(None, description="Structured sections extracted from the output")
     
     # Files and changes
     files_created: List[str] = Field(default=[], description="Files created during execution")
@@ -91,6 +132,33 @@ class JobResult(BaseModel):
     metadata: Dict[str, Any] = Field(default={}, description="Additional result metadata")
 
 
+class JobSearchHit(BaseModel):
+    job_id: str
+    role: str
+    repository: Optional[str] = None
+    task_type: Optional[str] = None
+    status: JobStatus
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    score: float = Field(..., description="Relevance, higher is better")
+    snippet: str = Field(..., description="Matching text with terms in [brackets]")
+
+
+class PipelineStep(BaseModel):
+    name: str = Field(..., description="Step name, unique within the pipeline")
+    job: JobRequest = Field(..., description="Job to run for this step")
+    depends_on: List[str] = Field(default=[], description="Names of steps whose output this step needs")
+
+
+class PipelineRequest(BaseModel):
+    steps: List[PipelineStep] = Field(..., description="Pipeline steps; independent steps run concurrently")
+
+
+class PipelineResponse(BaseModel):
+    pipeline_id: str = Field(..., description="Unique pipeline identifier")
+    jobs: Dict[str, JobResponse] = Field(..., description="Created job for each step, by step name")
+
+
 class JobInfo(BaseModel):
     job_id: str
     status: JobStatus
@@ -100,6 +168,140 @@ class JobInfo(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     progress: Optional[str] = None
+    attempts: int = 0
+    instance_id: Optional[str] = None
+    estimated_start: Optional[datetime] = None
+    estimated_completion: Optional[datetime] = None
+
+
+class _EpochTime:
+    """Naive UTC datetime view of a slot holding epoch seconds"""
+    
+    def __init__(self, slot: str):
+        self.slot = slot
+    
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        return _from_epoch(getattr(record, self.slot))
+    
+    def __set__(self, record, value: Optional[datetime]):
+        setattr(record, self.slot, _to_epoch(value))
+
+
+class JobRecord:
+    """Compact in-memory form of JobInfo, kept for every job the manager knows.
+    
+    Slots instead of a pydantic model, interned role and instance strings,
+    and epoch-second timestamps keep 100k+ jobs cheap to hold and to scan.
+    The ``*_at`` properties read and write naive UTC datetimes like JobInfo;
+    records become JobInfo (or plain dicts) only at the API boundary.
+    """
+    
+    __slots__ = (
+        "job_id", "status", "role", "task_description", "created", "started", "completed",
+        "progress", "attempts", "instance_id", "estimated_start_ts", "estimated_completion_ts"
+    )
+    
+    def __init__(
+        self,
+        job_id: str,
+        status: JobStatus,
+        role: str,
+        task_description: str,
+        created_at: datetime,
+        started_at: Optional[datetime] = None,
+        completed_at: Optional[datetime] = None,
+        progress: Optional[str] = None,
+        attempts: int = 0,
+        instance_id: Optional[str] = None
+    ):
+        self.job_id = job_id
+        self.status = JobStatus(status)
+        self.role = sys.intern(role)
+        self.task_description = task_description
+        self.created = _to_epoch(created_at)
+        self.started = _to_epoch(started_at)
+        self.completed = _to_epoch(completed_at)
+        self.progress = progress
+        self.attempts = attempts
+        self.instance_id = sys.intern(instance_id) if instance_id is not None else None
+        self.estimated_start_ts: Optional[float] = None
+        self.estimated_completion_ts: Optional[float] = None
+    
+    created_at = _EpochTime("created")
+    started_at = _EpochTime("started")
+    completed_at = _EpochTime("completed")
+    estimated_start = _EpochTime("estimated_start_ts")
+    estimated_completion = _EpochTime("estimated_completion_ts")
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobRecord":
+        """Record from a stored info file, a coordinator row or JobInfo.dict()"""
+        record = cls(
+            data["job_id"], data["status"], data["role"], data["task_description"],
+            _parse_time(data["created_at"]), _parse_time(data.get("started_at")), _parse_time(data.get("completed_at")),
+            data.get("progress"), data.get("attempts", 0), data.get("instance_id")
+        )
+        record.estimated_start = _parse_time(data.get("estimated_start"))
+        record.estimated_completion = _parse_time(data.get("estimated_completion"))
+        return record
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict in the JobInfo layout, with ISO timestamps"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "role": self.role,
+            "task_description": self.task_description,
+            "created_at": _iso(self.created),
+            "started_at": _iso(self.started),
+            "completed_at": _iso(self.completed),
+            "progress": self.progress,
+            "attempts": self.attempts,
+            "instance_id": self.instance_id,
+            "estimated_start": _iso(self.estimated_start_ts),
+            "estimated_completion": _iso(self.estimated_completion_ts)
+        }
+    
+    def to_info(self) -> JobInfo:
+        """API model of the record"""
+        return JobInfo(
+            job_id=self.job_id, status=self.status, role=self.role, task_description=self.task_description,
+            created_at=self.created_at, started_at=self.started_at, completed_at=self.completed_at,
+            progress=self.progress, attempts=self.attempts, instance_id=self.instance_id,
+            estimated_start=self.estimated_start, estimated_completion=self.estimated_completion
+        )
+    
+    def update_from(self, other: "JobRecord"):
+        """Take every field of another record of the same job"""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _from_epoch(value: Optional[float]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _iso(value: Optional[float]) -> Optional[str]:
+    return _from_epoch(value).isoformat() if value is not None else None
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(value)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
 
 
 def generate_job_id() -> str:
@@ -0,0 +1,55 @@
+import asyncio
+import hmac
+import logging
+import threading
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.services.profiler import ProfileInProgress, render_collapsed, task_stacks
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Allow only requests carrying ADMIN_TOKEN; the endpoints do not exist without one"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0, description="How long to sample"),
+    interval: float = Query(0.005, ge=0.001, le=1.0, description="Seconds between samples"),
+    format: str = Query("collapsed", regex="^(collapsed|json)$", description="'collapsed' stacks or 'json'")
+):
+    """Sample the stacks of all threads, including the event loop's, for a flame graph"""
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"Profiles are limited to {settings.profile_max_seconds} seconds")
+    
+    loop = asyncio.get_running_loop()
+    try:
+        # The sampler runs in a worker thread so the loop keeps serving while it is profiled
+        result = await loop.run_in_executor(
+            None, request.app.state.profiler.sample, seconds, interval, threading.get_ident()
+        )
+    except ProfileInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    logger.info(f"Profiled for {result['duration']}s: {result['samples']} samples, {len(result['stacks'])} distinct stacks")
+    if format == "collapsed":
+        return PlainTextResponse(render_collapsed(result["stacks"]))
+    return {**result, "stacks": dict(result["stacks"].most_common()), "tasks": task_stacks()}
+
+
+@router.get("/loop", dependencies=[Depends(require_admin)])
+async def loop_status(request: Request):
+    """Event loop lag and the last stall the watchdog caught"""
+    watchdog = request.app.state.loop_watchdog
+    return watchdog.get_stats() if watchdog is not None else {"enabled": False}
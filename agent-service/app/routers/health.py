@@ -1,5 +1,5 @@
 import logging
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from datetime import datetime
 
@@ -11,12 +11,13 @@ router = APIRouter()
 
 
 @router.get("/health")
-async def health_check():
-    """Health check endpoint"""
+async def health_check(request: Request):
+    """Health check endpoint; reports 503 while draining so load balancers stop routing here"""
+    draining = request.app.state.job_manager.draining
     return JSONResponse(
-        status_code=200,
+        status_code=503 if draining else 200,
         content={
-            "status": "healthy",
+            "status": "draining" if draining else "healthy",
             "timestamp": datetime.utcnow().isoformat(),
             "service": "Agent Service",
             "version": "1.0.0",
@@ -49,7 +50,8 @@ async def status():
             "default_role": settings.default_role,
             "max_concurrent_jobs": settings.max_concurrent_jobs,
             "job_timeout": settings.job_timeout,
-            "claude_cli_path": settings.claude_cli_path
+            "claude_cli_path": settings.claude_cli_path,
+            "config_version": settings.config_version
         },
         "timestamp": datetime.utcnow().isoformat()
     }
\ No newline at end of file
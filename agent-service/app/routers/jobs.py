@@ -1,45 +1,101 @@
 import logging
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+import re
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from datetime import datetime
 
 from app.config import settings
 from app.models.job import (
-    JobRequest, JobResponse, JobResult, JobInfo, JobStatus,
-    generate_job_id
+    JobRequest, JobResponse, JobResult, JobInfo, JobSearchHit, JobStatus, OutputSections,
+    PipelineRequest, PipelineResponse, generate_job_id
 )
-from app.services.job_manager import JobManager
-from app.services.claude_service import ClaudeService
+from app.routers.responses import json_response, parse_fields, select_fields
+from app.services.admission import AdmissionRejected, AdmissionTooLarge, highest_priority, retry_after_header
+from app.services.job_manager import JobManager, order_pipeline_steps
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize services
-job_manager = JobManager()
-claude_service = ClaudeService()
+
+def get_job_manager(request: Request) -> JobManager:
+    """Job manager created by the application lifespan"""
+    return request.app.state.job_manager
+
+
+def reject_if_draining(job_manager: JobManager):
+    """Refuse new work while the instance is shutting down so clients retry elsewhere"""
+    if job_manager.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="Agent service is draining for shutdown; submit the job to another instance",
+            headers={"Retry-After": "5"}
+        )
+
+
+async def check_upstream_jobs(job_manager: JobManager, requests: List[JobRequest]):
+    """Refuse jobs that depend on unknown jobs with 400, before admission spends any tokens"""
+    try:
+        await job_manager.check_upstream_jobs(requests)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def admit_jobs(http_request: Request, job_manager: JobManager, requests: List[JobRequest]):
+    """Apply rate limits and priority-aware queue limits; refuse with 429 and Retry-After.
+    
+    Call once the request has been validated, so refused requests spend no tokens.
+    """
+    client = http_request.headers.get("X-Client-ID") or (http_request.client.host if http_request.client else "unknown")
+    try:
+        http_request.app.state.admission.admit(
+            client,
+            [request.context.repository for request in requests],
+            highest_priority(request.task.priority for request in requests),
+            pending=job_manager.coordinator.queued_count + len(job_manager.waiting),
+            jobs=len(requests)
+        )
+    except AdmissionTooLarge as e:
+        logger.warning(f"Refused {len(requests)} job(s) from {client}: {e.reason}")
+        raise HTTPException(status_code=413, detail=e.reason)
+    except AdmissionRejected as e:
+        logger.warning(f"Refused {len(requests)} job(s) from {client}: {e.reason}")
+        raise HTTPException(status_code=429, detail=e.reason, headers=dict([retry_after_header(e.retry_after)]))
 
 
 @router.post("/jobs", response_model=JobResponse)
-async def create_job(request: JobRequest):
+async def create_job(
+    request: JobRequest,
+    http_request: Request,
+    job_manager: JobManager = Depends(get_job_manager)
+):
     """Create a new agent job"""
+    reject_if_draining(job_manager)
+    
+    # Validate role
+    if request.role not in settings.available_roles:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid role '{request.role}'. Available roles: {', '.join(settings.available_roles)}"
+        )
+    
+    await check_upstream_jobs(job_manager, [request])
+    admit_jobs(http_request, job_manager, [request])
     try:
-        # Validate role
-        if request.role not in settings.available_roles:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid role '{request.role}'. Available roles: {', '.join(settings.available_roles)}"
-            )
-        
         # Generate job ID
         job_id = generate_job_id()
         
         # Create job in manager
         job_response = await job_manager.create_job(job_id, request)
         
-        # Start job execution asynchronously
-        await job_manager.start_job(job_id)
+        # Start job execution asynchronously, handing over the request instead of reading it back
+        await job_manager.start_job(job_id, request)
+        
+        # Estimate when the job will start and finish so clients can poll accordingly
+        job_response.estimated_start, job_response.estimated_completion = (
+            await job_manager.estimate_job_times(job_id)
+        )
         
         logger.info(f"Created job {job_id} with role {request.role}")
         
@@ -53,25 +109,142 @@ async def create_job(request: JobRequest):
         raise HTTPException(status_code=500, detail="Failed to create job")
 
 
+@router.post("/pipelines", response_model=PipelineResponse)
+async def create_pipeline(
+    request: PipelineRequest,
+    http_request: Request,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Create a pipeline of dependent jobs"""
+    reject_if_draining(job_manager)
+    
+    # Validate roles
+    for step in request.steps:
+        if step.job.role not in settings.available_roles:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid role '{step.job.role}' in step '{step.name}'. "
+                       f"Available roles: {', '.join(settings.available_roles)}"
+            )
+    
+    # Validate step references and upstream jobs
+    try:
+        order_pipeline_steps(request.steps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await check_upstream_jobs(job_manager, [step.job for step in request.steps])
+    
+    admit_jobs(http_request, job_manager, [step.job for step in request.steps])
+    try:
+        pipeline_id = generate_job_id()
+        jobs = await job_manager.create_pipeline(pipeline_id, request)
+        
+        for job_response in jobs.values():
+            job_response.estimated_start, job_response.estimated_completion = (
+                await job_manager.estimate_job_times(job_response.job_id)
+            )
+        
+        logger.info(f"Created pipeline {pipeline_id} with {len(jobs)} jobs")
+        
+        return PipelineResponse(pipeline_id=pipeline_id, jobs=jobs)
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Validation error creating pipeline: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating pipeline: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to create pipeline")
+
+
+@router.get("/pipelines/{pipeline_id}", response_model=Dict[str, JobInfo])
+async def get_pipeline(pipeline_id: str, job_manager: JobManager = Depends(get_job_manager)):
+    """Get the jobs of a pipeline by step name"""
+    jobs = await job_manager.get_pipeline(pipeline_id)
+    if jobs is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return {step: job.to_info() for step, job in jobs.items()}
+
+
 @router.get("/jobs", response_model=List[JobInfo])
-async def list_jobs():
+async def list_jobs(
+    http_request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. 'job_id,status'"),
+    job_manager: JobManager = Depends(get_job_manager)
+):
     """List all jobs"""
+    try:
+        selected = parse_fields(fields, JobInfo.__fields__)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         jobs = await job_manager.list_jobs()
-        return jobs
+        # Records are already in the JobInfo layout; skip validating a model per job
+        return json_response(http_request, [select_fields(job.to_dict(), selected) for job in jobs])
     except Exception as e:
         logger.error(f"Error listing jobs: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list jobs")
 
 
+@router.get("/jobs/search", response_model=List[JobSearchHit])
+async def search_jobs(
+    q: str = Query(..., description="Words to find in descriptions, requirements, outputs and logs; 'term*' matches a prefix"),
+    role: Optional[str] = Query(None, description="Only jobs for this role"),
+    repository: Optional[str] = Query(None, description="Only jobs for this repository (org/repo)"),
+    status: Optional[JobStatus] = Query(None, description="Only jobs with this status"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Full-text search over jobs, including archived ones"""
+    try:
+        hits = await job_manager.search_jobs(q, role, repository, status, limit, offset)
+        if hits is None:
+            raise HTTPException(status_code=503, detail="Job search is unavailable (SQLite without FTS5)")
+        return hits
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching jobs: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to search jobs")
+
+
+def parse_wait_duration(value: str) -> float:
+    """Parse a long-poll duration such as '30s', '500ms', '2m' or '15' into seconds"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(ms|s|m)?\s*", value)
+    if not match:
+        raise ValueError(f"Invalid wait duration '{value}'. Use e.g. '30s', '500ms' or '2m'")
+    
+    amount, unit = float(match.group(1)), match.group(2) or "s"
+    seconds = {"ms": amount / 1000, "s": amount, "m": amount * 60}[unit]
+    return min(seconds, settings.long_poll_max_wait)
+
+
 @router.get("/jobs/{job_id}", response_model=JobInfo)
-async def get_job(job_id: str):
+async def get_job(
+    job_id: str,
+    wait: Optional[str] = Query(
+        None,
+        description="Long-poll: hold the request until the job finishes or this duration passes (e.g. '30s')"
+    ),
+    job_manager: JobManager = Depends(get_job_manager)
+):
     """Get job information by ID"""
     try:
-        job = await job_manager.get_job(job_id)
+        if wait:
+            try:
+                timeout = parse_wait_duration(wait)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            job = await job_manager.wait_for_job(job_id, timeout)
+        else:
+            job = await job_manager.get_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
-        return job
+        return job.to_info()
     except HTTPException:
         raise
     except Exception as e:
@@ -80,13 +253,22 @@ async def get_job(job_id: str):
 
 
 @router.get("/jobs/{job_id}/result", response_model=JobResult)
-async def get_job_result(job_id: str):
+async def get_job_result(
+    job_id: str,
+    http_request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. 'status,output'"),
+    job_manager: JobManager = Depends(get_job_manager)
+):
     """Get job result by ID"""
+    try:
+        selected = parse_fields(fields, JobResult.__fields__)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         result = await job_manager.get_job_result(job_id)
         if not result:
             raise HTTPException(status_code=404, detail="Job result not found")
-        return result
+        return json_response(http_request, result.dict(include=set(selected) if selected else None))
     except HTTPException:
         raise
     except Exception as e:
@@ -94,8 +276,23 @@ async def get_job_result(job_id: str):
         raise HTTPException(status_code=500, detail="Failed to get job result")
 
 
+@router.get("/jobs/{job_id}/sections", response_model=OutputSections)
+async def get_job_sections(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
+    """Get the code blocks, diffs, file references and findings extracted from a job's output"""
+    try:
+        sections = await job_manager.get_job_sections(job_id)
+        if sections is None:
+            raise HTTPException(status_code=404, detail="Job result not found")
+        return sections
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job sections {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to get job sections")
+
+
 @router.delete("/jobs/{job_id}")
-async def cancel_job(job_id: str):
+async def cancel_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
     """Cancel a running job"""
     try:
         success = await job_manager.cancel_job(job_id)
@@ -113,7 +310,7 @@ async def cancel_job(job_id: str):
 
 
 @router.get("/jobs/{job_id}/logs")
-async def get_job_logs(job_id: str):
+async def get_job_logs(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
     """Get job execution logs"""
     try:
         logs = await job_manager.get_job_logs(job_id)
@@ -149,11 +346,44 @@ async def list_roles():
     }
 
 
+@router.get("/config")
+async def get_config(request: Request):
+    """Get the active configuration version and hot reload state"""
+    snapshot = settings.config_snapshot
+    watcher = request.app.state.config_watcher
+    return {
+        "version": snapshot.version,
+        "loaded_at": snapshot.loaded_at.isoformat(),
+        "role_config": snapshot.role_config,
+        "repository_config": snapshot.repository_config,
+        "watcher": watcher.get_stats() if watcher is not None else None
+    }
+
+
+@router.post("/drain")
+async def drain(job_manager: JobManager = Depends(get_job_manager)):
+    """Stop accepting and starting jobs ahead of a shutdown.
+    
+    Running jobs carry on; whatever is still running when the service stops
+    is re-attached by the next instance, and queued jobs are picked up by it.
+    """
+    job_manager.start_draining()
+    return {
+        "draining": True,
+        "running_jobs": len(job_manager.running_tasks),
+        "queued_jobs": job_manager.coordinator.queued_count,
+        "drain_timeout": settings.drain_timeout
+    }
+
+
 @router.get("/stats")
-async def get_stats():
+async def get_stats(request: Request, job_manager: JobManager = Depends(get_job_manager)):
     """Get service statistics"""
     try:
         stats = await job_manager.get_stats()
+        retention = request.app.state.retention
+        stats["retention"] = retention.get_stats() if retention is not None else None
+        stats["admission"] = request.app.state.admission.get_stats()
         return stats
     except Exception as e:
         logger.error(f"Error getting stats: {e}", exc_info=True)
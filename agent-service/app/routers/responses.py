@@ -0,0 +1,91 @@
+import gzip
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # Fall back to the json module
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is offered without it
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain data (dicts, lists, datetimes, enums) to compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Fields named in a ``?fields=job_id,status`` parameter; None selects every field"""
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed)}")
+    return fields
+
+
+def select_fields(item: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    return item if fields is None else {field: item[field] for field in fields}
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported content coding in an Accept-Encoding header, if any"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def json_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """JSON response serialized without model validation, compressed when the client accepts it"""
+    body = dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    min_bytes = settings.response_compression_min_bytes
+    if min_bytes and len(body) >= min_bytes:
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if coding == "br":
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+        elif coding == "gzip":
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
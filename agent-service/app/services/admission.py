@@ -0,0 +1,166 @@
+import logging
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.config import settings
+from app.models.job import JobPriority
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = (JobPriority.LOW, JobPriority.NORMAL, JobPriority.HIGH)
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def wait_time(self, now: float, count: int = 1) -> float:
+        """Seconds until ``count`` tokens are available; 0 if they are now"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= count:
+            return 0.0
+        if count > self.burst:
+            return math.inf
+        return (count - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets per key (client or repository)"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def wait_time(self, key: str, now: float, count: int = 1) -> float:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self._prune(now)
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.burst, now)
+        return bucket.wait_time(now, count)
+
+    def take(self, key: str, count: int = 1):
+        """Spend tokens checked with wait_time"""
+        self.buckets[key].tokens -= count
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely carries no state
+        for key in [key for key, bucket in self.buckets.items() if bucket.wait_time(now, int(bucket.burst)) == 0.0]:
+            del self.buckets[key]
+
+
+class AdmissionRejected(Exception):
+    """A request refused by admission control; ``retry_after`` is in seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTooLarge(AdmissionRejected):
+    """A request with more jobs than a rate limit's burst; retrying cannot succeed"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason, math.inf)
+
+
+class AdmissionController:
+    """Admission control for job creation.
+
+    Requests are limited by token buckets per client and per repository,
+    and jobs are refused once the number of pending jobs reaches a share of
+    MAX_QUEUE_DEPTH that depends on their priority, so low priority work is
+    shed first and high priority work is admitted until the queue is full.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(f"{__name__}.AdmissionController")
+        self.client_limiter = (
+            RateLimiter(settings.client_rate_limit, settings.client_rate_burst)
+            if settings.client_rate_limit else None
+        )
+        self.repository_limiter = (
+            RateLimiter(settings.repository_rate_limit, settings.repository_rate_burst)
+            if settings.repository_rate_limit else None
+        )
+        self.admitted = 0
+        self.rejected: Counter = Counter()
+        self.shed: Counter = Counter()
+
+    def admit(self, client: str, repositories: Iterable[str], priority: JobPriority, pending: int, jobs: int = 1):
+        """Admit ``jobs`` new jobs or raise AdmissionRejected"""
+        limit = self.queue_limit(priority)
+        if limit is not None and pending + jobs > limit:
+            self.rejected["queue_full"] += 1
+            self.shed[priority.value] += 1
+            raise AdmissionRejected(
+                f"Queue is full for {priority.value} priority jobs ({pending} pending, limit {limit})",
+                settings.queue_retry_after
+            )
+
+        now = time.monotonic()
+        repository_counts = Counter(repositories)
+        checks = []
+        if self.client_limiter is not None:
+            checks.append(("client", self.client_limiter, client, jobs))
+        if self.repository_limiter is not None:
+            checks.extend(("repository", self.repository_limiter, repository, count)
+                          for repository, count in repository_counts.items())
+
+        # Check every bucket before spending from any, so a refused request costs nothing
+        for kind, limiter, key, count in checks:
+            if count > limiter.burst:
+                self.rejected["too_large"] += 1
+                raise AdmissionTooLarge(
+                    f"{count} jobs for {kind} {key} exceed the {kind} rate limit burst of {int(limiter.burst)} "
+                    f"({kind.upper()}_RATE_BURST); submit them in smaller batches"
+                )
+        for kind, limiter, key, count in checks:
+            wait = limiter.wait_time(key, now, count)
+            if wait > 0:
+                self.rejected[f"{kind}_rate"] += 1
+                raise AdmissionRejected(f"Rate limit exceeded for {kind} {key}", wait)
+        for _, limiter, key, count in checks:
+            limiter.take(key, count)
+        self.admitted += jobs
+
+    def queue_limit(self, priority: JobPriority) -> Optional[int]:
+        """Pending jobs at which jobs of this priority are refused"""
+        if settings.max_queue_depth is None:
+            return None
+        fraction = settings.queue_shed_fractions.get(priority.value, 1.0)
+        return max(1, int(settings.max_queue_depth * fraction))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_queue_depth": settings.max_queue_depth,
+            "queue_limits": {priority.value: self.queue_limit(priority) for priority in PRIORITY_ORDER},
+            "client_rate_limit": settings.client_rate_limit,
+            "repository_rate_limit": settings.repository_rate_limit,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "shed_by_priority": dict(self.shed)
+        }
+
+
+def highest_priority(priorities: Iterable[JobPriority]) -> JobPriority:
+    """The most important of several priorities, e.g. of a pipeline's steps"""
+    return max(priorities, key=PRIORITY_ORDER.index, default=JobPriority.NORMAL)
+
+
+def retry_after_header(seconds: float) -> Tuple[str, str]:
+    """Retry-After header with whole seconds, at least 1"""
+    return "Retry-After", str(max(1, math.ceil(min(seconds, 3600))))
@@ -1,12 +1,18 @@
 import asyncio
+import json
 import subprocess
 import logging
 import os
-from typing import Dict, Any, List, Optional
+import signal
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from app.config import settings
 from app.models.job import JobRequest, JobResult, JobStatus, TaskType
+from app.services.file_io import file_io
+from app.services.output_processor import OutputProcessor
+from app.services.repo_context import RepoContextCache
+from app.services.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -16,82 +22,63 @@ class ClaudeService:
     
     def __init__(self):
         self.logger = logging.getLogger(f"{__name__}.ClaudeService")
+        self.repo_context = RepoContextCache()
     
-    async def execute_job(self, job_id: str, request: JobRequest) -> JobResult:
+    async def execute_job(
+        self,
+        job_id: str,
+        request: JobRequest,
+        upstream_results: Optional[List[JobResult]] = None
+    ) -> JobResult:
         """Execute a job using Claude CLI with role-specific configuration"""
         start_time = datetime.utcnow()
+        # Config reloads apply to jobs started afterwards; record which version this one ran with
+        config_version = settings.config_version
         
         try:
             # Get role configuration
             role_config = settings.get_role_config(request.role)
             timeout = settings.get_role_timeout(request.role)
             
-            # Build Claude CLI command
-            command = await self._build_claude_command(request, role_config)
+            with tracer.span("job.workspace", job_id=job_id) as span:
+                # Set working directory
+                working_dir = self._get_working_directory(request)
+                
+                # Repository context shared by jobs on the same commit
+                repo_context = await self._get_repo_context(job_id, request, working_dir)
+                span.set_attribute("repo_context", repo_context is not None)
+                
+                # Build Claude CLI command
+                command = await self._build_claude_command(
+                    request, role_config, upstream_results, repo_context[0] if repo_context else None
+                )
             
-            # Set up environment
-            env = self._setup_environment(request)
-            
-            # Set working directory
-            working_dir = self._get_working_directory(request)
-            
-            self.logger.info(f"Executing job {job_id} with role {request.role}")
-            self.logger.debug(f"Command: {' '.join(command)}")
-            self.logger.debug(f"Working directory: {working_dir}")
-            
-            # Execute command
-            result = await self._execute_command(
-                command=command,
-                timeout=timeout,
-                env=env,
-                cwd=working_dir
-            )
-            
-            end_time = datetime.utcnow()
-            duration = (end_time - start_time).total_seconds()
-            
-            # Determine final status
-            status = JobStatus.COMPLETED if result["returncode"] == 0 else JobStatus.FAILED
-            
-            # Create job result
-            job_result = JobResult(
-                job_id=job_id,
-                status=status,
-                role=request.role,
-                task_type=request.task.type,
-                started_at=start_time,
-                completed_at=end_time,
-                duration=duration,
-                output=result["stdout"] if status == JobStatus.COMPLETED else None,
-                error=result["stderr"] if status == JobStatus.FAILED else None,
-                logs=result["logs"],
-                files_created=[],  # TODO: Detect created files
-                files_modified=[],  # TODO: Detect modified files
-                metadata={
-                    "command": command,
-                    "returncode": result["returncode"],
-                    "working_directory": working_dir
-                }
-            )
+            with tracer.span("job.cli", job_id=job_id, role=request.role, timeout=timeout) as span:
+                # Set up environment; the CLI continues the trace from this span
+                env = self._setup_environment(request)
+                
+                self.logger.info(f"Executing job {job_id} with role {request.role}")
+                self.logger.debug(f"Command: {' '.join(command)}")
+                self.logger.debug(f"Working directory: {working_dir}")
+                
+                # Execute command
+                result = await self._execute_command(
+                    job_id=job_id,
+                    command=command,
+                    timeout=timeout,
+                    env=env,
+                    cwd=working_dir,
+                    config_version=config_version
+                )
+                span.set_attribute("returncode", result["returncode"])
             
+            job_result = self._build_result(job_id, request, start_time, command, working_dir, result, config_version)
+            if repo_context:
+                job_result.metadata["repo_context"] = repo_context[1]
             return job_result
             
         except asyncio.TimeoutError:
-            end_time = datetime.utcnow()
-            duration = (end_time - start_time).total_seconds()
-            
-            return JobResult(
-                job_id=job_id,
-                status=JobStatus.FAILED,
-                role=request.role,
-                task_type=request.task.type,
-                started_at=start_time,
-                completed_at=end_time,
-                duration=duration,
-                error=f"Job timed out after {timeout} seconds",
-                logs=[f"Job execution timed out"],
-                metadata={"timeout": timeout}
-            )
+            return self._timeout_result(job_id, request, start_time, timeout, config_version)
             
         except Exception as e:
             end_time = datetime.utcnow()
@@ -109,10 +96,150 @@ class ClaudeService:
                 duration=duration,
                 error=str(e),
                 logs=[f"Execution error: {str(e)}"],
-                metadata={"exception": str(e)}
+                metadata={"exception": str(e), "repository": request.context.repository}
+            )
+    
+    async def reattach_job(self, job_id: str, request: JobRequest) -> Optional[JobResult]:
+        """Wait for a CLI process started before a service restart and collect its result.
+        
+        Returns None when the process is gone without having recorded an exit
+        status, in which case the job has to run again.
+        """
+        run_dir = self.get_run_dir(job_id)
+        run_info = await file_io.run(_read_run_info, run_dir)
+        if run_info is None:
+            return None
+        
+        start_time = datetime.fromisoformat(run_info["started_at"])
+        timeout = run_info["timeout"]
+        config_version = run_info.get("config_version")
+        logs = [f"Re-attached to process {run_info['pid']} after a service restart"]
+        processor = OutputProcessor()
+        offset = 0
+        
+        try:
+            while True:
+                state = await file_io.run(self.run_state, job_id)
+                if state == "finished":
+                    break
+                if state is None:
+                    self.logger.warning(f"Process of job {job_id} exited without recording a status")
+                    return None
+                if (datetime.utcnow() - start_time).total_seconds() >= timeout:
+                    await file_io.run(self.terminate, job_id)
+                    return self._timeout_result(job_id, request, start_time, timeout, config_version)
+                await asyncio.sleep(settings.attach_poll_interval)
+                offset = await file_io.run(_feed_output, run_dir, offset, processor)
+            
+            result = await file_io.run(_collect_run, run_dir, logs, None)
+            await file_io.run(_feed_output, run_dir, offset, processor)
+            result["sections"] = processor.finish()
+            return self._build_result(
+                job_id, request, start_time, run_info["command"], run_info["working_directory"], result, config_version
             )
+            
+        except Exception as e:
+            self.logger.error(f"Error re-attaching to job {job_id}: {e}", exc_info=True)
+            return None
+    
+    def get_run_dir(self, job_id: str) -> str:
+        """Directory holding the CLI process state and output of a job"""
+        return os.path.abspath(os.path.join(settings.jobs_storage_path, "runs", job_id))
     
-    async def _build_claude_command(self, request: JobRequest, role_config: Dict[str, Any]) -> List[str]:
+    def run_state(self, job_id: str) -> Optional[str]:
+        """"finished" if the CLI recorded an exit status, "running" if its process is alive, otherwise None"""
+        run_dir = self.get_run_dir(job_id)
+        if os.path.exists(os.path.join(run_dir, "exitcode")):
+            return "finished"
+        run_info = _read_run_info(run_dir)
+        if run_info is not None and _is_process_alive(run_info["pid"], run_info.get("pid_start")):
+            return "running"
+        return None
+    
+    def terminate(self, job_id: str) -> bool:
+        """Stop the CLI process of a job, wherever it was started from"""
+        run_info = _read_run_info(self.get_run_dir(job_id))
+        if run_info is None or not _is_process_alive(run_info["pid"], run_info.get("pid_start")):
+            return False
+        try:
+            # The wrapper leads its own session, so this reaches the CLI as well
+            os.killpg(run_info["pid"], signal.SIGTERM)
+            return True
+        except OSError:
+            return False
+    
+    def _build_result(
+        self,
+        job_id: str,
+        request: JobRequest,
+        start_time: datetime,
+        command: List[str],
+        working_dir: str,
+        result: Dict[str, Any],
+        config_version: Optional[str]
+    ) -> JobResult:
+        """Turn the outcome of a CLI run into a job result"""
+        end_time = datetime.utcnow()
+        duration = (end_time - start_time).total_seconds()
+        
+        # Determine final status
+        status = JobStatus.COMPLETED if result["returncode"] == 0 else JobStatus.FAILED
+        
+        return JobResult(
+            job_id=job_id,
+            status=status,
+            role=request.role,
+            task_type=request.task.type,
+            started_at=start_time,
+            completed_at=end_time,
+            duration=duration,
+            output=result["stdout"] if status == JobStatus.COMPLETED else None,
+            error=result["stderr"] if status == JobStatus.FAILED else None,
+            logs=result["logs"],
+            sections=result.get("sections"),
+            files_created=[],  # TODO: Detect created files
+            files_modified=[],  # TODO: Detect modified files
+            metadata={
+                "command": command,
+                "returncode": result["returncode"],
+                "working_directory": working_dir,
+                "repository": request.context.repository,
+                "config_version": config_version
+            }
+        )
+    
+    def _timeout_result(
+        self,
+        job_id: str,
+        request: JobRequest,
+        start_time: datetime,
+        timeout: int,
+        config_version: Optional[str]
+    ) -> JobResult:
+        """Result of a job whose CLI run exceeded its timeout"""
+        end_time = datetime.utcnow()
+        duration = (end_time - start_time).total_seconds()
+        
+        return JobResult(
+            job_id=job_id,
+            status=JobStatus.FAILED,
+            role=request.role,
+            task_type=request.task.type,
+            started_at=start_time,
+            completed_at=end_time,
+            duration=duration,
+            error=f"Job timed out after {timeout} seconds",
+            logs=[f"Job execution timed out"],
+            metadata={"timeout": timeout, "repository": request.context.repository, "config_version": config_version}
+        )
+    
+    async def _build_claude_command(
+        self,
+        request: JobRequest,
+        role_config: Dict[str, Any],
+        upstream_results: Optional[List[JobResult]] = None,
+        repo_context: Optional[str] = None
+    ) -> List[str]:
         """Build the Claude CLI command with role-specific parameters"""
         command = [settings.claude_cli_path]
         
@@ -122,7 +249,7 @@ class ClaudeService:
             command.extend(["--system-prompt", f"@{prompt_file}"])
         
         # Add task description as the main prompt
-        task_prompt = self._build_task_prompt(request)
+        task_prompt = self._build_task_prompt(request, upstream_results, repo_context)
         command.append(task_prompt)
         
         # Add role-specific CLI arguments from config
@@ -132,7 +259,12 @@ class ClaudeService:
         
         return command
     
-    def _build_task_prompt(self, request: JobRequest) -> str:
+    def _build_task_prompt(
+        self,
+        request: JobRequest,
+        upstream_results: Optional[List[JobResult]] = None,
+        repo_context: Optional[str] = None
+    ) -> str:
         """Build the task prompt based on the job request"""
         lines = []
         
@@ -163,8 +295,38 @@ class ClaudeService:
         # Priority
         lines.append(f"Priority: {request.task.priority.value}")
         
+        # Outputs of upstream pipeline jobs
+        if upstream_results:
+            lines.append("Results from upstream jobs:")
+            for upstream in upstream_results:
+                output = upstream.output or ""
+                if len(output) > settings.upstream_output_max_chars:
+                    output = output[:settings.upstream_output_max_chars] + "\n[output truncated]"
+                lines.append(f"--- {upstream.role} ({upstream.task_type.value}) job {upstream.job_id} ---")
+                lines.append(output)
+        
+        # Prefetched repository context, so the CLI does not have to explore from scratch
+        if repo_context:
+            lines.append(repo_context)
+        
         return "\\n".join(lines)
     
+    async def _get_repo_context(
+        self,
+        job_id: str,
+        request: JobRequest,
+        working_dir: str
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Repository context for the prompt, or None when disabled or unavailable"""
+        if not settings.repo_context_enabled:
+            return None
+        try:
+            return await self.repo_context.prompt_context(request, working_dir)
+        except Exception as e:
+            # The CLI can still explore the repository itself
+            self.logger.warning(f"Running job {job_id} without repository context: {e}")
+            return None
+    
     def _setup_environment(self, request: JobRequest) -> Dict[str, str]:
         """Set up environment variables for the command execution"""
         env = os.environ.copy()
@@ -181,6 +343,11 @@ class ClaudeService:
         if request.context.commit_sha:
             env["COMMIT_SHA"] = request.context.commit_sha
         
+        # W3C trace context, picked up by OpenTelemetry-instrumented tools the CLI runs
+        traceparent = tracer.current_traceparent()
+        if traceparent is not None:
+            env["TRACEPARENT"] = traceparent
+        
         return env
     
     def _get_working_directory(self, request: JobRequest) -> str:
@@ -195,17 +362,28 @@ class ClaudeService:
     
     async def _execute_command(
         self, 
+        job_id: str,
         command: List[str], 
         timeout: int, 
         env: Dict[str, str], 
-        cwd: str
+        cwd: str,
+        config_version: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Execute the command asynchronously with timeout"""
+        """Execute the command asynchronously with timeout.
+        
+        The CLI runs detached in its own session with its output and exit
+        status written to the job's run directory, so it keeps going if the
+        service stops and a restarted service can re-attach to it.
+        """
         logs = []
+        run_dir = self.get_run_dir(job_id)
         
         try:
             # Ensure working directory exists
-            os.makedirs(cwd, exist_ok=True)
+            await file_io.makedirs(cwd)
+            # A run of this job whose lease expired may still be going; it must not write into the new run
+            await file_io.run(self.terminate, job_id)
+            await file_io.run(_reset_run_dir, run_dir)
             
             # Log command execution
             logs.append(f"Executing command: {' '.join(command)}")
@@ -214,37 +392,51 @@ class ClaudeService:
             
             # Create subprocess
             process = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                "/bin/sh", "-c", RUN_WRAPPER, "sh", run_dir, *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
                 env=env,
-                cwd=cwd
-            )
-            
-            # Wait for completion with timeout
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
+                cwd=cwd,
+                start_new_session=True
             )
+            await file_io.write_json(os.path.join(run_dir, "run.json"), {
+                "pid": process.pid,
+                "pid_start": _process_start_ticks(process.pid),
+                "command": command,
+                "working_directory": cwd,
+                "timeout": timeout,
+                "config_version": config_version,
+                "started_at": datetime.utcnow().isoformat()
+            })
             
-            # Decode output
-            stdout_text = stdout.decode('utf-8') if stdout else ""
-            stderr_text = stderr.decode('utf-8') if stderr else ""
+            # Wait for completion with timeout, parsing output as it arrives;
+            # if this task is cancelled the process is left running
+            processor = OutputProcessor()
+            offset = 0
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            waiter = asyncio.ensure_future(process.wait())
+            try:
+                while not waiter.done():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    await asyncio.wait({waiter}, timeout=min(settings.output_poll_interval, remaining))
+                    offset = await file_io.run(_feed_output, run_dir, offset, processor)
+            finally:
+                waiter.cancel()
             
-            logs.append(f"Command completed with return code: {process.returncode}")
-            
-            return {
-                "returncode": process.returncode,
-                "stdout": stdout_text,
-                "stderr": stderr_text,
-                "logs": logs
-            }
+            result = await file_io.run(_collect_run, run_dir, logs, process.returncode)
+            await file_io.run(_feed_output, run_dir, offset, processor)
+            result["sections"] = processor.finish()
+            return result
             
         except asyncio.TimeoutError:
             logs.append(f"Command timed out after {timeout} seconds")
             # Try to terminate the process
             try:
-                process.terminate()
+                os.killpg(process.pid, signal.SIGTERM)
                 await process.wait()
             except:
                 pass
@@ -252,4 +444,95 @@ class ClaudeService:
             
         except Exception as e:
             logs.append(f"Command execution failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+# Runs the CLI with output and exit status captured in the run directory ($1)
+RUN_WRAPPER = '''
+dir="$1"; shift
+"$@" > "$dir/stdout" 2> "$dir/stderr"
+echo $? > "$dir/exitcode.tmp" && mv "$dir/exitcode.tmp" "$dir/exitcode"
+'''
+
+
+def _reset_run_dir(run_dir: str):
+    """Create the run directory, clearing files left by an earlier attempt"""
+    os.makedirs(run_dir, exist_ok=True)
+    for name in ("run.json", "stdout", "stderr", "exitcode", "exitcode.tmp"):
+        try:
+            os.remove(os.path.join(run_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+def _read_run_info(run_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(run_dir, "run.json"), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _collect_run(run_dir: str, logs: List[str], returncode: Optional[int]) -> Dict[str, Any]:
+    """Read the output and exit status of a finished run"""
+    try:
+        with open(os.path.join(run_dir, "exitcode"), 'r') as f:
+            returncode = int(f.read().strip())
+    except (OSError, ValueError):
+        # The wrapper itself was killed before recording a status
+        returncode = returncode if returncode is not None else -1
+    
+    output = {}
+    for name in ("stdout", "stderr"):
+        try:
+            with open(os.path.join(run_dir, name), 'rb') as f:
+                output[name] = f.read().decode('utf-8', errors='replace')
+        except OSError:
+            output[name] = ""
+    
+    logs.append(f"Command completed with return code: {returncode}")
+    
+    return {
+        "returncode": returncode,
+        "stdout": output["stdout"],
+        "stderr": output["stderr"],
+        "logs": logs
+    }
+
+
+def _feed_output(run_dir: str, offset: int, processor: OutputProcessor) -> int:
+    """Pass stdout written since ``offset`` to the output processor; returns the new offset.
+    
+    Runs on the I/O pool, one call at a time per processor.
+    """
+    try:
+        with open(os.path.join(run_dir, "stdout"), 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return offset
+    if data:
+        processor.feed_bytes(data)
+    return offset + len(data)
+
+
+def _process_start_ticks(pid: int) -> Optional[int]:
+    """Start time of a process in clock ticks after boot, to tell it apart from a reused PID (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        if fields[0] == "Z":
+            return None
+        return int(fields[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _is_process_alive(pid: int, pid_start: Optional[int]) -> bool:
+    if pid_start is not None:
+        return _process_start_ticks(pid) == pid_start
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
\ No newline at end of file
@@ -0,0 +1,705 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.models.job import JobRecord, JobRequest
+from app.services.scheduler import PRIORITY_RANK, FairScheduler, QueuedJob, replay_fair_order
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Coordinator(ABC):
+    """Job queue and shared job state used by the JobManager.
+
+    The queue methods mirror FairScheduler: ``enqueue``/``remove`` pending
+    jobs, ``next_job`` claims the next job this instance may run and
+    ``release`` frees its slot. Backends shared between instances also
+    publish job info so any instance can answer for any job, and hold
+    claims under leases that running jobs renew with ``heartbeat``.
+
+    Methods that read or change the queue or shared state are coroutines,
+    so a shared backend can wait for another instance's lock without
+    stalling the event loop. ``claim_token``, ``get_running``,
+    ``running_entries`` and the counts answer from memory.
+
+    Backends implement every abstract queue method; the publishing, lease
+    and lifecycle hooks default to no-ops for backends that share nothing.
+    """
+
+    backend = "local"
+    shared = False
+
+    async def start(self):
+        """Prepare the backend when the service starts"""
+
+    async def close(self):
+        """Release backend resources"""
+
+    def publish(self, job_info: JobRecord):
+        """Make the current state of a job visible to other instances.
+
+        Does not wait for the write; updates land in the order they were
+        published and before any later call on this coordinator.
+        """
+
+    async def fetch(self, job_id: str) -> Optional[JobRecord]:
+        """State of a job as last published by any instance"""
+        return None
+
+    async def list_jobs(self) -> Optional[List[JobRecord]]:
+        """All published jobs, or None when job state is not shared; the records must not be modified"""
+        return None
+
+    async def forget(self, job_ids: List[str]):
+        """Stop publishing jobs that were archived"""
+
+    @abstractmethod
+    async def enqueue(self, job_id: str, request: JobRequest):
+        """Add a pending job to the queue"""
+
+    @abstractmethod
+    async def remove(self, job_id: str) -> bool:
+        """Remove a pending job from the queue; False if it was not queued"""
+
+    @abstractmethod
+    async def next_job(self) -> Optional[QueuedJob]:
+        """Claim the next job this instance may run, or None if nothing is eligible"""
+
+    @abstractmethod
+    async def release(self, job_id: str, token: Optional[int] = None):
+        """Free the slot of a finished job, unless ``token`` belongs to a superseded claim"""
+
+    @abstractmethod
+    async def adopt(self, job_id: str, request: JobRequest) -> bool:
+        """Count a job re-attached after a restart as running here; False if another instance took it over"""
+
+    def claim_token(self, job_id: str) -> Optional[int]:
+        """Fencing token of this instance's claim on a job"""
+        return None
+
+    async def heartbeat(self, job_id: str) -> bool:
+        """Renew the lease on a job claimed by this instance; False once the claim has been lost"""
+        return True
+
+    async def reap_expired(self) -> List[Tuple[str, Optional[str]]]:
+        """Re-queue jobs whose lease expired, returning (job_id, previous owner) pairs"""
+        return []
+
+    @abstractmethod
+    async def is_queued(self, job_id: str) -> bool:
+        """Whether a job is waiting in the queue"""
+
+    async def is_claimed(self, job_id: str) -> bool:
+        """Whether any instance holds a claim on a job, expired or not"""
+        return self.get_running(job_id) is not None
+
+    @abstractmethod
+    async def get_queued(self, job_id: str) -> Optional[QueuedJob]:
+        """Queue entry of a pending job"""
+
+    @abstractmethod
+    def get_running(self, job_id: str) -> Optional[QueuedJob]:
+        """Entry of a job running on this instance"""
+
+    @abstractmethod
+    def running_entries(self) -> List[QueuedJob]:
+        """Jobs running on this instance"""
+
+    @abstractmethod
+    async def jobs_ahead_of(self, job_id: str) -> List[QueuedJob]:
+        """Queued jobs expected to be dispatched before ``job_id``"""
+
+    @property
+    @abstractmethod
+    def running_count(self) -> int:
+        """Jobs running on this instance"""
+
+    @property
+    @abstractmethod
+    def queued_count(self) -> int:
+        """Queued jobs, as of the last queue operation for shared backends"""
+
+    @abstractmethod
+    async def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-tenant queue depth, running jobs and queue wait times"""
+
+    async def describe(self) -> Dict[str, Any]:
+        """Backend summary for the stats endpoint"""
+        return {"backend": self.backend, "instance_id": settings.instance_id}
+
+
+class LocalCoordinator(Coordinator):
+    """In-process queue for a single instance"""
+
+    def __init__(self):
+        self.scheduler = FairScheduler()
+
+    async def enqueue(self, job_id: str, request: JobRequest):
+        self.scheduler.enqueue(job_id, request)
+
+    async def remove(self, job_id: str) -> bool:
+        return self.scheduler.remove(job_id)
+
+    async def next_job(self) -> Optional[QueuedJob]:
+        return self.scheduler.next_job()
+
+    async def release(self, job_id: str, token: Optional[int] = None):
+        self.scheduler.release(job_id)
+
+    async def adopt(self, job_id: str, request: JobRequest) -> bool:
+        self.scheduler.adopt(job_id, request)
+        return True
+
+    async def is_queued(self, job_id: str) -> bool:
+        return self.scheduler.is_queued(job_id)
+
+    async def get_queued(self, job_id: str) -> Optional[QueuedJob]:
+        return self.scheduler.get_queued(job_id)
+
+    def get_running(self, job_id: str) -> Optional[QueuedJob]:
+        return self.scheduler.get_running(job_id)
+
+    def running_entries(self) -> List[QueuedJob]:
+        return self.scheduler.running_entries()
+
+    async def jobs_ahead_of(self, job_id: str) -> List[QueuedJob]:
+        return self.scheduler.jobs_ahead_of(job_id)
+
+    @property
+    def running_count(self) -> int:
+        return self.scheduler.running_count
+
+    @property
+    def queued_count(self) -> int:
+        return self.scheduler.queued_count
+
+    async def get_stats(self) -> List[Dict[str, Any]]:
+        return self.scheduler.get_stats()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    info TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_version ON jobs (version);
+CREATE TABLE IF NOT EXISTS queue (
+    job_id TEXT PRIMARY KEY,
+    repository TEXT NOT NULL,
+    role TEXT NOT NULL,
+    priority_rank INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    owner TEXT,
+    fence INTEGER,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    request TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queue_by_tenant ON queue (state, repository, role, priority_rank, seq);
+CREATE TABLE IF NOT EXISTS tenants (
+    repository TEXT NOT NULL,
+    role TEXT NOT NULL,
+    virtual_time REAL NOT NULL DEFAULT 0,
+    dispatched INTEGER NOT NULL DEFAULT 0,
+    total_wait REAL NOT NULL DEFAULT 0,
+    max_wait REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (repository, role)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class SQLiteCoordinator(Coordinator):
+    """Queue and job state shared by the instances on one host through a SQLite file.
+
+    Every queue change runs in a ``BEGIN IMMEDIATE`` transaction, which takes
+    SQLite's file lock, so claims by different instances never overlap. Fair
+    share accounting, per-repository and per-role caps and the optional
+    global concurrency limit are evaluated over all instances' running jobs.
+
+    Each claim carries a lease that the running instance renews and a
+    fencing token that grows with every claim. Claims whose lease expired
+    are re-queued by any instance; the previous holder's token no longer
+    matches, so it can neither renew nor release the new claim.
+
+    The connection lives on a single worker thread and every statement runs
+    there, in call order, so waiting for another instance's lock holds up
+    only coordinator calls. ``running`` and ``fences`` are changed on the
+    event loop only.
+    """
+
+    backend = "sqlite"
+    shared = True
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(f"{__name__}.SQLiteCoordinator")
+        self.path = path
+        self.instance_id = settings.instance_id
+        self.running: Dict[str, QueuedJob] = {}
+        self.fences: Dict[str, int] = {}
+        self.queued_total = 0
+        self.db: Optional[sqlite3.Connection] = None
+        # Parsed job records and the highest version read into them, kept by list_jobs
+        self.listed: Dict[str, JobRecord] = {}
+        self.listed_version = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="coordination")
+
+    async def _call(self, func: Callable[..., T], *args) -> T:
+        """Run ``func(*args)`` on the coordinator thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connection(self) -> sqlite3.Connection:
+        """The database connection, opened on first use (coordinator thread)"""
+        if self.db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SQLITE_SCHEMA)
+            self.db = db
+        return self.db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        else:
+            db.execute("COMMIT")
+
+    async def start(self):
+        await self._call(self._refresh_queued_total)
+
+    async def close(self):
+        await self._call(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def publish(self, job_info: JobRecord):
+        row = (job_info.job_id, job_info.status.value, job_info.created_at.isoformat(), json.dumps(job_info.to_dict()))
+        self._executor.submit(self._publish, row).add_done_callback(self._log_failure)
+
+    def _publish(self, row: Tuple[str, str, str, str]):
+        # Versions only grow, so list_jobs can pick up just the rows published since it last ran
+        self._connection().execute(
+            "INSERT OR REPLACE INTO jobs (job_id, status, created_at, info, version) "
+            "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(version), 0) + 1 FROM jobs))", row
+        )
+
+    def _log_failure(self, future: "Future[Any]"):
+        error = future.exception()
+        if error is not None:
+            self.logger.error(f"Error publishing job state: {error}", exc_info=error)
+
+    async def fetch(self, job_id: str) -> Optional[JobRecord]:
+        return await self._call(self._fetch, job_id)
+
+    def _fetch(self, job_id: str) -> Optional[JobRecord]:
+        row = self._connection().execute("SELECT info FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobRecord.from_dict(json.loads(row[0])) if row else None
+
+    async def list_jobs(self) -> Optional[List[JobRecord]]:
+        return await self._call(self._list_jobs)
+
+    def _list_jobs(self) -> List[JobRecord]:
+        """Published jobs, oldest first; only rows changed since the last call are parsed"""
+        db = self._connection()
+        for job_id, version, info in db.execute(
+            "SELECT job_id, version, info FROM jobs WHERE version > ?", (self.listed_version,)
+        ).fetchall():
+            self.listed[job_id] = JobRecord.from_dict(json.loads(info))
+            self.listed_version = max(self.listed_version, version)
+
+        if db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] != len(self.listed):
+            # Another instance archived jobs
+            present = {row[0] for row in db.execute("SELECT job_id FROM jobs")}
+            for job_id in [job_id for job_id in self.listed if job_id not in present]:
+                del self.listed[job_id]
+        return sorted(self.listed.values(), key=lambda job_info: job_info.created)
+
+    async def forget(self, job_ids: List[str]):
+        await self._call(self._forget, job_ids)
+
+    def _forget(self, job_ids: List[str]):
+        with self._transaction() as db:
+            db.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+        for job_id in job_ids:
+            self.listed.pop(job_id, None)
+
+    async def enqueue(self, job_id: str, request: JobRequest):
+        await self._call(self._enqueue, QueuedJob(job_id, request))
+
+    def _enqueue(self, entry: QueuedJob):
+        with self._transaction() as db:
+            backlogged = db.execute(
+                "SELECT 1 FROM queue WHERE state = 'queued' AND repository = ? AND role = ? LIMIT 1",
+                (entry.repository, entry.role)
+            ).fetchone()
+            if not backlogged:
+                # A tenant returning from idle must not bank credit for the time it was away
+                db.execute(
+                    "INSERT INTO tenants (repository, role, virtual_time) VALUES (?, ?, ?) "
+                    "ON CONFLICT (repository, role) DO UPDATE SET virtual_time = MAX(virtual_time, excluded.virtual_time)",
+                    (entry.repository, entry.role, self._virtual_clock(db))
+                )
+            seq = db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM queue").fetchone()[0]
+            db.execute(
+                "INSERT OR REPLACE INTO queue "
+                "(job_id, repository, role, priority_rank, seq, state, owner, enqueued_at, request) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', NULL, ?, ?)",
+                (entry.job_id, entry.repository, entry.role, PRIORITY_RANK[entry.priority], seq, time.time(),
+                 entry.request.json())
+            )
+            self._count_queued(db)
+
+    async def remove(self, job_id: str) -> bool:
+        return await self._call(self._remove, job_id)
+
+    def _remove(self, job_id: str) -> bool:
+        with self._transaction() as db:
+            removed = db.execute("DELETE FROM queue WHERE job_id = ? AND state = 'queued'", (job_id,)).rowcount > 0
+            self._count_queued(db)
+        return removed
+
+    async def next_job(self) -> Optional[QueuedJob]:
+        claimed = await self._call(self._next_job)
+        if claimed is None:
+            return None
+        entry, fence = claimed
+        self.running[entry.job_id] = entry
+        self.fences[entry.job_id] = fence
+        return entry
+
+    def _next_job(self) -> Optional[Tuple[QueuedJob, int]]:
+        with self._transaction() as db:
+            self._count_queued(db)
+            if settings.global_max_concurrent_jobs is not None:
+                running_total = db.execute("SELECT COUNT(*) FROM queue WHERE state = 'running'").fetchone()[0]
+                if running_total >= settings.global_max_concurrent_jobs:
+                    return None
+
+            running_by_repository = dict(db.execute(
+                "SELECT repository, COUNT(*) FROM queue WHERE state = 'running' GROUP BY repository"
+            ).fetchall())
+            running_by_role = dict(db.execute(
+                "SELECT role, COUNT(*) FROM queue WHERE state = 'running' GROUP BY role"
+            ).fetchall())
+
+            candidate: Optional[Tuple[str, str, float]] = None
+            for repository, role, virtual_time in db.execute(
+                "SELECT q.repository, q.role, COALESCE(t.virtual_time, 0) "
+                "FROM (SELECT DISTINCT repository, role FROM queue WHERE state = 'queued') q "
+                "LEFT JOIN tenants t ON t.repository = q.repository AND t.role = q.role"
+            ).fetchall():
+                repository_limit = settings.get_repository_concurrency(repository)
+                if repository_limit is not None and running_by_repository.get(repository, 0) >= repository_limit:
+                    continue
+                role_limit = settings.get_role_concurrency(role)
+                if role_limit is not None and running_by_role.get(role, 0) >= role_limit:
+                    continue
+                if candidate is None or virtual_time < candidate[2]:
+                    candidate = (repository, role, virtual_time)
+
+            if candidate is None:
+                return None
+
+            repository, role, virtual_time = candidate
+            job_id, enqueued_at, request_json = db.execute(
+                "SELECT job_id, enqueued_at, request FROM queue "
+                "WHERE state = 'queued' AND repository = ? AND role = ? ORDER BY priority_rank, seq LIMIT 1",
+                (repository, role)
+            ).fetchone()
+            fence = self._next_fence(db)
+            db.execute(
+                "UPDATE queue SET state = 'running', owner = ?, fence = ?, lease_expires = ? WHERE job_id = ?",
+                (self.instance_id, fence, time.time() + settings.lease_duration, job_id)
+            )
+
+            wait = max(time.time() - enqueued_at, 0.0)
+            weight = settings.get_repository_weight(repository) * settings.get_role_weight(role)
+            db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('virtual_clock', ?)", (virtual_time,)
+            )
+            db.execute(
+                "INSERT INTO tenants (repository, role, virtual_time, dispatched, total_wait, max_wait) "
+                "VALUES (?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT (repository, role) DO UPDATE SET "
+                "virtual_time = excluded.virtual_time, dispatched = dispatched + 1, "
+                "total_wait = total_wait + excluded.total_wait, max_wait = MAX(max_wait, excluded.max_wait)",
+                (repository, role, virtual_time + 1.0 / max(weight, 1e-6), wait, wait)
+            )
+            self.queued_total = max(self.queued_total - 1, 0)
+
+        return QueuedJob(job_id, JobRequest.parse_raw(request_json)), fence
+
+    async def release(self, job_id: str, token: Optional[int] = None):
+        if token is not None and self.fences.get(job_id) != token:
+            # Superseded by a newer claim on the same job
+            return
+        if self.running.pop(job_id, None) is None:
+            return
+        fence = self.fences.pop(job_id, None)
+        await self._call(self._release, job_id, fence)
+
+    def _release(self, job_id: str, fence: Optional[int]):
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM queue WHERE job_id = ? AND owner = ? AND fence IS ?", (job_id, self.instance_id, fence)
+            )
+
+    async def adopt(self, job_id: str, request: JobRequest) -> bool:
+        """Claim a job this instance was running before a restart, unless another instance took it over"""
+        entry = QueuedJob(job_id, request)
+        fence = await self._call(self._adopt, entry)
+        if fence is None:
+            return False
+        self.running[job_id] = entry
+        self.fences[job_id] = fence
+        return True
+
+    def _adopt(self, entry: QueuedJob) -> Optional[int]:
+        with self._transaction() as db:
+            row = db.execute("SELECT state, owner FROM queue WHERE job_id = ?", (entry.job_id,)).fetchone()
+            if row is not None and row != ("running", self.instance_id):
+                return None
+            fence = self._next_fence(db)
+            db.execute(
+                "INSERT OR REPLACE INTO queue "
+                "(job_id, repository, role, priority_rank, seq, state, owner, fence, lease_expires, enqueued_at, request) "
+                "VALUES (?, ?, ?, ?, 0, 'running', ?, ?, ?, ?, ?)",
+                (entry.job_id, entry.repository, entry.role, PRIORITY_RANK[entry.priority],
+                 self.instance_id, fence, time.time() + settings.lease_duration, time.time(), entry.request.json())
+            )
+        return fence
+
+    def claim_token(self, job_id: str) -> Optional[int]:
+        return self.fences.get(job_id)
+
+    async def heartbeat(self, job_id: str) -> bool:
+        fence = self.fences.get(job_id)
+        if fence is None:
+            return False
+        return await self._call(self._heartbeat, job_id, fence)
+
+    def _heartbeat(self, job_id: str, fence: int) -> bool:
+        return self._connection().execute(
+            "UPDATE queue SET lease_expires = ? WHERE job_id = ? AND state = 'running' AND owner = ? AND fence = ?",
+            (time.time() + settings.lease_duration, job_id, self.instance_id, fence)
+        ).rowcount > 0
+
+    async def reap_expired(self) -> List[Tuple[str, Optional[str]]]:
+        reaped = await self._call(self._reap_expired, dict(self.fences))
+        for job_id, owner in reaped:
+            self.logger.warning(f"Lease on job {job_id} held by instance {owner} expired; re-queued")
+        return reaped
+
+    def _reap_expired(self, fences: Dict[str, int]) -> List[Tuple[str, Optional[str]]]:
+        now = time.time()
+        reaped = []
+        with self._transaction() as db:
+            expired = db.execute(
+                "SELECT q.job_id, q.owner, q.fence, j.status FROM queue q LEFT JOIN jobs j ON j.job_id = q.job_id "
+                "WHERE q.state = 'running' AND (q.lease_expires IS NULL OR q.lease_expires < ?)",
+                (now,)
+            ).fetchall()
+            for job_id, owner, fence, status in expired:
+                if owner == self.instance_id and fences.get(job_id) == fence:
+                    # Still running here; the event loop was held up past a heartbeat
+                    db.execute("UPDATE queue SET lease_expires = ? WHERE job_id = ?", (now + settings.lease_duration, job_id))
+                    continue
+                if status not in (None, "pending", "running"):
+                    # Finished, but its holder stopped before releasing the claim
+                    db.execute("DELETE FROM queue WHERE job_id = ?", (job_id,))
+                    continue
+                db.execute(
+                    "UPDATE queue SET state = 'queued', owner = NULL, lease_expires = NULL WHERE job_id = ?", (job_id,)
+                )
+                reaped.append((job_id, owner))
+            self._count_queued(db)
+        return reaped
+
+    async def is_queued(self, job_id: str) -> bool:
+        return await self._call(self._is_queued, job_id)
+
+    async def is_claimed(self, job_id: str) -> bool:
+        return await self._call(self._is_claimed, job_id)
+
+    def _is_claimed(self, job_id: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM queue WHERE job_id = ? AND state = 'running'", (job_id,)
+        ).fetchone()
+        return row is not None
+
+    def _is_queued(self, job_id: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM queue WHERE job_id = ? AND state = 'queued'", (job_id,)
+        ).fetchone()
+        return row is not None
+
+    async def get_queued(self, job_id: str) -> Optional[QueuedJob]:
+        return await self._call(self._get_queued, job_id)
+
+    def _get_queued(self, job_id: str) -> Optional[QueuedJob]:
+        row = self._connection().execute(
+            "SELECT request FROM queue WHERE job_id = ? AND state = 'queued'", (job_id,)
+        ).fetchone()
+        return QueuedJob(job_id, JobRequest.parse_raw(row[0])) if row else None
+
+    def get_running(self, job_id: str) -> Optional[QueuedJob]:
+        return self.running.get(job_id)
+
+    def running_entries(self) -> List[QueuedJob]:
+        return list(self.running.values())
+
+    async def jobs_ahead_of(self, job_id: str) -> List[QueuedJob]:
+        return await self._call(self._jobs_ahead_of, job_id)
+
+    def _jobs_ahead_of(self, job_id: str) -> List[QueuedJob]:
+        db = self._connection()
+        rows = db.execute(
+            "SELECT job_id, repository, role, request FROM queue WHERE state = 'queued' ORDER BY priority_rank, seq"
+        ).fetchall()
+        if not any(row[0] == job_id for row in rows):
+            return []
+
+        tenant_clocks = {
+            (repository, role): virtual_time
+            for repository, role, virtual_time in db.execute(
+                "SELECT repository, role, virtual_time FROM tenants"
+            ).fetchall()
+        }
+        queues: Dict[Tuple[str, str], List[str]] = {}
+        requests: Dict[str, str] = {}
+        for queued_id, repository, role, request_json in rows:
+            queues.setdefault((repository, role), []).append(queued_id)
+            requests[queued_id] = request_json
+
+        clocks = {key: tenant_clocks.get(key, 0.0) for key in queues}
+        weights = {
+            key: settings.get_repository_weight(key[0]) * settings.get_role_weight(key[1]) for key in queues
+        }
+        return [
+            QueuedJob(ahead_id, JobRequest.parse_raw(requests[ahead_id]))
+            for ahead_id in replay_fair_order(queues, clocks, weights, job_id)
+        ]
+
+    @property
+    def running_count(self) -> int:
+        return len(self.running)
+
+    @property
+    def queued_count(self) -> int:
+        return self.queued_total
+
+    async def get_stats(self) -> List[Dict[str, Any]]:
+        return await self._call(self._get_stats)
+
+    def _get_stats(self) -> List[Dict[str, Any]]:
+        """Per-tenant queue depth, running jobs and queue wait times across all instances"""
+        db = self._connection()
+        now = time.time()
+        counts: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for repository, role, state, count, oldest in db.execute(
+            "SELECT repository, role, state, COUNT(*), MIN(enqueued_at) FROM queue GROUP BY repository, role, state"
+        ).fetchall():
+            tenant = counts.setdefault((repository, role), {"queued": 0, "running": 0, "oldest": None})
+            tenant[state] = count
+            if state == "queued":
+                tenant["oldest"] = now - oldest
+        self.queued_total = sum(tenant["queued"] for tenant in counts.values())
+
+        stats = []
+        tenants = {
+            (row[0], row[1]): row[2:]
+            for row in db.execute(
+                "SELECT repository, role, dispatched, total_wait, max_wait FROM tenants"
+            ).fetchall()
+        }
+        for key in sorted(set(tenants) | set(counts)):
+            repository, role = key
+            dispatched, total_wait, max_wait = tenants.get(key, (0, 0.0, 0.0))
+            tenant = counts.get(key, {"queued": 0, "running": 0, "oldest": None})
+            stats.append({
+                "repository": repository,
+                "role": role,
+                "weight": settings.get_repository_weight(repository) * settings.get_role_weight(role),
+                "queued": tenant["queued"],
+                "running": tenant["running"],
+                "dispatched": dispatched,
+                "queue_wait": {
+                    "average_seconds": total_wait / dispatched if dispatched else None,
+                    "p95_seconds": None,
+                    "max_seconds": max_wait if dispatched else None,
+                    "oldest_queued_seconds": tenant["oldest"]
+                }
+            })
+        return stats
+
+    async def describe(self) -> Dict[str, Any]:
+        running_total = await self._call(self._running_total)
+        return {
+            "backend": self.backend,
+            "instance_id": self.instance_id,
+            "path": self.path,
+            "running_jobs_all_instances": running_total,
+            "lease_duration": settings.lease_duration,
+            "global_max_concurrent_jobs": settings.global_max_concurrent_jobs
+        }
+
+    def _running_total(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM queue WHERE state = 'running'").fetchone()[0]
+
+    def _refresh_queued_total(self):
+        self._count_queued(self._connection())
+
+    def _count_queued(self, db: sqlite3.Connection):
+        """Refresh the queue depth reported by ``queued_count``"""
+        self.queued_total = db.execute("SELECT COUNT(*) FROM queue WHERE state = 'queued'").fetchone()[0]
+
+    def _next_fence(self, db: sqlite3.Connection) -> int:
+        """Next fencing token; tokens only grow, across all jobs and instances"""
+        fence = int(db.execute("SELECT COALESCE(MAX(value), 0) + 1 FROM meta WHERE key = 'fence'").fetchone()[0])
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fence', ?)", (fence,))
+        return fence
+
+    def _virtual_clock(self, db: sqlite3.Connection) -> float:
+        row = db.execute("SELECT value FROM meta WHERE key = 'virtual_clock'").fetchone()
+        return row[0] if row else 0.0
+
+
+def create_coordinator() -> Coordinator:
+    """Build the coordination backend selected by COORDINATION_BACKEND"""
+    backend = settings.coordination_backend.lower()
+    if backend == "local":
+        return LocalCoordinator()
+    if backend == "sqlite":
+        path = settings.coordination_db_path or os.path.join(settings.jobs_storage_path, "coordination.db")
+        return SQLiteCoordinator(path)
+    raise ValueError(f"Unknown coordination backend '{settings.coordination_backend}' (expected 'local' or 'sqlite')")
@@ -0,0 +1,141 @@
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.models.job import JobRequest, JobResult, JobStatus
+
+# Relative accuracy of the quantile sketch (2% error on any reported quantile)
+SKETCH_RELATIVE_ACCURACY = 0.02
+
+
+class DurationSketch:
+    """Streaming quantile sketch over job durations.
+
+    Durations are counted in logarithmically sized buckets, so memory stays
+    bounded by the range of durations rather than the number of jobs and any
+    quantile is reported within ``SKETCH_RELATIVE_ACCURACY`` of its true value.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        value = max(value, 0.001)
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class DurationEstimator:
+    """Estimates job start and completion times from historical durations.
+
+    Sketches are kept at three granularities - role x task type x repository,
+    role x task type, and role - and the most specific one with enough samples
+    answers each estimate.
+    """
+
+    def __init__(self):
+        self.sketches: Dict[Tuple[str, ...], DurationSketch] = {}
+
+    def observe(self, role: str, task_type: str, repository: Optional[str], duration: float):
+        """Record the duration of a completed job"""
+        for key in self._keys(role, task_type, repository):
+            sketch = self.sketches.get(key)
+            if sketch is None:
+                sketch = DurationSketch()
+                self.sketches[key] = sketch
+            sketch.add(duration)
+
+    def observe_result(self, result: JobResult, repository: Optional[str] = None):
+        """Record a job result if it completed successfully"""
+        if result.status != JobStatus.COMPLETED or result.duration is None:
+            return
+        repository = repository or result.metadata.get("repository")
+        self.observe(result.role, result.task_type.value, repository, result.duration)
+
+    def expected_duration(self, role: str, task_type: str, repository: Optional[str]) -> float:
+        """Expected runtime in seconds for a job of this kind"""
+        for key in reversed(self._keys(role, task_type, repository)):
+            sketch = self.sketches.get(key)
+            if sketch is not None and sketch.count >= settings.eta_min_samples:
+                return sketch.quantile(settings.eta_quantile)
+        return float(min(settings.eta_fallback_duration, settings.get_role_timeout(role)))
+
+    def expected_request_duration(self, request: JobRequest) -> float:
+        return self.expected_duration(request.role, request.task.type.value, request.context.repository)
+
+    def estimate_schedule(
+        self,
+        running: Iterable[Tuple[JobRequest, Optional[datetime]]],
+        queue_ahead: Iterable[JobRequest],
+        slots: int,
+        now: Optional[datetime] = None
+    ) -> datetime:
+        """Estimate when the next job after ``queue_ahead`` gets a slot.
+
+        Running jobs free their slot after their expected duration; queued
+        jobs ahead of the target then take the earliest free slot in order.
+        Repository and role caps are not simulated, so this is a lower bound
+        when those caps are saturated.
+        """
+        now = now or datetime.utcnow()
+        free_at: List[datetime] = []
+        for request, started_at in running:
+            expected_end = (started_at or now) + timedelta(seconds=self.expected_request_duration(request))
+            free_at.append(max(now, expected_end))
+
+        free_at.extend([now] * max(slots - len(free_at), 0))
+        heapq.heapify(free_at)
+        if not free_at:
+            free_at = [now]
+
+        for request in queue_ahead:
+            start = heapq.heappop(free_at)
+            heapq.heappush(free_at, start + timedelta(seconds=self.expected_request_duration(request)))
+
+        return free_at[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Duration percentiles per role and task type"""
+        stats: Dict[str, Any] = {}
+        for key, sketch in self.sketches.items():
+            if len(key) != 2:
+                continue
+            role, task_type = key
+            stats.setdefault(role, {})[task_type] = {
+                "samples": sketch.count,
+                "mean_seconds": sketch.mean,
+                "p50_seconds": sketch.quantile(0.5),
+                "p90_seconds": sketch.quantile(0.9)
+            }
+        return stats
+
+    @staticmethod
+    def _keys(role: str, task_type: str, repository: Optional[str]) -> List[Tuple[str, ...]]:
+        keys: List[Tuple[str, ...]] = [(role,), (role, task_type)]
+        if repository:
+            keys.append((role, task_type, repository))
+        return keys
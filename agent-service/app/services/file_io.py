@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FileIO:
+    """Blocking filesystem calls run on a bounded thread pool of their own.
+
+    Job storage, checkpoints and CLI output are read and written here so a
+    burst of large results never stalls the event loop, and search index
+    updates and repository context builds on the default executor cannot
+    hold them up. The SQLite coordinator runs its queries on a thread of
+    its own, and the archive and search index report stats from counters
+    kept in memory, so none of them touch the disk from the event loop.
+    """
+
+    def __init__(self, threads: int):
+        self.threads = max(1, threads)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._latest: Dict[str, Any] = {}
+        self._writers: Dict[str, asyncio.Future] = {}
+        self.active = 0
+        self.completed = 0
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Call ``func(*args)`` on the I/O pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="file-io")
+        self.active += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+
+    async def read_json(self, path: str) -> Any:
+        return await self.run(read_json_file, path)
+
+    async def write_json(self, path: str, data: Any):
+        """Replace ``path`` with ``data`` as JSON; readers never see a partial file"""
+        await self.run(write_json_file, path, data)
+
+    async def makedirs(self, path: str):
+        await self.run(_makedirs, path)
+
+    def write_json_soon(self, path: str, data: Any):
+        """Write ``data`` in the background, for callers that cannot wait.
+
+        Writes to the same path land in order; a write superseded before it
+        started is skipped.
+        """
+        self._latest[path] = data
+        if path not in self._writers:
+            self._writers[path] = asyncio.ensure_future(self._write_latest(path))
+
+    async def flush(self):
+        """Wait for background writes"""
+        while self._writers:
+            await asyncio.gather(*list(self._writers.values()), return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threads": self.threads,
+            "active": self.active,
+            "completed": self.completed,
+            "pending_writes": len(self._latest)
+        }
+
+    async def _write_latest(self, path: str):
+        try:
+            while path in self._latest:
+                data = self._latest.pop(path)
+                try:
+                    await self.write_json(path, data)
+                except Exception as e:
+                    logger.error(f"Error writing {path}: {e}", exc_info=True)
+        finally:
+            self._writers.pop(path, None)
+
+
+def read_json_file(path: str) -> Any:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_json_file(path: str, data: Any):
+    """Write JSON through a temporary file renamed into place.
+
+    The temporary file has a unique name, so concurrent writers of the same
+    path (including other instances sharing the directory) never interleave.
+    """
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        # mkstemp creates the file private to its owner; keep the permissions of a plain open()
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=str, indent=2)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _makedirs(path: str):
+    os.makedirs(path, exist_ok=True)
+
+
+file_io = FileIO(settings.io_threads)
@@ -1,16 +1,27 @@
 import asyncio
 import json
 import os
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from collections import Counter
+from typing import Dict, List, Optional, Any, Set, Tuple
+from datetime import datetime, timedelta
 import logging
+import sqlite3
 
 from app.config import settings
 from app.models.job import (
-    JobRequest, JobResponse, JobResult, JobInfo, JobStatus,
-    generate_job_id
+    JobRecord, JobRequest, JobResponse, JobResult, JobSearchHit, JobStatus, OutputSections,
+    PipelineRequest, PipelineStep, generate_job_id
 )
 from app.services.claude_service import ClaudeService
+from app.services.coordination import create_coordinator
+from app.services.estimator import DurationEstimator
+from app.services.file_io import file_io, write_json_file
+from app.services.notifier import CallbackNotifier
+from app.services.output_processor import process_output
+from app.services.retention import JobArchive, read_archived_job
+from app.services.search_index import SearchIndex
+from app.services.tracing import AnySpan, tracer
+from app.services.retry_policy import RetryPolicy, classify_failure, describe_attempt
 
 logger = logging.getLogger(__name__)
 
@@ -20,91 +31,358 @@ class JobManager:
     
     def __init__(self):
         self.logger = logging.getLogger(f"{__name__}.JobManager")
-        self.jobs: Dict[str, JobInfo] = {}
+        self.jobs: Dict[str, JobRecord] = {}
         self.job_results: Dict[str, JobResult] = {}
         self.running_tasks: Dict[str, asyncio.Task] = {}
         self.claude_service = ClaudeService()
-        
-        # Load existing jobs from storage
-        self._load_jobs_from_storage()
+        self.coordinator = create_coordinator()
+        self.archive = JobArchive(
+            os.path.join(settings.jobs_storage_path, "archive"), settings.archive_segment_max_bytes
+        )
+        self.search_index = _open_search_index()
+        self.estimator = DurationEstimator()
+        self.notifier = CallbackNotifier()
+        self.completion_events: Dict[str, asyncio.Event] = {}
+        self.retry_pending: Dict[str, Tuple[asyncio.TimerHandle, JobRequest]] = {}
+        self.retry_history: Dict[str, List[Dict[str, Any]]] = {}
+        self.waiting: Dict[str, Tuple[Set[str], JobRequest]] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self.pipelines: Dict[str, Dict[str, str]] = {}
+        # traceparent of each job's creation span, parent of the spans of its later stages
+        self.job_traces: Dict[str, str] = {}
+        self.queue_spans: Dict[str, AnySpan] = {}
+        self.draining = False
+        self.hydrated = False
+        self.hydration_loaded = 0
+        self.hydration_total = 0
+        self._hydration_task: Optional[asyncio.Task] = None
+        self._coordination_task: Optional[asyncio.Task] = None
+        # Dispatch awaits the coordinator, so rounds must not interleave and overshoot the slot count
+        self._dispatch_lock = asyncio.Lock()
+        self._background: Set[asyncio.Task] = set()
+    
+    async def start(self):
+        """Start loading stored jobs in the background"""
+        if self._hydration_task is None:
+            await self.coordinator.start()
+            self._hydration_task = asyncio.create_task(self._hydrate_from_storage())
+            if self.coordinator.shared:
+                self._coordination_task = asyncio.create_task(self._coordination_loop())
     
     async def create_job(self, job_id: str, request: JobRequest) -> JobResponse:
         """Create a new job"""
-        now = datetime.utcnow()
-        
-        # Create job info
-        job_info = JobInfo(
-            job_id=job_id,
-            status=JobStatus.PENDING,
-            role=request.role,
-            task_description=request.task.description,
-            created_at=now
-        )
-        
-        # Store job
-        self.jobs[job_id] = job_info
-        
-        # Save to persistent storage
-        await self._save_job_to_storage(job_id, request, job_info)
-        
-        # Create response
-        response = JobResponse(
-            job_id=job_id,
-            status=JobStatus.PENDING,
-            message="Job created successfully",
-            estimated_completion=None  # TODO: Estimate based on task type and role
-        )
+        await self.check_upstream_jobs([request])
         
+        with tracer.span("job.create", job_id=job_id, role=request.role, repository=request.context.repository) as span:
+            now = datetime.utcnow()
+            
+            # Create job info
+            job_info = JobRecord(
+                job_id=job_id,
+                status=JobStatus.PENDING,
+                role=request.role,
+                task_description=request.task.description,
+                created_at=now,
+                instance_id=settings.instance_id
+            )
+            
+            # Store job
+            self.jobs[job_id] = job_info
+            
+            # Save to persistent storage while the search index records the job
+            indexed = None
+            if self.search_index is not None:
+                loop = asyncio.get_running_loop()
+                indexed = loop.run_in_executor(None, self.search_index.index_job, job_info, request)
+            await self._save_job_to_storage(job_id, request, job_info)
+            if indexed is not None:
+                await indexed
+            self.coordinator.publish(job_info)
+            
+            if span.traceparent is not None:
+                self.job_traces[job_id] = span.traceparent
+            
+            # Create response
+            response = JobResponse(
+                job_id=job_id,
+                status=JobStatus.PENDING,
+                message="Job created successfully",
+                estimated_completion=None  # Filled in by estimate_job_times once the job is queued
+            )
+            
         self.logger.info(f"Created job {job_id} with role {request.role}")
         return response
     
-    async def start_job(self, job_id: str) -> bool:
-        """Start job execution asynchronously"""
+    async def check_upstream_jobs(self, requests: List[JobRequest]):
+        """Raise ValueError if any request depends on a job that does not exist"""
+        unknown: List[str] = []
+        for request in requests:
+            for dep in request.depends_on:
+                if dep not in unknown and await self._upstream_status(dep) is None:
+                    unknown.append(dep)
+        if unknown:
+            raise ValueError(f"Unknown upstream jobs: {', '.join(unknown)}")
+    
+    async def start_job(self, job_id: str, request: Optional[JobRequest] = None) -> bool:
+        """Queue a job for execution; it starts as soon as fair-share scheduling allows.
+        
+        Callers that just created the job pass its request; without one it is
+        read back from storage, as for jobs recovered after a restart.
+        """
         if job_id not in self.jobs:
             self.logger.error(f"Job {job_id} not found")
             return False
         
         job_info = self.jobs[job_id]
-        if job_info.status != JobStatus.PENDING:
+        if job_info.status != JobStatus.PENDING or await self.coordinator.is_queued(job_id):
             self.logger.warning(f"Job {job_id} is not in PENDING status")
             return False
         
-        # Check concurrent job limit
-        running_count = len([j for j in self.jobs.values() if j.status == JobStatus.RUNNING])
-        if running_count >= settings.max_concurrent_jobs:
-            self.logger.warning(f"Maximum concurrent jobs ({settings.max_concurrent_jobs}) reached")
-            return False
-        
-        # Load job request from storage
-        request = await self._load_job_request_from_storage(job_id)
+        if request is None:
+            request = await self._load_job_request_from_storage(job_id)
         if not request:
             self.logger.error(f"Could not load job request for {job_id}")
             return False
         
-        # Update job status
-        job_info.status = JobStatus.RUNNING
-        job_info.started_at = datetime.utcnow()
+        # Hold the job back until its upstream jobs have completed
+        unmet = set()
+        for dep in request.depends_on:
+            dep_status = await self._upstream_status(dep)
+            if dep_status is None:
+                await self._fail_job(job_id, request, f"Upstream job {dep} unavailable")
+                return True
+            if dep_status in (JobStatus.FAILED, JobStatus.CANCELLED):
+                await self._fail_job(job_id, request, f"Upstream job {dep} {dep_status.value}")
+                return True
+            if dep_status != JobStatus.COMPLETED:
+                unmet.add(dep)
         
-        # Create and start async task
-        task = asyncio.create_task(self._execute_job(job_id, request))
-        self.running_tasks[job_id] = task
+        self._start_queue_wait(job_id, waiting_on=len(unmet))
+        if unmet:
+            self.waiting[job_id] = (unmet, request)
+            for dep in unmet:
+                self.dependents.setdefault(dep, set()).add(job_id)
+            job_info.progress = f"Waiting on {len(unmet)} upstream job(s)"
+            return True
         
-        self.logger.info(f"Started job {job_id}")
+        await self.coordinator.enqueue(job_id, request)
+        await self._dispatch_pending_jobs()
         return True
     
-    async def _execute_job(self, job_id: str, request: JobRequest):
+    async def _upstream_status(self, job_id: str) -> Optional[JobStatus]:
+        """Status of an upstream job, from the archive once retention has moved it out of memory"""
+        if await self._ensure_job_loaded(job_id):
+            return self.jobs[job_id].status
+        archived = await self._read_archived(job_id)
+        return archived[0].status if archived else None
+    
+    def _start_queue_wait(self, job_id: str, **attributes):
+        """Time a job from queueing (or waiting on upstream jobs) until it starts"""
+        if tracer.enabled:
+            self.queue_spans[job_id] = tracer.start_span(
+                "job.queue_wait", parent=self.job_traces.get(job_id), job_id=job_id, **attributes
+            )
+    
+    async def create_pipeline(self, pipeline_id: str, pipeline: PipelineRequest) -> Dict[str, JobResponse]:
+        """Create and start the jobs of a multi-step pipeline.
+        
+        Each step becomes a job depending on the jobs of the steps it names;
+        steps whose dependencies are met run concurrently.
+        """
+        ordered_steps = order_pipeline_steps(pipeline.steps)
+        job_ids = {step.name: generate_job_id() for step in ordered_steps}
+        
+        responses: Dict[str, JobResponse] = {}
+        requests: Dict[str, JobRequest] = {}
+        for step in ordered_steps:
+            request = step.job.copy(deep=True)
+            request.depends_on = list(request.depends_on) + [job_ids[name] for name in step.depends_on]
+            request.metadata = {**request.metadata, "pipeline_id": pipeline_id, "pipeline_step": step.name}
+            responses[step.name] = await self.create_job(job_ids[step.name], request)
+            requests[step.name] = request
+        
+        self.pipelines[pipeline_id] = job_ids
+        for step in ordered_steps:
+            await self.start_job(job_ids[step.name], requests[step.name])
+        
+        self.logger.info(f"Created pipeline {pipeline_id} with {len(ordered_steps)} steps")
+        return responses
+    
+    async def get_pipeline(self, pipeline_id: str) -> Optional[Dict[str, JobRecord]]:
+        """Get the jobs of a pipeline by step name"""
+        job_ids = self.pipelines.get(pipeline_id)
+        if job_ids is None:
+            return None
+        return {name: self.jobs[job_id] for name, job_id in job_ids.items() if job_id in self.jobs}
+    
+    async def _release_dependents(self, job_id: str):
+        """Start or fail jobs that were waiting on a job that just finished"""
+        status = self.jobs[job_id].status
+        for dependent_id in sorted(self.dependents.pop(job_id, set())):
+            if dependent_id not in self.waiting:
+                continue
+            
+            unmet, request = self.waiting[dependent_id]
+            if status != JobStatus.COMPLETED:
+                self._forget_waiting(dependent_id)
+                await self._fail_job(dependent_id, request, f"Upstream job {job_id} {status.value}")
+                continue
+            
+            unmet.discard(job_id)
+            if unmet:
+                self.jobs[dependent_id].progress = f"Waiting on {len(unmet)} upstream job(s)"
+            else:
+                del self.waiting[dependent_id]
+                self.jobs[dependent_id].progress = None
+                await self.coordinator.enqueue(dependent_id, request)
+        
+        await self._dispatch_pending_jobs()
+    
+    def _forget_waiting(self, job_id: str):
+        """Remove a waiting job from the dependency graph"""
+        unmet, _ = self.waiting.pop(job_id, (set(), None))
+        for dep in unmet:
+            dependents = self.dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(job_id)
+    
+    async def _fail_job(self, job_id: str, request: JobRequest, error: str):
+        """Fail a job that never ran"""
+        now = datetime.utcnow()
+        job_info = self.jobs[job_id]
+        job_info.status = JobStatus.FAILED
+        job_info.completed_at = now
+        job_info.progress = None
+        
+        result = JobResult(
+            job_id=job_id,
+            status=JobStatus.FAILED,
+            role=request.role,
+            task_type=request.task.type,
+            started_at=now,
+            completed_at=now,
+            duration=0.0,
+            error=error,
+            logs=[f"Job not started: {error}"],
+            metadata={"repository": request.context.repository}
+        )
+        self.job_results[job_id] = result
+        await self._save_job_result_to_storage(job_id, result)
+        
+        self.logger.info(f"Job {job_id} failed without running: {error}")
+        await self._notify_completion(job_id, request)
+    
+    async def _upstream_results(self, request: JobRequest) -> List[JobResult]:
+        """Results of the jobs a request depends on, for inclusion in its prompt"""
+        if self.coordinator.shared:
+            # Upstream jobs may have run on another instance; their results are in shared storage
+            missing = [dep for dep in request.depends_on if dep not in self.job_results]
+            for _, job_result in await file_io.run(self._read_stored_jobs, missing):
+                if job_result is not None:
+                    self.job_results[job_result.job_id] = job_result
+        
+        results = []
+        for dep in request.depends_on:
+            if dep in self.job_results:
+                results.append(self.job_results[dep])
+                continue
+            # Archived while this job sat in the queue; read it back without keeping it in memory
+            archived = await self._read_archived(dep)
+            if archived is not None and archived[1] is not None:
+                results.append(archived[1])
+        return results
+    
+    async def _dispatch_pending_jobs(self):
+        """Start queued jobs while global, repository and role capacity allows"""
+        async with self._dispatch_lock:
+            if self.draining:
+                # Queued jobs stay PENDING on disk and are picked up again after the restart
+                return
+            
+            while self.coordinator.running_count < settings.max_concurrent_jobs:
+                entry = await self.coordinator.next_job()
+                if entry is None:
+                    break
+                
+                # Update job status
+                job_info = self.jobs.get(entry.job_id)
+                if job_info is None:
+                    # Queued by another instance sharing the coordinator
+                    job_info = await self.coordinator.fetch(entry.job_id) or JobRecord(
+                        job_id=entry.job_id,
+                        status=JobStatus.PENDING,
+                        role=entry.request.role,
+                        task_description=entry.request.task.description,
+                        created_at=datetime.utcnow()
+                    )
+                    self.jobs[entry.job_id] = job_info
+                job_info.status = JobStatus.RUNNING
+                job_info.instance_id = settings.instance_id
+                job_info.started_at = datetime.utcnow()
+                job_info.progress = None
+                job_info.attempts += 1
+                self._checkpoint_job(entry.job_id)
+                queue_span = self.queue_spans.pop(entry.job_id, None)
+                if queue_span is not None:
+                    queue_span.finish()
+                
+                # Create and start async task
+                task = asyncio.create_task(self._execute_job(entry.job_id, entry.request))
+                self.running_tasks[entry.job_id] = task
+                
+                self.logger.info(f"Started job {entry.job_id}")
+    
+    def _spawn(self, coroutine_function, *args):
+        """Run a coroutine from a plain callback, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coroutine_function(*args))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    async def _execute_job(self, job_id: str, request: JobRequest, reattach: bool = False):
         """Execute a job (runs in background task)"""
+        with tracer.span(
+            "job.execute", parent=self.job_traces.get(job_id),
+            job_id=job_id, role=request.role, attempt=self.jobs[job_id].attempts, reattach=reattach
+        ):
+            await self._run_job(job_id, request, reattach)
+    
+    async def _run_job(self, job_id: str, request: JobRequest, reattach: bool):
+        claim = self.coordinator.claim_token(job_id)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id)) if self.coordinator.shared else None
+        handed_off = False
         try:
-            self.logger.info(f"Executing job {job_id}")
+            if reattach:
+                result = await self.claude_service.reattach_job(job_id, request)
+                if result is None:
+                    # The process was lost with the previous instance; run the job again
+                    # once this task has given up its slot
+                    self._spawn(self._requeue_interrupted, job_id, request)
+                    return
+            else:
+                self.logger.info(f"Executing job {job_id}")
+                
+                # Execute job using Claude service
+                result = await self.claude_service.execute_job(
+                    job_id, request, upstream_results=await self._upstream_results(request)
+                )
+            self.estimator.observe_result(result, request.context.repository)
+            if claim is not None:
+                result.metadata["claim_token"] = claim
             
-            # Execute job using Claude service
-            result = await self.claude_service.execute_job(job_id, request)
+            if await self._claim_lost(job_id) or await self._cancelled_elsewhere(job_id):
+                return
             
             # Update job status
             if job_id in self.jobs:
+                if result.status == JobStatus.FAILED and self._schedule_retry(job_id, request, result):
+                    return
+                
                 job_info = self.jobs[job_id]
+                self._attach_attempt_history(job_id, result)
                 job_info.status = result.status
                 job_info.completed_at = result.completed_at
+                job_info.estimated_start = None
+                job_info.estimated_completion = None
                 
                 # Store result
                 self.job_results[job_id] = result
@@ -113,15 +391,20 @@ class JobManager:
                 await self._save_job_result_to_storage(job_id, result)
                 
                 self.logger.info(f"Job {job_id} completed with status: {result.status}")
+                await self._notify_completion(job_id, request)
             
+        except asyncio.CancelledError:
+            # Cancelled by close() rather than cancel_job: the CLI process carries on detached and the
+            # claim is kept, so its lease runs out and another instance can re-queue or adopt the job
+            handed_off = self.draining and self.running_tasks.get(job_id) is asyncio.current_task()
+            raise
+        
         except Exception as e:
             self.logger.error(f"Error executing job {job_id}: {e}", exc_info=True)
             
             # Update job as failed
-            if job_id in self.jobs:
+            if job_id in self.jobs and not await self._claim_lost(job_id):
                 job_info = self.jobs[job_id]
-                job_info.status = JobStatus.FAILED
-                job_info.completed_at = datetime.utcnow()
                 
                 # Create error result
                 error_result = JobResult(
@@ -132,154 +415,726 @@ class JobManager:
                     started_at=job_info.started_at or datetime.utcnow(),
                     completed_at=datetime.utcnow(),
                     error=str(e),
-                    logs=[f"Job execution failed: {str(e)}"]
+                    logs=[f"Job execution failed: {str(e)}"],
+                    metadata={"exception": str(e), "repository": request.context.repository}
                 )
                 
+                if self._schedule_retry(job_id, request, error_result):
+                    return
+                
+                self._attach_attempt_history(job_id, error_result)
+                job_info.status = JobStatus.FAILED
+                job_info.completed_at = datetime.utcnow()
                 self.job_results[job_id] = error_result
                 await self._save_job_result_to_storage(job_id, error_result)
+                await self._notify_completion(job_id, request)
         
         finally:
-            # Clean up running task
-            if job_id in self.running_tasks:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            # Clean up running task and hand its slot to the next queued job
+            if self.running_tasks.get(job_id) is asyncio.current_task():
                 del self.running_tasks[job_id]
+            if not handed_off:
+                await self.coordinator.release(job_id, claim)
+                await self._dispatch_pending_jobs()
     
-    async def cancel_job(self, job_id: str) -> bool:
-        """Cancel a running job"""
-        if job_id not in self.jobs:
+    async def _heartbeat(self, job_id: str):
+        """Renew the lease on a running job so other instances do not reap it"""
+        while True:
+            await asyncio.sleep(settings.lease_heartbeat_interval)
+            if not await self.coordinator.heartbeat(job_id):
+                # The job runs again elsewhere; whoever claims it stops this run's CLI process
+                self.logger.warning(f"Lost the lease on job {job_id}")
+                return
+    
+    async def _claim_lost(self, job_id: str) -> bool:
+        """Whether this instance's claim on a job was reaped, so its result must not be recorded"""
+        if await self.coordinator.heartbeat(job_id):
             return False
+        self.logger.warning(
+            f"Discarding result of job {job_id}: its lease expired and the job was re-queued"
+        )
+        return True
+    
+    def _schedule_retry(self, job_id: str, request: JobRequest, result: JobResult) -> bool:
+        """Re-queue a failed job after backoff if its failure is transient.
         
+        The job waits on a timer rather than in its running task, so the
+        concurrency slot is released while it backs off.
+        """
         job_info = self.jobs[job_id]
+        policy = RetryPolicy.for_job(request.role, request.task.type.value)
+        kind = classify_failure(result)
+        
+        if not policy.should_retry(job_info.attempts, kind):
+            self.retry_history.setdefault(job_id, []).append(describe_attempt(job_info.attempts, result, kind))
+            return False
+        
+        delay = policy.backoff_delay(job_info.attempts)
+        self.retry_history.setdefault(job_id, []).append(describe_attempt(job_info.attempts, result, kind, delay))
+        
+        job_info.status = JobStatus.PENDING
+        job_info.started_at = None
+        job_info.progress = (
+            f"Attempt {job_info.attempts}/{policy.max_attempts} failed ({kind.value}); "
+            f"retrying in {delay:.0f}s"
+        )
+        
+        handle = asyncio.get_running_loop().call_later(delay, self._spawn, self._requeue_retry, job_id)
+        self.retry_pending[job_id] = (handle, request)
+        self._checkpoint_job(job_id)
+        
+        self.logger.warning(
+            f"Job {job_id} attempt {job_info.attempts} failed with a transient error, "
+            f"retrying in {delay:.1f}s"
+        )
+        return True
+    
+    async def _requeue_retry(self, job_id: str):
+        """Put a job whose backoff has elapsed back in the queue"""
+        pending = self.retry_pending.pop(job_id, None)
+        if pending is None:
+            return
+        
+        _, request = pending
+        job_info = self.jobs.get(job_id)
+        if job_info is None or job_info.status != JobStatus.PENDING:
+            return
+        
+        job_info.progress = f"Queued for attempt {job_info.attempts + 1}"
+        self._start_queue_wait(job_id, retry=True)
+        await self.coordinator.enqueue(job_id, request)
+        await self._dispatch_pending_jobs()
+    
+    def _attach_attempt_history(self, job_id: str, result: JobResult):
+        """Record attempt count and earlier failed attempts on the final result"""
+        attempts = self.jobs[job_id].attempts
+        result.metadata["attempts"] = attempts
+        history = self.retry_history.pop(job_id, None)
+        if history and attempts > 1:
+            result.metadata["retry_history"] = history
+    
+    async def cancel_job(self, job_id: str) -> bool:
+        """Cancel a running job"""
+        job_info = await self.get_job(job_id)
+        if job_info is None:
+            return False
         
         # Can only cancel pending or running jobs
         if job_info.status not in [JobStatus.PENDING, JobStatus.RUNNING]:
             return False
         
+        entry = await self.coordinator.get_queued(job_id) or self.coordinator.get_running(job_id)
+        request = entry.request if entry else None
+        
+        # Stop a pending retry
+        pending = self.retry_pending.pop(job_id, None)
+        if pending is not None:
+            handle, request = pending
+            handle.cancel()
+        self.retry_history.pop(job_id, None)
+        
+        # Drop from the queue or dependency graph if it has not started yet
+        await self.coordinator.remove(job_id)
+        if job_id in self.waiting:
+            request = self.waiting[job_id][1]
+            self._forget_waiting(job_id)
+        
         # Cancel running task if exists
         if job_id in self.running_tasks:
             task = self.running_tasks[job_id]
             task.cancel()
             del self.running_tasks[job_id]
         
+        # The CLI runs detached, possibly started by another instance on this host, so stop it explicitly
+        if job_info.status == JobStatus.RUNNING:
+            await file_io.run(self.claude_service.terminate, job_id)
+        if request is None:
+            request = await self._load_job_request_from_storage(job_id)
+        
         # Update job status
         job_info.status = JobStatus.CANCELLED
         job_info.completed_at = datetime.utcnow()
+        job_info.estimated_start = None
+        job_info.estimated_completion = None
         
         self.logger.info(f"Cancelled job {job_id}")
+        await self._notify_completion(job_id, request)
         return True
     
-    async def get_job(self, job_id: str) -> Optional[JobInfo]:
+    async def _notify_completion(self, job_id: str, request: Optional[JobRequest]):
+        """Propagate a final status: wake long-polling clients, release dependent jobs and deliver the callback"""
+        self._checkpoint_job(job_id)
+        if self.search_index is not None:
+            # Waits for the index lock, which indexing a large result holds for a while
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.search_index.update_status, self.jobs[job_id])
+        
+        event = self.completion_events.pop(job_id, None)
+        if event is not None:
+            event.set()
+        
+        queue_span = self.queue_spans.pop(job_id, None)
+        if queue_span is not None:
+            queue_span.set_attribute("status", self.jobs[job_id].status.value)
+            queue_span.finish()
+        self.job_traces.pop(job_id, None)
+        
+        await self._release_dependents(job_id)
+        
+        if request is not None and request.callback_url:
+            job_info = self.jobs[job_id]
+            self.notifier.notify(request.callback_url, {
+                "event": "job.finished",
+                "job_id": job_id,
+                "status": job_info.status.value,
+                "job": job_info.to_dict()
+            })
+    
+    async def wait_for_job(self, job_id: str, timeout: float) -> Optional[JobRecord]:
+        """Wait up to ``timeout`` seconds for a job to reach a final status"""
+        job_info = await self.get_job(job_id)
+        if job_info is None or job_info.status not in (JobStatus.PENDING, JobStatus.RUNNING) or timeout <= 0:
+            return await self.get_job(job_id)
+        
+        event = self.completion_events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await self.get_job(job_id)
+    
+    def start_draining(self):
+        """Stop accepting and starting jobs ahead of a shutdown"""
+        if not self.draining:
+            self.draining = True
+            self.logger.info(
+                f"Draining: {len(self.running_tasks)} running, {self.coordinator.queued_count} queued jobs"
+            )
+    
+    async def drain(self, timeout: float) -> Dict[str, int]:
+        """Let running jobs finish for up to ``timeout`` seconds.
+        
+        Jobs still running afterwards are handed off: their CLI processes keep
+        running and the next instance re-attaches to them on startup.
+        """
+        self.start_draining()
+        tasks = list(self.running_tasks.values())
+        finished = 0
+        if tasks:
+            done, _ = await asyncio.wait(tasks, timeout=max(timeout, 0))
+            finished = len(done)
+        
+        summary = {
+            "finished": finished,
+            "handed_off": len(tasks) - finished,
+            "pending": self.coordinator.queued_count + len(self.retry_pending) + len(self.waiting)
+        }
+        self.logger.info(
+            f"Drain complete: {summary['finished']} jobs finished, {summary['handed_off']} handed off "
+            f"to the next instance, {summary['pending']} pending jobs left for it"
+        )
+        return summary
+    
+    async def close(self):
+        """Release resources held by the manager"""
+        for background_task in (self._hydration_task, self._coordination_task):
+            if background_task is not None and not background_task.done():
+                background_task.cancel()
+        
+        # Stop tracking jobs that are still running; their processes carry on detached
+        self.draining = True
+        tasks = list(self.running_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for handle, _ in self.retry_pending.values():
+            handle.cancel()
+        
+        await self.notifier.close()
+        await self.coordinator.close()
+        self.archive.close()
+        if self.search_index is not None:
+            self.search_index.close()
+    
+    async def get_job(self, job_id: str) -> Optional[JobRecord]:
         """Get job information"""
-        return self.jobs.get(job_id)
+        await self._ensure_job_loaded(job_id)
+        await self._refresh_from_coordinator(job_id)
+        job_info = self.jobs.get(job_id)
+        if job_info is None:
+            archived = await self._read_archived(job_id)
+            return archived[0] if archived else None
+        if job_info.status in (JobStatus.PENDING, JobStatus.RUNNING):
+            await self.estimate_job_times(job_id)
+        return job_info
+    
+    async def estimate_job_times(self, job_id: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Estimate start and completion times of a queued or running job"""
+        job_info = self.jobs.get(job_id)
+        if not job_info:
+            return None, None
+        
+        now = datetime.utcnow()
+        running = self.coordinator.get_running(job_id)
+        queued = await self.coordinator.get_queued(job_id) if running is None else None
+        
+        if running is not None:
+            start = job_info.started_at or now
+            expected = self.estimator.expected_request_duration(running.request)
+            completion = max(now, start + timedelta(seconds=expected))
+        elif queued is not None:
+            start = self.estimator.estimate_schedule(
+                running=[
+                    (entry.request, self.jobs[entry.job_id].started_at)
+                    for entry in self.coordinator.running_entries()
+                ],
+                queue_ahead=[entry.request for entry in await self.coordinator.jobs_ahead_of(job_id)],
+                slots=settings.max_concurrent_jobs,
+                now=now
+            )
+            expected = self.estimator.expected_request_duration(queued.request)
+            completion = start + timedelta(seconds=expected)
+        elif job_id in self.retry_pending:
+            handle, request = self.retry_pending[job_id]
+            start = now + timedelta(seconds=max(handle.when() - asyncio.get_running_loop().time(), 0))
+            completion = start + timedelta(seconds=self.estimator.expected_request_duration(request))
+        else:
+            return None, None
+        
+        job_info.estimated_start = start
+        job_info.estimated_completion = completion
+        return start, completion
     
     async def get_job_result(self, job_id: str) -> Optional[JobResult]:
         """Get job result"""
+        if not await self._ensure_job_loaded(job_id):
+            archived = await self._read_archived(job_id)
+            return archived[1] if archived else None
+        await self._load_shared_result(job_id)
         return self.job_results.get(job_id)
     
-    async def list_jobs(self) -> List[JobInfo]:
+    async def get_job_sections(self, job_id: str) -> Optional[OutputSections]:
+        """Structured sections of a job's output"""
+        result = await self.get_job_result(job_id)
+        if result is None:
+            return None
+        if result.sections is None:
+            # Stored before sections were extracted at write time
+            result.sections = process_output(result.output)
+        return result.sections
+    
+    async def search_jobs(
+        self,
+        query: str,
+        role: Optional[str] = None,
+        repository: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Optional[List[JobSearchHit]]:
+        """Full-text search over stored and archived jobs; None if the index is unavailable"""
+        if self.search_index is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.search_index.search, query, role, repository, status, limit, offset
+        )
+    
+    async def list_jobs(self) -> List[JobRecord]:
         """List all jobs"""
+        shared_jobs = await self.coordinator.list_jobs()
+        if shared_jobs is not None:
+            return shared_jobs
         return list(self.jobs.values())
     
     async def get_job_logs(self, job_id: str) -> Optional[List[str]]:
         """Get job execution logs"""
-        result = self.job_results.get(job_id)
+        result = await self.get_job_result(job_id)
         if result:
             return result.logs
         return None
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get service statistics"""
-        total_jobs = len(self.jobs)
-        running_jobs = len([j for j in self.jobs.values() if j.status == JobStatus.RUNNING])
-        completed_jobs = len([j for j in self.jobs.values() if j.status == JobStatus.COMPLETED])
-        failed_jobs = len([j for j in self.jobs.values() if j.status == JobStatus.FAILED])
-        cancelled_jobs = len([j for j in self.jobs.values() if j.status == JobStatus.CANCELLED])
+        jobs = await self.list_jobs()
+        # One pass over the records instead of a filtered copy per counter
+        counts = Counter((job.role, job.status) for job in jobs)
+        status_counts: Counter = Counter()
+        for (_, status), count in counts.items():
+            status_counts[status] += count
         
         # Role statistics
         role_stats = {}
         for role in settings.available_roles:
-            role_jobs = [j for j in self.jobs.values() if j.role == role]
             role_stats[role] = {
-                "total": len(role_jobs),
-                "running": len([j for j in role_jobs if j.status == JobStatus.RUNNING]),
-                "completed": len([j for j in role_jobs if j.status == JobStatus.COMPLETED]),
-                "failed": len([j for j in role_jobs if j.status == JobStatus.FAILED])
+                "total": sum(count for (job_role, _), count in counts.items() if job_role == role),
+                "running": counts[(role, JobStatus.RUNNING)],
+                "completed": counts[(role, JobStatus.COMPLETED)],
+                "failed": counts[(role, JobStatus.FAILED)]
             }
         
         return {
-            "total_jobs": total_jobs,
-            "running_jobs": running_jobs,
-            "completed_jobs": completed_jobs,
-            "failed_jobs": failed_jobs,
-            "cancelled_jobs": cancelled_jobs,
+            "total_jobs": len(jobs),
+            "running_jobs": status_counts[JobStatus.RUNNING],
+            "completed_jobs": status_counts[JobStatus.COMPLETED],
+            "failed_jobs": status_counts[JobStatus.FAILED],
+            "cancelled_jobs": status_counts[JobStatus.CANCELLED],
+            "queued_jobs": self.coordinator.queued_count,
+            "retrying_jobs": len(self.retry_pending),
+            "waiting_jobs": len(self.waiting),
             "role_statistics": role_stats,
+            "tenant_statistics": await self.coordinator.get_stats(),
+            "duration_statistics": self.estimator.get_stats(),
+            "callback_statistics": self.notifier.get_stats(),
+            "coordination": await self.coordinator.describe(),
+            "draining": self.draining,
+            "archive": self.archive.get_stats(),
+            "search_index": self.search_index.get_stats() if self.search_index is not None else None,
+            "repo_context": self.claude_service.repo_context.get_stats(),
+            "tracing": tracer.get_stats(),
+            "file_io": file_io.get_stats(),
+            "hydration": {
+                "complete": self.hydrated,
+                "loaded": self.hydration_loaded,
+                "total": self.hydration_total
+            },
             "max_concurrent_jobs": settings.max_concurrent_jobs,
             "available_roles": settings.available_roles
         }
     
-    def _load_jobs_from_storage(self):
-        """Load existing jobs from persistent storage"""
-        jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
-        if not os.path.exists(jobs_dir):
+    async def _coordination_loop(self):
+        """Pick up jobs queued by other instances and follow jobs they finish"""
+        while True:
+            await asyncio.sleep(settings.coordination_poll_interval)
+            try:
+                await self._sync_with_coordinator()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error syncing with coordinator: {e}", exc_info=True)
+    
+    async def _sync_with_coordinator(self):
+        """One round of coordination with the other instances"""
+        for job_id, owner in await self.coordinator.reap_expired():
+            await self._requeue_expired(job_id, owner)
+        await self._dispatch_pending_jobs()
+        
+        # Upstream jobs of local waiters and long-polled jobs may finish elsewhere
+        for job_id in set(self.dependents) | set(self.completion_events):
+            if job_id in self.running_tasks:
+                continue
+            local_status = self.jobs[job_id].status if job_id in self.jobs else None
+            await self._refresh_from_coordinator(job_id)
+            job_info = self.jobs.get(job_id)
+            if job_info is None or job_info.status == local_status or job_info.status in (JobStatus.PENDING, JobStatus.RUNNING):
+                continue
+            
+            event = self.completion_events.pop(job_id, None)
+            if event is not None:
+                event.set()
+            await self._release_dependents(job_id)
+    
+    async def _requeue_expired(self, job_id: str, owner: Optional[str]):
+        """Record that a job whose lease expired is pending again"""
+        await self._refresh_from_coordinator(job_id)
+        job_info = self.jobs.get(job_id)
+        if job_info is None:
             return
+        job_info.status = JobStatus.PENDING
+        job_info.started_at = None
+        job_info.progress = f"Re-queued after instance {owner} stopped renewing its lease"
+        self._checkpoint_job(job_id)
+    
+    async def _refresh_from_coordinator(self, job_id: str):
+        """Take the shared status of a job that is not running on this instance"""
+        if not self.coordinator.shared or job_id in self.running_tasks:
+            return
+        shared_info = await self.coordinator.fetch(job_id)
+        if shared_info is None:
+            return
+        
+        job_info = self.jobs.get(job_id)
+        if job_info is None:
+            self.jobs[job_id] = shared_info
+        elif shared_info.status != job_info.status or shared_info.attempts != job_info.attempts:
+            job_info.update_from(shared_info)
+    
+    async def _load_shared_result(self, job_id: str):
+        """Load a result written by another instance into shared storage"""
+        if not self.coordinator.shared or job_id in self.job_results:
+            return
+        for _, job_result in await file_io.run(self._read_stored_jobs, [job_id]):
+            if job_result is not None:
+                self.job_results[job_id] = job_result
+    
+    async def _cancelled_elsewhere(self, job_id: str) -> bool:
+        """Whether another instance cancelled a job while it ran here"""
+        if not self.coordinator.shared:
+            return False
+        shared_info = await self.coordinator.fetch(job_id)
+        if shared_info is None or shared_info.status != JobStatus.CANCELLED:
+            return False
+        
+        job_info = self.jobs.get(job_id)
+        if job_info is not None:
+            job_info.status = JobStatus.CANCELLED
+            job_info.completed_at = shared_info.completed_at
+        self.logger.info(f"Job {job_id} was cancelled on another instance; discarding its result")
+        return True
+    
+    async def _hydrate_from_storage(self):
+        """Load stored jobs in batches without holding up startup or requests"""
+        jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stored: List[str] = []
         
         try:
-            for filename in os.listdir(jobs_dir):
-                if filename.endswith("_info.json"):
-                    job_id = filename.replace("_info.json", "")
-                    info_path = os.path.join(jobs_dir, filename)
-                    
-                    with open(info_path, 'r') as f:
-                        job_data = json.load(f)
-                        job_info = JobInfo(**job_data)
-                        self.jobs[job_id] = job_info
-                    
-                    # Load result if available
-                    result_path = os.path.join(jobs_dir, f"{job_id}_result.json")
-                    if os.path.exists(result_path):
-                        with open(result_path, 'r') as f:
-                            result_data = json.load(f)
-                            # Convert datetime strings back to datetime objects
-                            for field in ['started_at', 'completed_at']:
-                                if result_data.get(field):
-                                    result_data[field] = datetime.fromisoformat(result_data[field])
-                            job_result = JobResult(**result_data)
-                            self.job_results[job_id] = job_result
+            filenames = await file_io.run(_list_directory, jobs_dir)
+            job_ids = [name[:-len("_info.json")] for name in filenames if name.endswith("_info.json")]
+            self.hydration_total = len(job_ids)
+            
+            batch_size = max(1, settings.hydration_batch_size)
+            for offset in range(0, len(job_ids), batch_size):
+                batch = job_ids[offset:offset + batch_size]
+                loaded = await file_io.run(self._read_stored_jobs, batch)
+                for job_info, job_result in loaded:
+                    self._merge_stored_job(job_info, job_result)
+                    stored.append(job_info.job_id)
+                self.hydration_loaded += len(batch)
+                # Let queued requests run between batches
+                await asyncio.sleep(0)
             
-            self.logger.info(f"Loaded {len(self.jobs)} jobs from storage")
+            self.logger.info(
+                f"Hydrated {len(job_ids)} jobs from storage in {loop.time() - started:.2f}s"
+            )
             
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             self.logger.error(f"Error loading jobs from storage: {e}", exc_info=True)
+        finally:
+            self.hydrated = True
+        
+        await self._recover_interrupted_jobs(stored)
+        await self._backfill_search_index()
+    
+    async def _recover_interrupted_jobs(self, job_ids: List[str]):
+        """Resume jobs this instance left unfinished when it last stopped.
+        
+        Only the stored jobs in ``job_ids`` are considered, not jobs created
+        since startup. Jobs whose CLI process is still alive (or finished
+        while the service was down) are re-attached; the others are queued
+        to run again.
+        """
+        interrupted = sorted(
+            (job_info for job_info in (self.jobs.get(job_id) for job_id in job_ids)
+             if job_info is not None
+             and job_info.instance_id == settings.instance_id
+             and job_info.status in (JobStatus.PENDING, JobStatus.RUNNING)
+             and job_info.job_id not in self.job_results
+             and job_info.job_id not in self.running_tasks
+             and job_info.job_id not in self.waiting
+             and job_info.job_id not in self.retry_pending),
+            key=lambda job_info: job_info.created
+        )
+        
+        reattached = requeued = 0
+        for job_info in interrupted:
+            try:
+                outcome = await self._recover_job(job_info)
+                if outcome is True:
+                    reattached += 1
+                elif outcome is False:
+                    requeued += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # One unrecoverable job must not keep the others from resuming
+                self.logger.error(f"Error recovering job {job_info.job_id}: {e}", exc_info=True)
+        
+        if interrupted:
+            self.logger.info(f"Recovered interrupted jobs: {reattached} re-attached, {requeued} re-queued")
+    
+    async def _recover_job(self, job_info: JobRecord) -> Optional[bool]:
+        """Resume one interrupted job: True if re-attached, False if queued again, None if left alone"""
+        if await self.coordinator.is_queued(job_info.job_id):
+            return None
+        request = await self._load_job_request_from_storage(job_info.job_id)
+        if request is None:
+            return None
+        
+        if job_info.status == JobStatus.RUNNING:
+            if not await self.coordinator.adopt(job_info.job_id, request):
+                # Its lease expired while this instance was down and it was re-queued
+                return None
+            if await file_io.run(self.claude_service.run_state, job_info.job_id) is not None:
+                task = asyncio.create_task(self._execute_job(job_info.job_id, request, reattach=True))
+                self.running_tasks[job_info.job_id] = task
+                return True
+            await self.coordinator.release(job_info.job_id)
+            await self._requeue_interrupted(job_info.job_id, request)
+        else:
+            if await self.coordinator.is_claimed(job_info.job_id):
+                # Claimed by another instance since this one stopped; re-queueing would run it twice
+                return None
+            await self.start_job(job_info.job_id, request)
+        return False
     
-    async def _save_job_to_storage(self, job_id: str, request: JobRequest, job_info: JobInfo):
-        """Save job to persistent storage"""
+    async def _requeue_interrupted(self, job_id: str, request: JobRequest):
+        """Queue a job again whose run was lost with a previous service instance"""
+        job_info = self.jobs[job_id]
+        job_info.status = JobStatus.PENDING
+        job_info.started_at = None
+        # An attempt cut short by a restart does not count against the retry budget
+        job_info.attempts = max(job_info.attempts - 1, 0)
+        job_info.progress = "Re-queued after a service restart"
+        self._checkpoint_job(job_id)
+        self._start_queue_wait(job_id, restarted=True)
+        await self.coordinator.enqueue(job_id, request)
+        await self._dispatch_pending_jobs()
+    
+    async def _ensure_job_loaded(self, job_id: str) -> bool:
+        """Load a single job from storage if hydration has not reached it yet"""
+        if job_id in self.jobs:
+            return True
+        if self.hydrated and not self.coordinator.shared:
+            return False
+        
+        loaded = await file_io.run(self._read_stored_jobs, [job_id])
+        for job_info, job_result in loaded:
+            self._merge_stored_job(job_info, job_result)
+        
+        if job_id not in self.jobs and self.coordinator.shared:
+            # Created by another instance whose info file is not written yet
+            shared_info = await self.coordinator.fetch(job_id)
+            if shared_info is not None:
+                self.jobs[job_id] = shared_info
+        return job_id in self.jobs
+    
+    async def _backfill_search_index(self):
+        """Index stored jobs that predate the search index"""
+        if self.search_index is None:
+            return
+        loop = asyncio.get_running_loop()
+        missing = await loop.run_in_executor(None, self.search_index.missing, list(self.jobs))
+        batch_size = max(1, settings.hydration_batch_size)
+        for offset in range(0, len(missing), batch_size):
+            await loop.run_in_executor(None, self._index_stored_jobs, missing[offset:offset + batch_size])
+        if missing:
+            self.logger.info(f"Added {len(missing)} stored jobs to the search index")
+    
+    def _index_stored_jobs(self, job_ids: List[str]):
+        """Index jobs from memory and their stored requests (runs in a worker thread)"""
         jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
-        os.makedirs(jobs_dir, exist_ok=True)
+        for job_id in job_ids:
+            job_info = self.jobs.get(job_id)
+            if job_info is None:
+                continue
+            request = None
+            try:
+                with open(os.path.join(jobs_dir, f"{job_id}_request.json"), 'r') as f:
+                    request = JobRequest(**json.load(f))
+            except (OSError, ValueError):
+                pass
+            self.search_index.index_job(job_info, request, self.job_results.get(job_id))
+    
+    async def forget_jobs(self, job_ids: List[str]):
+        """Drop archived jobs from memory; they are read from the archive from now on"""
+        for job_id in job_ids:
+            self.jobs.pop(job_id, None)
+            self.job_results.pop(job_id, None)
+        await self.coordinator.forget(job_ids)
+    
+    async def _read_archived(self, job_id: str) -> Optional[Tuple[JobRecord, Optional[JobResult]]]:
+        """Info and result of an archived job"""
+        return await file_io.run(read_archived_job, self.archive, job_id)
+    
+    def _merge_stored_job(self, job_info: JobRecord, job_result: Optional[JobResult]):
+        """Add a stored job unless it is already known in memory"""
+        if job_info.job_id in self.jobs:
+            return
         
-        try:
-            # Save job info
+        self.jobs[job_info.job_id] = job_info
+        if job_result is not None:
+            self.job_results[job_info.job_id] = job_result
+            self.estimator.observe_result(job_result)
+    
+    def _read_stored_jobs(self, job_ids: List[str]) -> List[Tuple[JobRecord, Optional[JobResult]]]:
+        """Read and parse stored jobs (runs in a worker thread)"""
+        jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
+        loaded = []
+        
+        for job_id in job_ids:
             info_path = os.path.join(jobs_dir, f"{job_id}_info.json")
-            with open(info_path, 'w') as f:
-                json.dump(job_info.dict(), f, default=str, indent=2)
-            
-            # Save job request
-            request_path = os.path.join(jobs_dir, f"{job_id}_request.json")
-            with open(request_path, 'w') as f:
-                json.dump(request.dict(), f, default=str, indent=2)
+            try:
+                with open(info_path, 'r') as f:
+                    job_info = JobRecord.from_dict(json.load(f))
                 
-        except Exception as e:
-            self.logger.error(f"Error saving job {job_id} to storage: {e}", exc_info=True)
+                # Load result if available
+                job_result = None
+                result_path = os.path.join(jobs_dir, f"{job_id}_result.json")
+                if os.path.exists(result_path):
+                    with open(result_path, 'r') as f:
+                        result_data = json.load(f)
+                        # Convert datetime strings back to datetime objects
+                        for field in ['started_at', 'completed_at']:
+                            if result_data.get(field):
+                                result_data[field] = datetime.fromisoformat(result_data[field])
+                        job_result = JobResult(**result_data)
+                    
+                    # Info files are written at creation; the result holds the final state
+                    job_info.status = job_result.status
+                    job_info.started_at = job_result.started_at
+                    job_info.completed_at = job_result.completed_at
+                
+                loaded.append((job_info, job_result))
+                
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                self.logger.error(f"Error loading job {job_id} from storage: {e}", exc_info=True)
+        
+        return loaded
     
-    async def _save_job_result_to_storage(self, job_id: str, result: JobResult):
-        """Save job result to persistent storage"""
+    async def _save_job_to_storage(self, job_id: str, request: JobRequest, job_info: JobRecord):
+        """Save job to persistent storage in a single trip to the I/O pool"""
         jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
         
         try:
-            result_path = os.path.join(jobs_dir, f"{job_id}_result.json")
-            with open(result_path, 'w') as f:
-                json.dump(result.dict(), f, default=str, indent=2)
+            await file_io.run(_write_new_job, jobs_dir, job_id, request.dict(), job_info.to_dict())
                 
         except Exception as e:
-            self.logger.error(f"Error saving job result {job_id} to storage: {e}", exc_info=True)
+            self.logger.error(f"Error saving job {job_id} to storage: {e}", exc_info=True)
+    
+    def _checkpoint_job(self, job_id: str):
+        """Persist the current job info so a restarted service knows where the job got to"""
+        self.coordinator.publish(self.jobs[job_id])
+        info_path = os.path.join(settings.jobs_storage_path, "jobs", f"{job_id}_info.json")
+        # Written in the background; checkpoints of the same job land in order
+        file_io.write_json_soon(info_path, self.jobs[job_id].to_dict())
+    
+    async def _save_job_result_to_storage(self, job_id: str, result: JobResult):
+        """Save job result to persistent storage"""
+        with tracer.span("job.persist", job_id=job_id, status=result.status.value):
+            jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
+            
+            try:
+                result_path = os.path.join(jobs_dir, f"{job_id}_result.json")
+                await file_io.run(_write_result, result_path, result)
+                
+            except Exception as e:
+                self.logger.error(f"Error saving job result {job_id} to storage: {e}", exc_info=True)
+            
+            if self.search_index is not None and job_id in self.jobs:
+                try:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self.search_index.index_result, self.jobs[job_id], result)
+                except Exception as e:
+                    self.logger.error(f"Error indexing job result {job_id}: {e}", exc_info=True)
     
     async def _load_job_request_from_storage(self, job_id: str) -> Optional[JobRequest]:
         """Load job request from persistent storage"""
@@ -287,11 +1142,75 @@ class JobManager:
         request_path = os.path.join(jobs_dir, f"{job_id}_request.json")
         
         try:
-            if os.path.exists(request_path):
-                with open(request_path, 'r') as f:
-                    request_data = json.load(f)
-                    return JobRequest(**request_data)
+            return JobRequest(**await file_io.read_json(request_path))
+        except FileNotFoundError:
+            pass
         except Exception as e:
             self.logger.error(f"Error loading job request {job_id} from storage: {e}", exc_info=True)
         
-        return None
\ No newline at end of file
+        return None
+
+
+def order_pipeline_steps(steps: List[PipelineStep]) -> List[PipelineStep]:
+    """Order pipeline steps so every step comes after the steps it depends on"""
+    by_name: Dict[str, PipelineStep] = {}
+    for step in steps:
+        if step.name in by_name:
+            raise ValueError(f"Duplicate pipeline step name '{step.name}'")
+        by_name[step.name] = step
+    
+    for step in steps:
+        for name in step.depends_on:
+            if name not in by_name:
+                raise ValueError(f"Step '{step.name}' depends on unknown step '{name}'")
+    
+    ordered: List[PipelineStep] = []
+    visiting: Set[str] = set()
+    done: Set[str] = set()
+    
+    def visit(step: PipelineStep):
+        if step.name in done:
+            return
+        if step.name in visiting:
+            raise ValueError(f"Pipeline has a dependency cycle through step '{step.name}'")
+        visiting.add(step.name)
+        for name in step.depends_on:
+            visit(by_name[name])
+        visiting.discard(step.name)
+        done.add(step.name)
+        ordered.append(step)
+    
+    for step in steps:
+        visit(step)
+    return ordered
+
+
+def _open_search_index() -> Optional[SearchIndex]:
+    """Open the job search index, or None if this SQLite build lacks FTS5"""
+    path = settings.search_index_path or os.path.join(settings.jobs_storage_path, "search.db")
+    try:
+        return SearchIndex(path)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Job search is unavailable: {e}")
+        return None
+
+
+def _write_new_job(jobs_dir: str, job_id: str, request: Dict[str, Any], info: Dict[str, Any]):
+    """Store a new job's request and info (runs on the I/O pool)"""
+    os.makedirs(jobs_dir, exist_ok=True)
+    # Request first: a job is only picked up from storage once its info file exists
+    write_json_file(os.path.join(jobs_dir, f"{job_id}_request.json"), request)
+    write_json_file(os.path.join(jobs_dir, f"{job_id}_info.json"), info)
+
+
+def _write_result(path: str, result: JobResult):
+    """Serialize and store a job result (runs on the I/O pool)"""
+    write_json_file(path, result.dict())
+
+
+def _list_directory(path: str) -> List[str]:
+    """Directory listing that treats a missing directory as empty"""
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
\ No newline at end of file
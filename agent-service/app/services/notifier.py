@@ -0,0 +1,85 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict, Optional, Set
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackNotifier:
+    """Delivers job completion callbacks over a pooled HTTP client with retry"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(f"{__name__}.CallbackNotifier")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Set[asyncio.Task] = set()
+        self.delivered = 0
+        self.failed = 0
+
+    def notify(self, url: str, payload: Dict[str, Any]):
+        """Schedule delivery of a callback without blocking the caller"""
+        task = asyncio.create_task(self._deliver(url, payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def close(self):
+        """Wait briefly for in-flight callbacks, then release the connection pool"""
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=settings.callback_timeout)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "delivered": self.delivered,
+            "failed": self.failed
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.callback_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.callback_max_connections,
+                    max_keepalive_connections=settings.callback_max_connections
+                )
+            )
+        return self._client
+
+    async def _deliver(self, url: str, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=str)
+        headers = {"Content-Type": "application/json", "X-Agent-Event": payload.get("event", "")}
+
+        for attempt in range(1, settings.callback_max_attempts + 1):
+            try:
+                response = await self._get_client().post(url, content=body, headers=headers)
+                if response.status_code < 400:
+                    self.delivered += 1
+                    return
+                if response.status_code < 500 and response.status_code != 429:
+                    # The receiver rejected the callback; retrying will not change that
+                    self.logger.warning(f"Callback to {url} rejected with status {response.status_code}")
+                    self.failed += 1
+                    return
+                self.logger.warning(
+                    f"Callback to {url} failed with status {response.status_code} "
+                    f"(attempt {attempt}/{settings.callback_max_attempts})"
+                )
+            except httpx.HTTPError as e:
+                self.logger.warning(
+                    f"Callback to {url} failed: {e} (attempt {attempt}/{settings.callback_max_attempts})"
+                )
+
+            if attempt < settings.callback_max_attempts:
+                delay = settings.callback_backoff * (2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        self.failed += 1
+        self.logger.error(f"Giving up on callback to {url} for job {payload.get('job_id')}")
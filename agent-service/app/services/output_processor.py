@@ -0,0 +1,220 @@
+import codecs
+import re
+from typing import List, Optional, Set, Tuple
+
+from app.models.job import CodeBlock, DiffSection, FileReference, Finding, OutputSections
+
+# Upper bound per section kind, so a runaway output cannot grow a result without limit
+MAX_ITEMS = 500
+
+FENCE_RE = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w+#.-]*)")
+DIFF_GIT_RE = re.compile(r"^diff --git a/(\S+) b/(\S+)")
+DIFF_OLD_RE = re.compile(r"^--- (?:a/)?(\S+)")
+DIFF_NEW_RE = re.compile(r"^\+\+\+ (?:b/)?(\S+)")
+DIFF_EXTENDED_HEADERS = ("index ", "new file", "deleted file", "similarity", "rename ", "old mode", "new mode", "Binary")
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@")
+FILE_REF_RE = re.compile(
+    r"(?<![\w/.-])((?:[\w.-]+/)*[\w.-]+\.(?:py|pyi|js|jsx|ts|tsx|go|rs|java|kt|rb|php|c|h|cc|cpp|hpp|cs|swift|"
+    r"scala|sh|sql|html|css|scss|md|rst|txt|yml|yaml|json|toml|ini|cfg|xml|proto|tf))(?::(\d+))?\b"
+)
+FINDING_RE = re.compile(
+    r"^\s*(?:[-*]\s+|\d+\.\s+)?(?:\*\*|__)?\[?(critical|high|medium|low|error|warning|warn|info)\]?(?:\*\*|__)?"
+    r"\s*(?::|-|–)\s*(?:\*\*|__)?\s*(.+)$",
+    re.IGNORECASE
+)
+SEVERITY_ALIASES = {"error": "high", "warn": "warning"}
+
+
+class OutputProcessor:
+    """Incrementally extracts code blocks, diffs, file references and findings from CLI output.
+
+    Output is fed in chunks as the CLI writes it; only the current partial
+    line and the section being built are held, so parsing is done once,
+    while the job runs.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._line_number = 0
+        self._sections = OutputSections()
+        self._seen_references: Set[Tuple[str, Optional[int]]] = set()
+        self._block: Optional[CodeBlock] = None
+        self._block_fence = ""
+        self._block_lines: List[str] = []
+        self._diff: Optional[DiffSection] = None
+        self._diff_lines: List[str] = []
+        self._pending_old_header: Optional[str] = None
+
+    def feed_bytes(self, data: bytes):
+        """Process raw output bytes; multi-byte characters may span chunks"""
+        self.feed(self._decoder.decode(data))
+
+    def feed(self, text: str):
+        """Process a chunk of output text"""
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._process_line(line.rstrip("\r"))
+
+    def finish(self) -> OutputSections:
+        """Flush the last line and any unterminated section and return what was extracted"""
+        self._partial += self._decoder.decode(b"", final=True)
+        if self._partial:
+            self._process_line(self._partial.rstrip("\r"))
+            self._partial = ""
+        self._resolve_old_header()
+        self._close_diff()
+        if self._block is not None:
+            self._close_block()
+        return self._sections
+
+    def _process_line(self, line: str):
+        self._line_number += 1
+
+        fence = FENCE_RE.match(line)
+        if self._block is not None:
+            if fence and fence.group(1)[0] == self._block_fence[0] and len(fence.group(1)) >= len(self._block_fence) \
+                    and not fence.group(2):
+                self._resolve_old_header()
+                self._close_diff()
+                self._close_block()
+                return
+            self._block_lines.append(line)
+            self._process_diff_line(line)
+            return
+
+        if fence:
+            self._resolve_old_header()
+            self._close_diff()
+            self._block = CodeBlock(language=fence.group(2) or None, content="", start_line=self._line_number)
+            self._block_fence = fence.group(1)
+            self._block_lines = []
+            return
+
+        if self._process_diff_line(line):
+            return
+        self._process_text_line(line)
+
+    def _process_diff_line(self, line: str) -> bool:
+        """Track unified diffs; returns True if the line belongs to one"""
+        git_header = DIFF_GIT_RE.match(line)
+        if git_header:
+            self._resolve_old_header()
+            self._close_diff()
+            self._start_diff(git_header.group(1), git_header.group(2), line)
+            return True
+
+        new_path = DIFF_NEW_RE.match(line)
+        if new_path and self._pending_old_header is not None:
+            old_header = self._pending_old_header
+            self._pending_old_header = None
+            if self._diff is None or self._diff.hunks:
+                self._close_diff()
+                self._start_diff(DIFF_OLD_RE.match(old_header).group(1), new_path.group(1), old_header)
+            else:
+                # File headers following a "diff --git" line
+                self._diff_lines.append(old_header)
+                self._diff.new_path = _diff_path(new_path.group(1))
+            self._diff_lines.append(line)
+            return True
+        self._resolve_old_header()
+
+        if DIFF_OLD_RE.match(line):
+            # A file header only if the next line names the new file
+            self._pending_old_header = line
+            return True
+
+        if self._diff is None:
+            return False
+        if HUNK_RE.match(line):
+            self._diff.hunks += 1
+        elif not self._diff.hunks:
+            # Extended headers between "diff --git" and the first hunk (index, mode, rename)
+            if not line.startswith(DIFF_EXTENDED_HEADERS):
+                self._close_diff()
+                return False
+        elif line.startswith("+"):
+            self._diff.additions += 1
+        elif line.startswith("-"):
+            self._diff.deletions += 1
+        elif not line.startswith((" ", "\\")) and line != "":
+            self._close_diff()
+            return False
+        self._diff_lines.append(line)
+        return True
+
+    def _resolve_old_header(self):
+        """Place a held "--- " line that turned out not to start a file diff"""
+        old_header = self._pending_old_header
+        if old_header is None:
+            return
+        self._pending_old_header = None
+        if self._diff is not None and self._diff.hunks:
+            self._diff.deletions += 1
+            self._diff_lines.append(old_header)
+        elif self._block is None:
+            self._close_diff()
+            self._process_text_line(old_header)
+
+    def _process_text_line(self, line: str):
+        finding = FINDING_RE.match(line)
+        if finding:
+            severity = finding.group(1).lower()
+            message = finding.group(2).strip().strip("*_").strip()
+            reference = FILE_REF_RE.search(message)
+            self._append(self._sections.findings, Finding(
+                severity=SEVERITY_ALIASES.get(severity, severity),
+                message=message,
+                path=reference.group(1) if reference else None,
+                line=int(reference.group(2)) if reference and reference.group(2) else None,
+                output_line=self._line_number
+            ))
+
+        for match in FILE_REF_RE.finditer(line):
+            self._add_reference(match.group(1), int(match.group(2)) if match.group(2) else None)
+
+    def _start_diff(self, old_path: str, new_path: str, header: str):
+        self._diff = DiffSection(old_path=_diff_path(old_path), new_path=_diff_path(new_path), content="")
+        self._diff_lines = [header]
+
+    def _close_diff(self):
+        if self._diff is None:
+            return
+        self._diff.content = "\n".join(self._diff_lines)
+        self._append(self._sections.diffs, self._diff)
+        for path in (self._diff.old_path, self._diff.new_path):
+            if path:
+                self._add_reference(path, None)
+        self._diff = None
+        self._diff_lines = []
+
+    def _close_block(self):
+        self._block.content = "\n".join(self._block_lines)
+        self._append(self._sections.code_blocks, self._block)
+        self._block = None
+        self._block_lines = []
+
+    def _add_reference(self, path: str, line: Optional[int]):
+        key = (path, line)
+        if key not in self._seen_references:
+            self._seen_references.add(key)
+            self._append(self._sections.file_references, FileReference(path=path, line=line))
+
+    def _append(self, items: list, item):
+        if len(items) < MAX_ITEMS:
+            items.append(item)
+        else:
+            self._sections.truncated = True
+
+
+def process_output(output: Optional[str]) -> OutputSections:
+    """Extract sections from a complete output, e.g. a result stored before sections were recorded"""
+    processor = OutputProcessor()
+    if output:
+        processor.feed(output)
+    return processor.finish()
+
+
+def _diff_path(path: str) -> Optional[str]:
+    return None if path == "/dev/null" else path
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per sampled stack; deeper frames are dropped from the outermost end
+MAX_STACK_DEPTH = 128
+
+
+class ProfileInProgress(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of every thread.
+
+    Samples are taken from a separate thread with ``sys._current_frames()``,
+    so the profiled code runs unmodified and a callback blocking the event
+    loop shows up in the loop thread's stacks. Stacks are aggregated in the
+    collapsed format read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profiles = 0
+
+    def sample(self, duration: float, interval: float, loop_thread: Optional[int] = None) -> Dict[str, Any]:
+        """Sample all threads for ``duration`` seconds (blocking; run it in a worker thread)"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfileInProgress("A profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            started = time.monotonic()
+            deadline = started + duration
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    root = names.get(thread_id, f"thread-{thread_id}")
+                    if thread_id == loop_thread:
+                        root += " (event loop)"
+                    stacks[collapse_stack(frame, root)] += 1
+                samples += 1
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(interval)
+            self.profiles += 1
+            return {
+                "duration": round(time.monotonic() - started, 3),
+                "interval": interval,
+                "samples": samples,
+                "stacks": stacks
+            }
+        finally:
+            self._lock.release()
+
+
+class LoopWatchdog:
+    """Logs what blocks the event loop.
+
+    A task on the loop records a heartbeat every ``interval`` seconds and a
+    watchdog thread checks it. When the heartbeat is older than
+    ``threshold`` the loop is stuck in a callback, so the watchdog logs the
+    loop thread's current stack, i.e. the code doing the blocking, once per
+    stall. How long each stall lasted is recorded when the loop resumes.
+    """
+
+    def __init__(self, threshold: float):
+        self.logger = logging.getLogger(f"{__name__}.LoopWatchdog")
+        self.threshold = threshold
+        self.interval = min(threshold / 2, 0.1)
+        self.loop_thread: Optional[int] = None
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.last_stall: Optional[Dict[str, Any]] = None
+        self._beat = time.monotonic()
+        self._reported = False
+        self._stopped = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self):
+        self.loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Watching the event loop for callbacks blocking it over {self.threshold}s")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "stalls": self.stalls,
+            "max_lag": round(self.max_lag, 3),
+            "current_lag": round(max(time.monotonic() - self._beat - self.interval, 0.0), 3),
+            "last_stall": self.last_stall
+        }
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = now - self._beat - self.interval
+            self._beat = now
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self.stalls += 1
+                if not self._reported:
+                    # Too short for the watchdog to catch it in the act
+                    self.last_stall = {"at": time.time(), "stack": None}
+                self.last_stall["lag"] = round(lag, 3)
+                self.logger.warning(f"Event loop was blocked for {lag:.3f}s")
+            self._reported = False
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            stalled = time.monotonic() - self._beat - self.interval
+            if stalled < self.threshold or self._reported:
+                continue
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame, limit=MAX_STACK_DEPTH)
+            self.last_stall = {"at": time.time(), "stack": collapse_stack(frame, "event loop")}
+            self._reported = True
+            self.logger.warning(
+                f"Event loop blocked for {stalled:.3f}s so far, in:\n{''.join(stack).rstrip()}"
+            )
+
+
+def collapse_stack(frame, root: str) -> str:
+    """``root;outer;...;inner`` with one ``function (file:line)`` entry per frame"""
+    names: List[str] = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(root)
+    # Semicolons separate frames in the collapsed format
+    return ";".join(name.replace(";", ":") for name in reversed(names))
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """One ``stack count`` line per distinct stack, for flamegraph tools"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def task_stacks(limit: int = 20) -> List[Dict[str, Any]]:
+    """Where each asyncio task of the running loop is suspended (call on the loop)"""
+    tasks = []
+    for task in asyncio.all_tasks():
+        frames = task.get_stack(limit=limit)
+        tasks.append({
+            "name": task.get_name(),
+            "stack": [
+                f"{frame.f_code.co_name} ({_short_path(frame.f_code.co_filename)}:{frame.f_lineno})"
+                for frame in frames
+            ]
+        })
+    return tasks
+
+
+def _short_path(path: str) -> str:
+    parts = path.replace(os.sep, "/").split("/")
+    return "/".join(parts[-2:])
@@ -0,0 +1,360 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import subprocess
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.job import JobRequest
+
+logger = logging.getLogger(__name__)
+
+# Symbol definitions per source file extension; every group that matches is a symbol name
+SYMBOL_PATTERNS = {
+    ".py": re.compile(r"^\s*(?:async\s+)?(?:def|class)\s+(\w+)"),
+    ".js": re.compile(
+        r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?"
+        r"(?:function\s*\*?\s*(\w+)|class\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s*)?(?:\(|function))"
+    ),
+    ".ts": re.compile(
+        r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(?:async\s+)?"
+        r"(?:function\s*\*?\s*(\w+)|class\s+(\w+)|interface\s+(\w+)|type\s+(\w+)\s*=|enum\s+(\w+)|"
+        r"(?:const|let)\s+(\w+)\s*=\s*(?:async\s*)?\()"
+    ),
+    ".go": re.compile(r"^(?:func\s+(?:\([^)]*\)\s*)?(\w+)|type\s+(\w+))"),
+    ".rs": re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:fn|struct|enum|trait)\s+(\w+)"),
+    ".java": re.compile(
+        r"^\s*(?:(?:public|private|protected|internal|static|final|abstract|sealed|data|open)\s+)*"
+        r"(?:class|interface|enum|record|object)\s+(\w+)"
+    ),
+    ".rb": re.compile(r"^\s*(?:def|class|module)\s+([\w.?!]+)"),
+}
+SYMBOL_PATTERNS[".jsx"] = SYMBOL_PATTERNS[".mjs"] = SYMBOL_PATTERNS[".js"]
+SYMBOL_PATTERNS[".tsx"] = SYMBOL_PATTERNS[".ts"]
+SYMBOL_PATTERNS[".kt"] = SYMBOL_PATTERNS[".cs"] = SYMBOL_PATTERNS[".java"]
+
+# Files larger than this are listed in the layout but not scanned for symbols
+MAX_SYMBOL_FILE_BYTES = 256 * 1024
+# Upper bound on source bytes read per commit when building the symbol index
+MAX_SYMBOL_SCAN_BYTES = 32 * 1024 * 1024
+RECENT_COMMITS = 30
+MAX_RECENT_FILES = 20
+LAYOUT_ENTRIES = 40
+EXCERPT_FILES = 3
+EXCERPT_LINES = 20
+
+KEYWORD_RE = re.compile(r"[A-Za-z_][\w./-]{3,}")
+STOPWORDS = {
+    "this", "that", "with", "from", "into", "when", "then", "than", "should", "would", "could", "have", "make",
+    "sure", "also", "each", "them", "they", "there", "their", "which", "what", "where", "while", "about", "after",
+    "before", "code", "file", "files", "function", "class", "method", "issue", "task", "please", "implement",
+    "update", "change", "changes", "support", "using", "used", "need", "needs", "only", "must", "test", "tests",
+}
+
+
+class RepoContextCache:
+    """Repository context injected into job prompts, built once per (repository, commit).
+
+    The layout summary, symbol index and recently changed files depend only
+    on the commit, so they are computed on first use, kept in memory (LRU)
+    and on disk under ``<jobs>/context``, and shared by every job and role
+    that runs against the same commit. Excerpts relevant to a job's task are
+    picked from the cached symbol index per job.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(f"{__name__}.RepoContextCache")
+        self.directory = os.path.join(settings.jobs_storage_path, "context")
+        self._memory: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._building: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def prompt_context(self, request: JobRequest, working_dir: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Prompt section and metadata for a job, or None when the working directory is not a git checkout"""
+        loop = asyncio.get_running_loop()
+        commit = await loop.run_in_executor(None, _resolve_commit, working_dir, request.context.commit_sha)
+        if commit is None:
+            self.logger.debug(f"No repository context for {request.context.repository}: {working_dir} is not a git checkout")
+            return None
+
+        started = time.monotonic()
+        context, cache_hit = await self._get(request.context.repository, commit, working_dir)
+        keywords = _keywords(" ".join([request.task.description] + (request.task.requirements or [])))
+        excerpts = await loop.run_in_executor(None, _excerpts, working_dir, context, keywords)
+        text = render_context(context, excerpts, settings.repo_context_max_chars)
+        return text, {
+            "commit": commit,
+            "cache_hit": cache_hit,
+            "chars": len(text),
+            "excerpts": [excerpt["path"] for excerpt in excerpts],
+            "seconds": round(time.monotonic() - started, 3)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.repo_context_enabled,
+            "directory": self.directory,
+            "cached_commits": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    async def _get(self, repository: str, commit: str, working_dir: str) -> Tuple[Dict[str, Any], bool]:
+        key = (repository, commit)
+        context = self._memory.get(key)
+        if context is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return context, True
+
+        # Jobs starting together on the same commit wait for a single build
+        building = self._building.get(key)
+        if building is not None:
+            self.hits += 1
+            return await asyncio.shield(building), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            context, cache_hit = await asyncio.get_running_loop().run_in_executor(
+                None, self._load_or_build, repository, commit, working_dir
+            )
+            future.set_result(context)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved so a failure no other job waited for is not logged again by asyncio
+            future.exception()
+            raise
+        finally:
+            del self._building[key]
+
+        if cache_hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._memory[key] = context
+        while len(self._memory) > settings.repo_context_cache_size:
+            self._memory.popitem(last=False)
+        return context, cache_hit
+
+    def _cache_path(self, repository: str, commit: str) -> str:
+        return os.path.join(self.directory, repository.replace("/", "__"), f"{commit}.json")
+
+    def _load_or_build(self, repository: str, commit: str, working_dir: str) -> Tuple[Dict[str, Any], bool]:
+        """Cached context of a commit from disk, building and storing it if missing (runs in a worker thread)"""
+        path = self._cache_path(repository, commit)
+        try:
+            with open(path, "r") as f:
+                context = json.load(f)
+            # Modification time orders the files for pruning, most recently used last
+            os.utime(path)
+            return context, True
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            self.logger.warning(f"Rebuilding unreadable repository context {path}: {e}")
+
+        started = time.monotonic()
+        context = build_context(working_dir, repository, commit)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(context, f)
+        os.replace(temp_path, path)
+        self._prune(os.path.dirname(path))
+        self.logger.info(
+            f"Built repository context for {repository}@{commit[:12]} "
+            f"({context['file_count']} files) in {time.monotonic() - started:.1f}s"
+        )
+        return context, False
+
+    def _prune(self, directory: str):
+        """Delete the least recently used contexts of a repository beyond REPO_CONTEXT_DISK_COMMITS"""
+        entries = []
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(directory, name)), name))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, name in entries[:max(len(entries) - settings.repo_context_disk_commits, 0)]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def build_context(working_dir: str, repository: str, commit: str) -> Dict[str, Any]:
+    """Layout, symbol index and recently changed files of a commit"""
+    entries = _git(working_dir, "ls-tree", "-r", "-l", "-z", commit).split("\0")
+    sizes: Dict[str, int] = {}
+    for entry in entries:
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        size = meta.split()[3]
+        sizes[path] = int(size) if size.isdigit() else 0
+
+    recent = []
+    log = _git(working_dir, "log", f"-{RECENT_COMMITS}", "--name-only", "--pretty=format:", commit)
+    for path in log.splitlines():
+        if path and path in sizes and path not in recent:
+            recent.append(path)
+            if len(recent) >= MAX_RECENT_FILES:
+                break
+
+    return {
+        "repository": repository,
+        "commit": commit,
+        "built_at": time.time(),
+        "file_count": len(sizes),
+        "layout": _layout(sizes),
+        "recent_files": recent,
+        "symbols": _symbols(working_dir, commit, sizes)
+    }
+
+
+def render_context(context: Dict[str, Any], excerpts: List[Dict[str, Any]], max_chars: int) -> str:
+    """Prompt section for a cached context, cut to ``max_chars``"""
+    lines = [f"Repository context (commit {context['commit'][:12]}, {context['file_count']} files):", "Layout:"]
+    lines.extend(f"  {entry}" for entry in context["layout"])
+    if context["recent_files"]:
+        lines.append("Recently changed files:")
+        lines.extend(f"  - {path}" for path in context["recent_files"])
+    for excerpt in excerpts:
+        lines.append(f"Excerpt from {excerpt['path']} (line {excerpt['line']}):")
+        lines.append(excerpt["text"])
+    lines.append("Symbols:")
+
+    text = "\n".join(lines)
+    for path, symbols in context["symbols"].items():
+        line = f"\n  {path}: {', '.join(name for name, _ in symbols)}"
+        if len(text) + len(line) > max_chars:
+            text += "\n  [symbol index truncated]"
+            break
+        text += line
+    return text[:max_chars]
+
+
+def _resolve_commit(working_dir: str, commit_sha: Optional[str]) -> Optional[str]:
+    """Full SHA of the requested commit, or of HEAD when it is not given or not fetched"""
+    for revision in ([commit_sha] if commit_sha else []) + ["HEAD"]:
+        try:
+            return _git(working_dir, "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}").strip()
+        except (OSError, subprocess.CalledProcessError):
+            continue
+    return None
+
+
+def _git(working_dir: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", working_dir, *args], check=True, capture_output=True, timeout=60
+    ).stdout.decode("utf-8", errors="replace")
+
+
+def _layout(sizes: Dict[str, int]) -> List[str]:
+    """Top-level entries with file counts and their most common extensions"""
+    directories: Dict[str, Counter] = {}
+    top_files = []
+    for path in sizes:
+        if "/" in path:
+            directory = path.split("/", 1)[0]
+            directories.setdefault(directory, Counter())[os.path.splitext(path)[1] or "(none)"] += 1
+        else:
+            top_files.append(path)
+
+    entries = []
+    for directory, extensions in sorted(directories.items(), key=lambda item: -sum(item[1].values())):
+        common = ", ".join(f"{count} {extension}" for extension, count in extensions.most_common(3))
+        entries.append(f"{directory}/ ({sum(extensions.values())} files: {common})")
+    entries.extend(sorted(top_files))
+    if len(entries) > LAYOUT_ENTRIES:
+        entries = entries[:LAYOUT_ENTRIES] + [f"... {len(entries) - LAYOUT_ENTRIES} more entries"]
+    return entries
+
+
+def _symbols(working_dir: str, commit: str, sizes: Dict[str, int]) -> Dict[str, List[List[Any]]]:
+    """Definitions per source file as [name, line] pairs, read in one ``git cat-file --batch`` pass"""
+    paths = []
+    budget = MAX_SYMBOL_SCAN_BYTES
+    for path, size in sorted(sizes.items()):
+        if os.path.splitext(path)[1] in SYMBOL_PATTERNS and size <= MAX_SYMBOL_FILE_BYTES and size <= budget:
+            paths.append(path)
+            budget -= size
+    if not paths:
+        return {}
+
+    output = subprocess.run(
+        ["git", "-C", working_dir, "cat-file", "--batch"],
+        input="".join(f"{commit}:{path}\n" for path in paths).encode("utf-8"),
+        check=True, capture_output=True, timeout=120
+    ).stdout
+
+    symbols: Dict[str, List[List[Any]]] = {}
+    position = 0
+    for path in paths:
+        header_end = output.index(b"\n", position)
+        header = output[position:header_end].split()
+        position = header_end + 1
+        if len(header) < 3 or header[1] != b"blob":
+            continue
+        size = int(header[2])
+        content = output[position:position + size].decode("utf-8", errors="replace")
+        position += size + 1
+
+        pattern = SYMBOL_PATTERNS[os.path.splitext(path)[1]]
+        found = []
+        for number, line in enumerate(content.splitlines(), 1):
+            match = pattern.match(line)
+            if match:
+                name = next((group for group in match.groups() if group), None)
+                if name:
+                    found.append([name, number])
+        if found:
+            symbols[path] = found
+    return symbols
+
+
+def _keywords(text: str) -> List[str]:
+    return sorted({
+        word.strip("./-").lower() for word in KEYWORD_RE.findall(text)
+        if word.strip("./-").lower() not in STOPWORDS and len(word.strip("./-")) >= 4
+    })
+
+
+def _excerpts(working_dir: str, context: Dict[str, Any], keywords: List[str]) -> List[Dict[str, Any]]:
+    """Source around the symbols and files the task text mentions (runs in a worker thread)"""
+    if not keywords:
+        return []
+
+    scored = []
+    for path, symbols in context["symbols"].items():
+        lowered = path.lower()
+        score = sum(3 for keyword in keywords if keyword in lowered)
+        best_line, best_score = symbols[0][1], 0
+        for name, number in symbols:
+            name = name.lower()
+            symbol_score = sum(5 if keyword == name else 1 for keyword in keywords if keyword in name)
+            if symbol_score > best_score:
+                best_line, best_score = number, symbol_score
+        score += best_score
+        if score:
+            scored.append((score, path, best_line if best_score else 1))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    excerpts = []
+    for _, path, line in scored[:EXCERPT_FILES]:
+        try:
+            content = _git(working_dir, "show", f"{context['commit']}:{path}").splitlines()
+        except (OSError, subprocess.CalledProcessError):
+            continue
+        start = max(0, line - 3)
+        excerpts.append({"path": path, "line": start + 1, "text": "\n".join(content[start:start + EXCERPT_LINES])})
+    return excerpts
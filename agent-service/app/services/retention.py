@@ -0,0 +1,309 @@
+import asyncio
+import fcntl
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.job import JobRecord, JobResult, JobStatus
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived (
+    job_id TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    archived_at REAL NOT NULL
+);
+"""
+
+
+class JobArchive:
+    """Archived jobs in compressed segment files with a SQLite index by job ID.
+
+    Each job is one gzip member appended to the current segment, so a
+    segment is a regular .gz file (``zcat`` prints one JSON record per line)
+    and the index can seek straight to a single job.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int):
+        self.logger = logging.getLogger(f"{__name__}.JobArchive")
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, "index.db"), timeout=10.0, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(ARCHIVE_SCHEMA)
+        # Totals for get_stats, kept current by append so stats never touch the disk
+        self.archived_jobs = self.db.execute("SELECT COUNT(*) FROM archived").fetchone()[0]
+        self.segment_sizes = {
+            name: os.path.getsize(os.path.join(directory, name)) for name in self._segments()
+        }
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Write job records ({"job_id", "info", "request", "result"}) and index them"""
+        if not records:
+            return
+        segment = self._current_segment()
+        path = os.path.join(self.directory, segment)
+        rows = []
+        with open(path, "ab") as f:
+            for record in records:
+                member = gzip.compress(json.dumps(record, default=str).encode("utf-8") + b"\n")
+                offset = f.tell()
+                f.write(member)
+                info = record["info"]
+                rows.append((
+                    record["job_id"], segment, offset, len(member), info["status"],
+                    info["created_at"], info.get("completed_at"), time.time()
+                ))
+            f.flush()
+            # Originals are deleted once this returns, so the data must be on disk first
+            os.fsync(f.fileno())
+            size = f.tell()
+
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO archived VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.archived_jobs = self.db.execute("SELECT COUNT(*) FROM archived").fetchone()[0]
+            # Replaced rather than updated, so get_stats can iterate it from the event loop
+            self.segment_sizes = {**self.segment_sizes, segment: size}
+
+    def read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Archived record of a job, or None"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT segment, offset, length FROM archived WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        segment, offset, length = row
+        try:
+            with open(os.path.join(self.directory, segment), "rb") as f:
+                f.seek(offset)
+                return json.loads(gzip.decompress(f.read(length)))
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error reading archived job {job_id} from {segment}: {e}")
+            return None
+
+    def contains(self, job_id: str) -> bool:
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM archived WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Archive totals as of this instance's last write"""
+        return {
+            "directory": self.directory,
+            "archived_jobs": self.archived_jobs,
+            "segments": len(self.segment_sizes),
+            "bytes": sum(self.segment_sizes.values())
+        }
+
+    def _segments(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("segment-") and name.endswith(".jsonl.gz"))
+
+    def _current_segment(self) -> str:
+        segments = self._segments()
+        if segments:
+            latest = segments[-1]
+            if os.path.getsize(os.path.join(self.directory, latest)) < self.segment_max_bytes:
+                return latest
+            number = int(latest[len("segment-"):-len(".jsonl.gz")]) + 1
+        else:
+            number = 1
+        return f"segment-{number:06d}.jsonl.gz"
+
+
+def read_archived_job(archive: JobArchive, job_id: str) -> Optional[Tuple[JobRecord, Optional[JobResult]]]:
+    """Parse an archived job into its info and result (runs in a worker thread)"""
+    record = archive.read(job_id)
+    if record is None:
+        return None
+    job_info = JobRecord.from_dict(record["info"])
+    job_result = JobResult(**record["result"]) if record.get("result") else None
+    if job_result is not None:
+        # Jobs archived before their info was corrected still carry the status they were created with
+        job_info.status = job_result.status
+        job_info.started_at = job_result.started_at
+        job_info.completed_at = job_result.completed_at
+    return job_info, job_result
+
+
+class RetentionManager:
+    """Periodically moves finished jobs out of the jobs directory into the archive.
+
+    A job is archived once it is older than the maximum age for its status,
+    or when more finished jobs are stored than RETENTION_MAX_JOBS (oldest
+    first). Its info, request and result files and its run directory are
+    deleted after the archive write is on disk, and the job manager drops it
+    from memory; reads by job ID fall back to the archive.
+    """
+
+    def __init__(self, job_manager):
+        self.logger = logging.getLogger(f"{__name__}.RetentionManager")
+        self.job_manager = job_manager
+        self.archive: JobArchive = job_manager.archive
+        self.runs = 0
+        self.archived_total = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start applying retention in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> int:
+        """Archive the jobs the policy selects now; returns how many were archived"""
+        candidates = self.select(await self.job_manager.list_jobs(), datetime.utcnow())
+        if not candidates:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        archived = await loop.run_in_executor(None, self._archive_jobs, candidates)
+        await self.job_manager.forget_jobs(archived)
+        self.archived_total += len(archived)
+        if archived:
+            self.logger.info(f"Archived {len(archived)} finished jobs")
+        return len(archived)
+
+    def select(self, jobs: List[JobRecord], now: datetime) -> List[str]:
+        """IDs of finished jobs due for archiving under the configured policy.
+
+        Jobs that waiting jobs still depend on are kept, so their results are
+        at hand when the dependent runs.
+        """
+        now_ts = now.replace(tzinfo=timezone.utc).timestamp()
+        needed = set(self.job_manager.dependents)
+        for unmet, _ in self.job_manager.waiting.values():
+            needed.update(unmet)
+        finished = sorted(
+            (job_info for job_info in jobs
+             if job_info.status in FINAL_STATUSES
+             and job_info.job_id not in self.job_manager.running_tasks
+             and job_info.job_id not in needed),
+            key=lambda job_info: job_info.completed or job_info.created,
+            reverse=True
+        )
+
+        selected = []
+        for index, job_info in enumerate(finished):
+            if settings.retention_max_jobs is not None and index >= settings.retention_max_jobs:
+                selected.append(job_info.job_id)
+                continue
+            max_age = settings.retention_status_max_age_days.get(job_info.status.value, settings.retention_max_age_days)
+            if max_age is not None and now_ts - (job_info.completed or job_info.created) > max_age * 86400:
+                selected.append(job_info.job_id)
+        return selected
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "interval": settings.retention_interval,
+            "max_age_days": settings.retention_max_age_days,
+            "status_max_age_days": settings.retention_status_max_age_days,
+            "max_jobs": settings.retention_max_jobs,
+            "runs": self.runs,
+            "archived": self.archived_total,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.retention_interval)
+            try:
+                await self.run_once()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                self.logger.error(f"Error applying job retention: {e}", exc_info=True)
+            self.runs += 1
+            self.last_run_at = datetime.utcnow()
+
+    def _archive_jobs(self, job_ids: List[str]) -> List[str]:
+        """Move jobs from the jobs directory into the archive (runs in a worker thread)"""
+        jobs_dir = os.path.join(settings.jobs_storage_path, "jobs")
+        runs_dir = os.path.join(settings.jobs_storage_path, "runs")
+
+        with open(os.path.join(self.archive.directory, ".lock"), "w") as lock:
+            try:
+                # Instances sharing the jobs directory take turns
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.logger.info("Another instance is archiving jobs; skipping this run")
+                return []
+
+            archived = []
+            batch_size = max(1, settings.hydration_batch_size)
+            for offset in range(0, len(job_ids), batch_size):
+                records = []
+                for job_id in job_ids[offset:offset + batch_size]:
+                    record = _read_job_files(jobs_dir, job_id)
+                    if record is not None:
+                        records.append(record)
+                self.archive.append(records)
+
+                for record in records:
+                    job_id = record["job_id"]
+                    for suffix in ("info", "request", "result"):
+                        try:
+                            os.remove(os.path.join(jobs_dir, f"{job_id}_{suffix}.json"))
+                        except FileNotFoundError:
+                            pass
+                    shutil.rmtree(os.path.join(runs_dir, job_id), ignore_errors=True)
+                    archived.append(job_id)
+            return archived
+
+
+def _read_job_files(jobs_dir: str, job_id: str) -> Optional[Dict[str, Any]]:
+    record: Dict[str, Any] = {"job_id": job_id}
+    for suffix in ("info", "request", "result"):
+        try:
+            with open(os.path.join(jobs_dir, f"{job_id}_{suffix}.json"), "r") as f:
+                record[suffix] = json.load(f)
+        except FileNotFoundError:
+            record[suffix] = None
+        except ValueError as e:
+            logger.warning(f"Not archiving job {job_id}: unreadable {suffix} file ({e})")
+            return None
+    # Archived already by another instance, or never written
+    if record["info"] is None:
+        return None
+    if record["result"] is not None:
+        # Info files are written at creation; the result holds the final state
+        for field in ("status", "started_at", "completed_at"):
+            if field in record["result"]:
+                record["info"][field] = record["result"][field]
+    return record
@@ -0,0 +1,85 @@
+import random
+import re
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.models.job import JobResult
+
+# Only the tail of stderr is scanned; CLI errors are printed last
+CLASSIFY_TAIL_CHARS = 8192
+
+
+class FailureKind(str, Enum):
+    TRANSIENT = "transient"
+    PERMANENT = "permanent"
+
+
+class RetryPolicy:
+    """Retry limits and exponential backoff for one role and task type"""
+
+    def __init__(
+        self,
+        max_attempts: int = 1,
+        backoff_base: float = 30.0,
+        backoff_multiplier: float = 2.0,
+        backoff_max: float = 600.0,
+        jitter: float = 0.2
+    ):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = float(backoff_base)
+        self.backoff_multiplier = float(backoff_multiplier)
+        self.backoff_max = float(backoff_max)
+        self.jitter = min(max(float(jitter), 0.0), 1.0)
+
+    @classmethod
+    def for_job(cls, role: str, task_type: str) -> "RetryPolicy":
+        """Build the policy configured for a role and task type in roles.yml"""
+        config = settings.get_retry_config(role, task_type)
+        known = ("max_attempts", "backoff_base", "backoff_multiplier", "backoff_max", "jitter")
+        return cls(**{key: config[key] for key in known if key in config})
+
+    def should_retry(self, attempts: int, kind: FailureKind) -> bool:
+        return kind == FailureKind.TRANSIENT and attempts < self.max_attempts
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Seconds to wait before the attempt following ``attempts`` failed ones"""
+        delay = min(self.backoff_max, self.backoff_base * self.backoff_multiplier ** max(attempts - 1, 0))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def classify_failure(result: JobResult) -> FailureKind:
+    """Decide whether a failed job is worth retrying.
+
+    Permanent patterns win over transient ones; timeouts and the configured
+    CLI exit codes count as transient, anything unrecognised as permanent.
+    """
+    config = settings.get_failure_classification()
+    text = (result.error or "")[-CLASSIFY_TAIL_CHARS:]
+
+    if _matches_any(config.get("permanent_patterns", []), text):
+        return FailureKind.PERMANENT
+    if _matches_any(config.get("transient_patterns", []), text):
+        return FailureKind.TRANSIENT
+
+    if "timeout" in result.metadata and config.get("timeouts_are_transient", True):
+        return FailureKind.TRANSIENT
+    if result.metadata.get("returncode") in config.get("transient_returncodes", []):
+        return FailureKind.TRANSIENT
+
+    return FailureKind.PERMANENT
+
+
+def _matches_any(patterns: List[str], text: str) -> bool:
+    return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+
+
+def describe_attempt(attempt: int, result: JobResult, kind: FailureKind, delay: Optional[float] = None) -> Dict[str, Any]:
+    """Summary of a failed attempt kept in the final result's metadata"""
+    return {
+        "attempt": attempt,
+        "classification": kind.value,
+        "error": (result.error or "")[:500],
+        "returncode": result.metadata.get("returncode"),
+        "retry_delay": delay
+    }
@@ -0,0 +1,252 @@
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.job import JobPriority, JobRequest
+
+PRIORITY_RANK = {
+    JobPriority.HIGH: 0,
+    JobPriority.NORMAL: 1,
+    JobPriority.LOW: 2,
+}
+
+# Number of recent queue waits kept per tenant for percentile reporting
+WAIT_SAMPLE_SIZE = 200
+
+
+class QueuedJob:
+    """A pending job waiting for a concurrency slot"""
+
+    __slots__ = ("job_id", "request", "repository", "role", "priority", "enqueued_at")
+
+    def __init__(self, job_id: str, request: JobRequest):
+        self.job_id = job_id
+        self.request = request
+        self.repository = request.context.repository
+        self.role = request.role
+        self.priority = request.task.priority
+        self.enqueued_at = time.monotonic()
+
+
+class TenantQueue:
+    """Pending jobs and accounting for one (repository, role) tenant"""
+
+    def __init__(self, repository: str, role: str):
+        self.repository = repository
+        self.role = role
+        self.heap: List[Tuple[int, int, str]] = []
+        self.virtual_time = 0.0
+        self.running = 0
+        self.dispatched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    @property
+    def weight(self) -> float:
+        return settings.get_repository_weight(self.repository) * settings.get_role_weight(self.role)
+
+    def record_wait(self, wait: float):
+        self.dispatched += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent_waits.append(wait)
+
+    def wait_percentile(self, percentile: float) -> Optional[float]:
+        if not self.recent_waits:
+            return None
+        ordered = sorted(self.recent_waits)
+        index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class FairScheduler:
+    """Weighted fair queuing of pending jobs across repositories and roles.
+
+    Every (repository, role) pair is a tenant with its own queue, ordered by
+    task priority and then arrival. Each dispatch charges the tenant
+    ``1 / weight`` of virtual time and the backlogged tenant with the least
+    virtual time that still fits under its repository and role caps runs
+    next, so a burst from one repository cannot starve the others.
+    """
+
+    def __init__(self):
+        self.tenants: Dict[Tuple[str, str], TenantQueue] = {}
+        self.queued: Dict[str, QueuedJob] = {}
+        self.running: Dict[str, QueuedJob] = {}
+        self.running_by_repository: Dict[str, int] = {}
+        self.running_by_role: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._virtual_clock = 0.0
+
+    def enqueue(self, job_id: str, request: JobRequest):
+        """Add a pending job to its tenant queue"""
+        entry = QueuedJob(job_id, request)
+        tenant = self._get_tenant(entry.repository, entry.role)
+
+        if not tenant.heap:
+            # A tenant returning from idle must not bank credit for the time it was away
+            tenant.virtual_time = max(tenant.virtual_time, self._virtual_clock)
+
+        heapq.heappush(tenant.heap, (PRIORITY_RANK[entry.priority], next(self._sequence), job_id))
+        self.queued[job_id] = entry
+
+    def remove(self, job_id: str) -> bool:
+        """Remove a pending job from the queue"""
+        entry = self.queued.pop(job_id, None)
+        if entry is None:
+            return False
+
+        tenant = self.tenants[(entry.repository, entry.role)]
+        tenant.heap = [item for item in tenant.heap if item[2] != job_id]
+        heapq.heapify(tenant.heap)
+        return True
+
+    def next_job(self) -> Optional[QueuedJob]:
+        """Pop the next job allowed to run, or None if nothing is eligible"""
+        candidate: Optional[TenantQueue] = None
+        for tenant in self.tenants.values():
+            if not tenant.heap or not self._has_capacity(tenant):
+                continue
+            if candidate is None or tenant.virtual_time < candidate.virtual_time:
+                candidate = tenant
+
+        if candidate is None:
+            return None
+
+        _, _, job_id = heapq.heappop(candidate.heap)
+        entry = self.queued.pop(job_id)
+
+        self._virtual_clock = candidate.virtual_time
+        candidate.virtual_time += 1.0 / max(candidate.weight, 1e-6)
+        candidate.record_wait(time.monotonic() - entry.enqueued_at)
+        self._mark_running(entry, candidate)
+        return entry
+
+    def adopt(self, job_id: str, request: JobRequest):
+        """Count a job that is already running (re-attached after a restart) against its caps"""
+        entry = QueuedJob(job_id, request)
+        self._mark_running(entry, self._get_tenant(entry.repository, entry.role))
+
+    def release(self, job_id: str):
+        """Free the concurrency slot held by a finished job"""
+        entry = self.running.pop(job_id, None)
+        if entry is None:
+            return
+
+        self.tenants[(entry.repository, entry.role)].running -= 1
+        self.running_by_repository[entry.repository] -= 1
+        self.running_by_role[entry.role] -= 1
+
+    def jobs_ahead_of(self, job_id: str) -> List[QueuedJob]:
+        """Queued jobs expected to be dispatched before ``job_id``.
+
+        Replays the fair-queuing order on copies of the tenant queues,
+        ignoring capacity caps.
+        """
+        if job_id not in self.queued:
+            return []
+
+        queues = {key: [item[2] for item in sorted(tenant.heap)] for key, tenant in self.tenants.items() if tenant.heap}
+        clocks = {key: self.tenants[key].virtual_time for key in queues}
+        weights = {key: self.tenants[key].weight for key in queues}
+        return [self.queued[ahead_id] for ahead_id in replay_fair_order(queues, clocks, weights, job_id)]
+
+    def get_queued(self, job_id: str) -> Optional[QueuedJob]:
+        return self.queued.get(job_id)
+
+    def get_running(self, job_id: str) -> Optional[QueuedJob]:
+        return self.running.get(job_id)
+
+    def running_entries(self) -> List[QueuedJob]:
+        return list(self.running.values())
+
+    def is_queued(self, job_id: str) -> bool:
+        return job_id in self.queued
+
+    @property
+    def running_count(self) -> int:
+        return len(self.running)
+
+    @property
+    def queued_count(self) -> int:
+        return len(self.queued)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-tenant queue depth, running jobs and queue wait times"""
+        now = time.monotonic()
+        stats = []
+        for tenant in self.tenants.values():
+            oldest_wait = None
+            if tenant.heap:
+                oldest_wait = max(now - self.queued[job_id].enqueued_at for _, _, job_id in tenant.heap)
+
+            stats.append({
+                "repository": tenant.repository,
+                "role": tenant.role,
+                "weight": tenant.weight,
+                "queued": len(tenant.heap),
+                "running": tenant.running,
+                "dispatched": tenant.dispatched,
+                "queue_wait": {
+                    "average_seconds": tenant.total_wait / tenant.dispatched if tenant.dispatched else None,
+                    "p95_seconds": tenant.wait_percentile(0.95),
+                    "max_seconds": tenant.max_wait if tenant.dispatched else None,
+                    "oldest_queued_seconds": oldest_wait
+                }
+            })
+        return stats
+
+    def _get_tenant(self, repository: str, role: str) -> TenantQueue:
+        key = (repository, role)
+        tenant = self.tenants.get(key)
+        if tenant is None:
+            tenant = TenantQueue(repository, role)
+            self.tenants[key] = tenant
+        return tenant
+
+    def _has_capacity(self, tenant: TenantQueue) -> bool:
+        repository_limit = settings.get_repository_concurrency(tenant.repository)
+        if repository_limit is not None and self.running_by_repository.get(tenant.repository, 0) >= repository_limit:
+            return False
+
+        role_limit = settings.get_role_concurrency(tenant.role)
+        if role_limit is not None and self.running_by_role.get(tenant.role, 0) >= role_limit:
+            return False
+
+        return True
+
+    def _mark_running(self, entry: QueuedJob, tenant: TenantQueue):
+        self.running[entry.job_id] = entry
+        tenant.running += 1
+        self.running_by_repository[tenant.repository] = self.running_by_repository.get(tenant.repository, 0) + 1
+        self.running_by_role[tenant.role] = self.running_by_role.get(tenant.role, 0) + 1
+
+
+def replay_fair_order(
+    queues: Dict[Tuple[str, str], List[str]],
+    clocks: Dict[Tuple[str, str], float],
+    weights: Dict[Tuple[str, str], float],
+    job_id: str
+) -> List[str]:
+    """IDs dispatched before ``job_id`` given per-tenant queues in dispatch order"""
+    clocks = dict(clocks)
+    positions = {key: 0 for key in queues}
+    queues = {key: ids for key, ids in queues.items() if ids}
+
+    ahead: List[str] = []
+    while queues:
+        key = min(queues, key=lambda k: clocks[k])
+        next_id = queues[key][positions[key]]
+        if next_id == job_id:
+            break
+
+        ahead.append(next_id)
+        clocks[key] += 1.0 / max(weights[key], 1e-6)
+        positions[key] += 1
+        if positions[key] == len(queues[key]):
+            del queues[key]
+    return ahead
@@ -0,0 +1,178 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.job import JobRecord, JobRequest, JobResult, JobSearchHit, JobStatus
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_meta (
+    rowid INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL UNIQUE,
+    role TEXT NOT NULL,
+    repository TEXT,
+    task_type TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS job_meta_filters ON job_meta (repository, role, status);
+CREATE VIRTUAL TABLE IF NOT EXISTS job_text USING fts5(description, requirements, output, logs);
+"""
+
+# Tokens of context around the matched terms in search snippets
+SNIPPET_TOKENS = 16
+
+
+class SearchIndex:
+    """Full-text index over job descriptions, requirements, outputs and logs (SQLite FTS5).
+
+    Jobs are indexed when created and again when their result is saved, so
+    searching never reads the job files. ``job_meta`` holds the filterable
+    fields and shares its rowid with the FTS row of the same job.
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(f"{__name__}.SearchIndex")
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # Raises sqlite3.OperationalError when SQLite was built without FTS5
+        self.db.executescript(SEARCH_SCHEMA)
+        # Kept by index_job so get_stats never waits for the lock held while indexing
+        self.indexed_jobs = self.db.execute("SELECT COUNT(*) FROM job_meta").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def index_job(self, job_info: JobRecord, request: Optional[JobRequest], result: Optional[JobResult] = None):
+        """Add or replace a job's entry"""
+        requirements = ""
+        repository = None
+        if request is not None:
+            repository = request.context.repository
+            requirements = "\n".join((request.task.requirements or []) + (request.task.constraints or []))
+        output = logs = ""
+        if result is not None:
+            output = "\n".join(part for part in (result.output, result.error) if part)
+            logs = "\n".join(result.logs)
+            repository = repository or result.metadata.get("repository")
+
+        with self._lock, self.db:
+            row = self.db.execute("SELECT rowid FROM job_meta WHERE job_id = ?", (job_info.job_id,)).fetchone()
+            if row is not None:
+                self.db.execute("DELETE FROM job_text WHERE rowid = ?", row)
+                self.db.execute("DELETE FROM job_meta WHERE rowid = ?", row)
+            cursor = self.db.execute(
+                "INSERT INTO job_meta (job_id, role, repository, task_type, status, created_at, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_info.job_id, job_info.role, repository,
+                    request.task.type.value if request is not None else (result.task_type.value if result else None),
+                    job_info.status.value, job_info.created_at.isoformat(),
+                    job_info.completed_at.isoformat() if job_info.completed_at else None
+                )
+            )
+            self.db.execute(
+                "INSERT INTO job_text (rowid, description, requirements, output, logs) VALUES (?, ?, ?, ?, ?)",
+                (cursor.lastrowid, job_info.task_description, requirements, output, logs)
+            )
+            if row is None:
+                self.indexed_jobs += 1
+
+    def index_result(self, job_info: JobRecord, result: JobResult):
+        """Add a finished job's output and logs to its entry"""
+        with self._lock:
+            row = self.db.execute("SELECT rowid FROM job_meta WHERE job_id = ?", (job_info.job_id,)).fetchone()
+        if row is None:
+            self.index_job(job_info, None, result)
+            return
+
+        with self._lock, self.db:
+            self.db.execute(
+                "UPDATE job_text SET output = ?, logs = ? WHERE rowid = ?",
+                ("\n".join(part for part in (result.output, result.error) if part), "\n".join(result.logs), row[0])
+            )
+            self.db.execute(
+                "UPDATE job_meta SET status = ?, completed_at = ? WHERE rowid = ?",
+                (result.status.value, result.completed_at.isoformat() if result.completed_at else None, row[0])
+            )
+
+    def update_status(self, job_info: JobRecord):
+        """Record a job's new status without re-indexing its text"""
+        with self._lock, self.db:
+            self.db.execute(
+                "UPDATE job_meta SET status = ?, completed_at = ? WHERE job_id = ?",
+                (job_info.status.value, job_info.completed_at.isoformat() if job_info.completed_at else None,
+                 job_info.job_id)
+            )
+
+    def missing(self, job_ids: Iterable[str]) -> List[str]:
+        """The given jobs that are not indexed yet"""
+        with self._lock:
+            indexed = {row[0] for row in self.db.execute("SELECT job_id FROM job_meta")}
+        return [job_id for job_id in job_ids if job_id not in indexed]
+
+    def search(
+        self,
+        query: str,
+        role: Optional[str] = None,
+        repository: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[JobSearchHit]:
+        """Jobs matching every term of ``query``, best match first"""
+        conditions = ["job_text MATCH ?"]
+        params: List[Any] = [match_expression(query)]
+        for column, value in (("role", role), ("repository", repository), ("status", status.value if status else None)):
+            if value is not None:
+                conditions.append(f"m.{column} = ?")
+                params.append(value)
+
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT m.job_id, m.role, m.repository, m.task_type, m.status, m.created_at, m.completed_at, "
+                # Column -1 lets FTS5 pick the best matching column for the snippet
+                f"bm25(job_text), snippet(job_text, -1, '[', ']', '…', {SNIPPET_TOKENS}) "
+                "FROM job_text JOIN job_meta m ON m.rowid = job_text.rowid "
+                f"WHERE {' AND '.join(conditions)} ORDER BY bm25(job_text) LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        return [
+            JobSearchHit(
+                job_id=job_id, role=role, repository=repository, task_type=task_type, status=status,
+                created_at=created_at, completed_at=completed_at, score=-rank, snippet=snippet
+            )
+            for job_id, role, repository, task_type, status, created_at, completed_at, rank, snippet in rows
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size as of this instance's last update"""
+        return {"path": self.path, "indexed_jobs": self.indexed_jobs}
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query: every term must match, ``term*`` matches a prefix.
+
+    Terms are quoted so paths and punctuation (``app/db.py``, ``KeyError:``)
+    match as phrases instead of being read as FTS5 syntax.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*") and len(term) > 1
+        term = term.rstrip("*") if prefix else term
+        quoted = '"' + term.replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    if not terms:
+        raise ValueError("Search query is empty")
+    return " AND ".join(terms)
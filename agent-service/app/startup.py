@@ -0,0 +1,44 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+
+class StartupTimer:
+    """Times the phases of service startup for a boot report"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block of startup work"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def report(self) -> str:
+        """One-line summary of phase timings"""
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases]
+        total = time.perf_counter() - self.started
+        since_process_start = seconds_since_process_start()
+        summary = f"Startup phases: {', '.join(parts)} (lifespan total {total * 1000:.1f}ms"
+        if since_process_start is not None:
+            summary += f", {since_process_start:.2f}s since process start"
+        return summary + ")"
+
+
+def seconds_since_process_start() -> Optional[float]:
+    """Seconds since this process was started (Linux only)"""
+    try:
+        with open(f"/proc/{os.getpid()}/stat") as f:
+            # The process start time is field 22, counted in clock ticks after boot
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import ConfigSnapshot, settings  # noqa: E402
+from app.models.job import JobContext, JobPriority, JobRequest, JobTask, TaskType  # noqa: E402
+
+
+@pytest.fixture
+def configure():
+    """Apply role and repository configuration for one test, restoring the previous snapshot after it"""
+    previous = settings.config_snapshot
+
+    def apply(role_config=None, repository_config=None):
+        settings.apply_config(ConfigSnapshot(role_config or {}, repository_config or {}, "test"))
+
+    apply()
+    yield apply
+    settings.apply_config(previous)
+
+
+@pytest.fixture
+def make_request():
+    def build(role="DEVELOPER", repository="org/repo", priority=JobPriority.NORMAL, task_type=TaskType.BUG_FIX, **kwargs):
+        return JobRequest(
+            role=role,
+            context=JobContext(repository=repository),
+            task=JobTask(type=task_type, description="test", priority=priority),
+            **kwargs
+        )
+
+    return build
+
+
+@pytest.fixture
+def storage(tmp_path, configure, monkeypatch):
+    """Job storage and a shared SQLite coordinator in a temporary directory"""
+    monkeypatch.setattr(settings, "jobs_storage_path", str(tmp_path))
+    monkeypatch.setattr(settings, "coordination_backend", "sqlite")
+    monkeypatch.setattr(settings, "coordination_db_path", None)
+    monkeypatch.setattr(settings, "search_index_path", None)
+    monkeypatch.setattr(settings, "coordination_poll_interval", 60.0)
+    monkeypatch.setattr(settings, "lease_heartbeat_interval", 60.0)
+    monkeypatch.setattr(settings, "max_concurrent_jobs", 3)
+    monkeypatch.setattr(settings, "global_max_concurrent_jobs", None)
+    return tmp_path
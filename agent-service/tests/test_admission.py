@@ -0,0 +1,95 @@
+import math
+
+import pytest
+
+from app.config import settings
+from app.models.job import JobPriority
+from app.services.admission import (
+    AdmissionController, AdmissionRejected, AdmissionTooLarge, RateLimiter, TokenBucket, highest_priority,
+    retry_after_header
+)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    def build(client_rate=None, client_burst=20, repository_rate=None, repository_burst=20, max_queue_depth=None):
+        monkeypatch.setattr(settings, "client_rate_limit", client_rate)
+        monkeypatch.setattr(settings, "client_rate_burst", client_burst)
+        monkeypatch.setattr(settings, "repository_rate_limit", repository_rate)
+        monkeypatch.setattr(settings, "repository_rate_burst", repository_burst)
+        monkeypatch.setattr(settings, "max_queue_depth", max_queue_depth)
+        monkeypatch.setattr(settings, "queue_shed_fractions", {"low": 0.5, "normal": 0.8, "high": 1.0})
+        return AdmissionController()
+
+    return build
+
+
+def test_token_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=2.0, burst=4, now=0.0)
+    assert bucket.wait_time(0.0, 4) == 0.0
+    bucket.tokens -= 4
+
+    assert bucket.wait_time(0.0) == pytest.approx(0.5)
+    assert bucket.wait_time(1.0, 2) == 0.0
+    assert bucket.wait_time(100.0) == 0.0 and bucket.tokens == 4
+    assert bucket.wait_time(100.0, 5) == math.inf
+
+
+def test_rate_limiter_prunes_full_buckets():
+    limiter = RateLimiter(rate=1.0, burst=2, max_keys=2)
+    limiter.wait_time("a", 0.0)
+    limiter.take("a")
+    limiter.wait_time("b", 0.0)
+
+    # Once "a" has refilled it carries no state and makes room for "c"
+    limiter.wait_time("c", 10.0)
+    assert sorted(limiter.buckets) == ["c"]
+
+
+def test_queue_limit_sheds_low_priority_first(controller):
+    admission = controller(max_queue_depth=10)
+
+    admission.admit("client", ["org/repo"], JobPriority.LOW, pending=4)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("client", ["org/repo"], JobPriority.LOW, pending=5)
+    assert rejected.value.retry_after == settings.queue_retry_after
+    admission.admit("client", ["org/repo"], JobPriority.NORMAL, pending=5, jobs=3)
+    admission.admit("client", ["org/repo"], JobPriority.HIGH, pending=9)
+    with pytest.raises(AdmissionRejected):
+        admission.admit("client", ["org/repo"], JobPriority.HIGH, pending=9, jobs=2)
+
+    stats = admission.get_stats()
+    assert stats["queue_limits"] == {"low": 5, "normal": 8, "high": 10}
+    assert stats["admitted"] == 5
+    assert stats["shed_by_priority"] == {"low": 1, "high": 1}
+
+
+def test_refused_request_spends_no_tokens(controller):
+    admission = controller(client_rate=0.001, client_burst=3, repository_rate=0.001, repository_burst=2)
+    admission.admit("client", ["org/a", "org/a"], JobPriority.NORMAL, pending=0, jobs=2)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("client", ["org/a"], JobPriority.NORMAL, pending=0)
+    assert rejected.value.retry_after > 0
+    # The client bucket was checked but not charged for the refused job
+    admission.admit("client", ["org/b"], JobPriority.NORMAL, pending=0)
+    assert admission.get_stats()["rejected"] == {"repository_rate": 1}
+
+
+def test_batch_larger_than_burst_is_too_large(controller):
+    admission = controller(client_rate=1.0, client_burst=5)
+
+    with pytest.raises(AdmissionTooLarge) as rejected:
+        admission.admit("client", ["org/repo"] * 6, JobPriority.NORMAL, pending=0, jobs=6)
+    assert "CLIENT_RATE_BURST" in rejected.value.reason
+    assert rejected.value.retry_after == math.inf
+    admission.admit("client", ["org/repo"] * 5, JobPriority.NORMAL, pending=0, jobs=5)
+    assert admission.get_stats()["rejected"] == {"too_large": 1}
+
+
+def test_helpers():
+    assert highest_priority([JobPriority.LOW, JobPriority.HIGH, JobPriority.NORMAL]) == JobPriority.HIGH
+    assert highest_priority([]) == JobPriority.NORMAL
+    assert retry_after_header(0.2) == ("Retry-After", "1")
+    assert retry_after_header(2.5) == ("Retry-After", "3")
+    assert retry_after_header(math.inf) == ("Retry-After", "3600")
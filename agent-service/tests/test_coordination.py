@@ -0,0 +1,213 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.models.job import JobPriority, JobRecord, JobStatus
+from app.services.coordination import Coordinator, LocalCoordinator, SQLiteCoordinator
+
+
+@pytest.fixture(autouse=True)
+def coordination_settings(configure, monkeypatch):
+    monkeypatch.setattr(settings, "lease_duration", 60.0)
+    monkeypatch.setattr(settings, "global_max_concurrent_jobs", None)
+
+
+@asynccontextmanager
+async def instances(tmp_path, *instance_ids):
+    """SQLite coordinators for several instances sharing one database"""
+    coordinators = []
+    for instance_id in instance_ids:
+        coordinator = SQLiteCoordinator(str(tmp_path / "coordination.db"))
+        coordinator.instance_id = instance_id
+        await coordinator.start()
+        coordinators.append(coordinator)
+    try:
+        yield coordinators
+    finally:
+        for coordinator in coordinators:
+            await coordinator.close()
+
+
+def record(job_id, status=JobStatus.PENDING):
+    return JobRecord(job_id, status, "DEVELOPER", "test", datetime(2024, 1, 1))
+
+
+def test_caps_apply_across_instances(tmp_path, configure, make_request):
+    configure(role_config={"roles": {"DEVELOPER": {"max_concurrent": 1}}})
+
+    async def scenario():
+        async with instances(tmp_path, "a", "b") as (a, b):
+            await a.enqueue("job-1", make_request())
+            await a.enqueue("job-2", make_request())
+
+            assert (await a.next_job()).job_id == "job-1"
+            assert await b.next_job() is None
+            assert b.queued_count == 1
+
+            await a.release("job-1")
+            assert (await b.next_job()).job_id == "job-2"
+            assert b.get_running("job-2") is not None
+            assert a.get_running("job-2") is None
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_dispatch_order_matches_jobs_ahead_of(tmp_path, configure, make_request):
+    configure(repository_config={"repositories": {"org/b": {"weight": 2}}})
+
+    async def scenario():
+        async with instances(tmp_path, "a") as (a,):
+            for i in range(3):
+                await a.enqueue(f"a{i}", make_request(repository="org/a"))
+                await a.enqueue(f"b{i}", make_request(repository="org/b"))
+
+            ahead = [entry.job_id for entry in await a.jobs_ahead_of("a2")]
+            order = []
+            entry = await a.next_job()
+            while entry is not None:
+                order.append(entry.job_id)
+                entry = await a.next_job()
+            assert ahead == order[:order.index("a2")]
+
+    asyncio.run(scenario())
+
+
+def test_expired_claim_is_fenced_off(tmp_path, monkeypatch, make_request):
+    async def scenario():
+        async with instances(tmp_path, "a", "b") as (a, b):
+            await a.enqueue("job", make_request())
+            await a.next_job()
+            stale_token = a.claim_token("job")
+
+            # Instance a stops heartbeating; its lease runs out
+            monkeypatch.setattr(settings, "lease_duration", -1.0)
+            assert await a.heartbeat("job")
+            monkeypatch.setattr(settings, "lease_duration", 60.0)
+
+            assert await b.reap_expired() == [("job", "a")]
+            assert (await b.next_job()).job_id == "job"
+            assert b.claim_token("job") > stale_token
+
+            # The previous holder can neither renew nor release the new claim
+            assert not await a.heartbeat("job")
+            await a.release("job", stale_token)
+            assert await b.heartbeat("job")
+            assert (await b.describe())["running_jobs_all_instances"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_own_live_claim_is_renewed_not_reaped(tmp_path, monkeypatch, make_request):
+    async def scenario():
+        async with instances(tmp_path, "a") as (a,):
+            await a.enqueue("job", make_request())
+            await a.next_job()
+            monkeypatch.setattr(settings, "lease_duration", -1.0)
+            await a.heartbeat("job")
+            monkeypatch.setattr(settings, "lease_duration", 60.0)
+
+            assert await a.reap_expired() == []
+            assert await a.reap_expired() == []
+            assert a.get_running("job") is not None
+
+    asyncio.run(scenario())
+
+
+def test_finished_job_claim_is_dropped_on_expiry(tmp_path, monkeypatch, make_request):
+    async def scenario():
+        async with instances(tmp_path, "a", "b") as (a, b):
+            await a.enqueue("job", make_request())
+            await a.next_job()
+            a.publish(record("job", JobStatus.COMPLETED))
+            monkeypatch.setattr(settings, "lease_duration", -1.0)
+            await a.heartbeat("job")
+            monkeypatch.setattr(settings, "lease_duration", 60.0)
+
+            assert await b.reap_expired() == []
+            assert await b.next_job() is None
+            assert (await b.describe())["running_jobs_all_instances"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_adopt_only_reclaims_own_jobs(tmp_path, make_request):
+    async def scenario():
+        async with instances(tmp_path, "a", "b") as (a, b):
+            await a.enqueue("job", make_request())
+            await a.next_job()
+            token = a.claim_token("job")
+
+        # Both instances restart; only the one that ran the job gets it back
+        async with instances(tmp_path, "a", "b") as (a, b):
+            assert not await b.adopt("job", make_request())
+            assert await a.adopt("job", make_request())
+            assert a.claim_token("job") > token
+            assert await b.adopt("untracked", make_request())
+
+    asyncio.run(scenario())
+
+
+def test_list_jobs_picks_up_changes_from_other_instances(tmp_path):
+    async def scenario():
+        async with instances(tmp_path, "a", "b") as (a, b):
+            a.publish(record("job-1"))
+            a.publish(record("job-2"))
+            assert [job.job_id for job in await a.list_jobs()] == ["job-1", "job-2"]
+            assert [job.job_id for job in await b.list_jobs()] == ["job-1", "job-2"]
+
+            a.publish(record("job-1", JobStatus.RUNNING))
+            await a.forget(["job-2"])
+            listed = await b.list_jobs()
+            assert [(job.job_id, job.status) for job in listed] == [("job-1", JobStatus.RUNNING)]
+            assert (await b.fetch("job-1")).status == JobStatus.RUNNING
+            assert await b.fetch("job-2") is None
+
+    asyncio.run(scenario())
+
+
+def test_remove_only_drops_queued_jobs(tmp_path, make_request):
+    async def scenario():
+        async with instances(tmp_path, "a") as (a,):
+            await a.enqueue("queued", make_request())
+            await a.enqueue("running", make_request(priority=JobPriority.HIGH))
+            await a.next_job()
+
+            assert not await a.remove("running")
+            assert await a.is_queued("queued")
+            assert await a.remove("queued")
+            assert not await a.is_queued("queued")
+            assert a.queued_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_local_coordinator_follows_the_scheduler(configure, make_request):
+    configure(role_config={"roles": {"DEVELOPER": {"max_concurrent": 1}}})
+
+    async def scenario():
+        coordinator = LocalCoordinator()
+        await coordinator.enqueue("job-1", make_request())
+        await coordinator.enqueue("job-2", make_request())
+
+        assert (await coordinator.next_job()).job_id == "job-1"
+        assert await coordinator.next_job() is None
+        assert [entry.job_id for entry in await coordinator.jobs_ahead_of("job-2")] == []
+        await coordinator.release("job-1")
+        assert (await coordinator.next_job()).job_id == "job-2"
+        assert await coordinator.list_jobs() is None
+
+    asyncio.run(scenario())
+
+
+def test_backends_must_implement_the_queue_methods(tmp_path):
+    class Incomplete(Coordinator):
+        async def enqueue(self, job_id, request):
+            pass
+
+    with pytest.raises(TypeError, match="next_job"):
+        Incomplete()
+    LocalCoordinator()
+    SQLiteCoordinator(str(tmp_path / "coordination.db"))._executor.shutdown()
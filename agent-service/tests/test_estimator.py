@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.services.estimator import SKETCH_RELATIVE_ACCURACY, DurationEstimator, DurationSketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(4, 1) for _ in range(5000))
+    sketch = DurationSketch()
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=SKETCH_RELATIVE_ACCURACY)
+    assert sketch.mean == pytest.approx(sum(values) / len(values))
+
+
+def test_empty_sketch_reports_nothing():
+    sketch = DurationSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.mean is None
+
+
+def test_most_specific_bucket_with_enough_samples_wins(configure, monkeypatch):
+    monkeypatch.setattr(settings, "eta_min_samples", 3)
+    estimator = DurationEstimator()
+    for _ in range(3):
+        estimator.observe("DEVELOPER", "bug_fix", "org/slow", 300)
+    estimator.observe("DEVELOPER", "bug_fix", "org/fast", 10)
+
+    assert estimator.expected_duration("DEVELOPER", "bug_fix", "org/slow") == pytest.approx(300, rel=0.02)
+    # Too little history for org/fast: the role x task type bucket answers
+    assert estimator.expected_duration("DEVELOPER", "bug_fix", "org/fast") == pytest.approx(300, rel=0.02)
+
+
+def test_fallback_without_history_is_capped_by_role_timeout(configure, monkeypatch):
+    monkeypatch.setattr(settings, "eta_fallback_duration", 600)
+    configure(role_config={"roles": {"ANALYST": {"timeout": 120}}})
+    estimator = DurationEstimator()
+
+    assert estimator.expected_duration("DEVELOPER", "bug_fix", None) == min(600, settings.job_timeout)
+    assert estimator.expected_duration("ANALYST", "bug_fix", None) == 120
+
+
+def test_schedule_fills_earliest_free_slot(configure, monkeypatch, make_request):
+    monkeypatch.setattr(settings, "eta_min_samples", 1)
+    estimator = DurationEstimator()
+    estimator.observe("DEVELOPER", "bug_fix", "org/repo", 100)
+    now = datetime(2024, 1, 1)
+    request = make_request()
+
+    # Two slots, one busy for another 60s: the first queued job takes the idle slot and
+    # the second the slot freed at 60s, so the target starts when the first one ends
+    running = [(request, now - timedelta(seconds=40))]
+    start = estimator.estimate_schedule(running, [request, request], slots=2, now=now)
+    assert (start - now).total_seconds() == pytest.approx(100, rel=0.02)
+
+    assert estimator.estimate_schedule([], [], slots=2, now=now) == now
@@ -0,0 +1,94 @@
+import asyncio
+import sqlite3
+
+from app.config import settings
+from app.models.job import JobStatus
+from app.services.coordination import SQLiteCoordinator
+from app.services.job_manager import JobManager
+
+
+def claims(storage):
+    with sqlite3.connect(str(storage / "coordination.db")) as db:
+        return db.execute("SELECT job_id, state, owner FROM queue").fetchall()
+
+
+async def wait_until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_handed_off_job_keeps_its_claim(storage, make_request):
+    async def scenario():
+        manager = JobManager()
+
+        async def execute_job(job_id, request, upstream_results=None):
+            # A CLI run that outlives the drain timeout
+            await asyncio.sleep(3600)
+
+        manager.claude_service.execute_job = execute_job
+        await manager.start()
+        await manager.create_job("job", make_request())
+        await manager.start_job("job")
+        await wait_until(lambda: "job" in manager.running_tasks)
+
+        summary = await manager.drain(timeout=0)
+        await manager.close()
+        return summary, manager.jobs["job"].status
+
+    summary, status = asyncio.run(scenario())
+    assert summary["handed_off"] == 1
+    assert status == JobStatus.RUNNING
+    # The lease stays behind to expire, so another instance can reap and re-queue the job
+    assert claims(storage) == [("job", "running", settings.instance_id)]
+
+
+def test_cancelled_job_releases_its_claim(storage, make_request):
+    async def scenario():
+        manager = JobManager()
+
+        async def execute_job(job_id, request, upstream_results=None):
+            await asyncio.sleep(3600)
+
+        manager.claude_service.execute_job = execute_job
+        manager.claude_service.terminate = lambda job_id: None
+        await manager.start()
+        await manager.create_job("job", make_request())
+        await manager.start_job("job")
+        await wait_until(lambda: "job" in manager.running_tasks)
+
+        assert await manager.cancel_job("job")
+        await asyncio.sleep(0.1)
+        await manager.close()
+
+    asyncio.run(scenario())
+    assert claims(storage) == []
+
+
+def test_recovery_leaves_new_and_claimed_jobs_alone(storage, make_request):
+    async def scenario():
+        manager = JobManager()
+
+        async def execute_job(job_id, request, upstream_results=None):
+            raise AssertionError(f"{job_id} must not run here")
+
+        manager.claude_service.execute_job = execute_job
+        await manager.coordinator.start()
+        await manager.create_job("stored", make_request())
+        await manager.create_job("new", make_request())
+
+        # Another instance picked up the stored job while this one was down
+        other = SQLiteCoordinator(str(storage / "coordination.db"))
+        other.instance_id = "other"
+        await other.enqueue("stored", make_request())
+        await other.next_job()
+
+        await manager._recover_interrupted_jobs(["stored"])
+        queued_new = await manager.coordinator.is_queued("new")
+        await other.close()
+        await manager.close()
+        return queued_new
+
+    assert not asyncio.run(scenario())
+    assert claims(storage) == [("stored", "running", "other")]
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routers import jobs
+from app.services.admission import AdmissionController
+from app.services.job_manager import JobManager
+
+
+@pytest.fixture
+def app(storage, monkeypatch):
+    monkeypatch.setattr(settings, "client_rate_limit", 0.001)
+    monkeypatch.setattr(settings, "client_rate_burst", 5)
+    monkeypatch.setattr(settings, "repository_rate_limit", None)
+    monkeypatch.setattr(settings, "max_queue_depth", None)
+    app = FastAPI()
+    app.include_router(jobs.router, prefix="/agent")
+    app.state.job_manager = JobManager()
+    app.state.admission = AdmissionController()
+    yield app
+    asyncio.run(app.state.job_manager.close())
+
+
+def job(**fields):
+    return {
+        "role": "DEVELOPER",
+        "context": {"repository": "org/repo"},
+        "task": {"type": "bug_fix", "description": "Fix it"},
+        **fields
+    }
+
+
+def test_unknown_dependency_is_refused_before_admission(app):
+    client = TestClient(app)
+    response = client.post("/agent/jobs", json=job(depends_on=["missing"]))
+
+    assert response.status_code == 400
+    assert "missing" in response.json()["detail"]
+    assert app.state.admission.admitted == 0
+    assert all(bucket.tokens == bucket.burst for bucket in app.state.admission.client_limiter.buckets.values())
+
+
+def test_invalid_pipeline_is_refused_before_admission(app):
+    client = TestClient(app)
+    unknown_step = {"steps": [{"name": "a", "job": job(), "depends_on": ["b"]}]}
+    unknown_job = {"steps": [{"name": "a", "job": job()}, {"name": "b", "job": job(depends_on=["missing"])}]}
+
+    assert client.post("/agent/pipelines", json=unknown_step).status_code == 400
+    assert client.post("/agent/pipelines", json=unknown_job).status_code == 400
+    assert app.state.admission.admitted == 0
+    assert all(bucket.tokens == bucket.burst for bucket in app.state.admission.client_limiter.buckets.values())
+    # Nothing was created for the valid first step either
+    assert app.state.job_manager.jobs == {}
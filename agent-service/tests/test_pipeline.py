@@ -0,0 +1,36 @@
+import pytest
+
+from app.models.job import PipelineStep
+from app.services.job_manager import order_pipeline_steps
+
+
+@pytest.fixture
+def step(make_request):
+    def build(name, *depends_on):
+        return PipelineStep(name=name, job=make_request(), depends_on=list(depends_on))
+
+    return build
+
+
+def test_steps_come_after_their_dependencies(step):
+    steps = [step("report", "review", "test"), step("review", "analyse"), step("test", "analyse"), step("analyse")]
+
+    order = [s.name for s in order_pipeline_steps(steps)]
+    assert sorted(order) == ["analyse", "report", "review", "test"]
+    for s in steps:
+        assert all(order.index(name) < order.index(s.name) for name in s.depends_on)
+
+
+def test_independent_steps_keep_their_order(step):
+    assert [s.name for s in order_pipeline_steps([step("b"), step("a")])] == ["b", "a"]
+
+
+@pytest.mark.parametrize("steps, message", [
+    (lambda step: [step("a"), step("a")], "Duplicate pipeline step name 'a'"),
+    (lambda step: [step("a", "missing")], "depends on unknown step 'missing'"),
+    (lambda step: [step("a", "b"), step("b", "c"), step("c", "a")], "dependency cycle"),
+    (lambda step: [step("a", "a")], "dependency cycle"),
+])
+def test_invalid_pipelines_are_rejected(step, steps, message):
+    with pytest.raises(ValueError, match=message):
+        order_pipeline_steps(steps(step))
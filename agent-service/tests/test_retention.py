@@ -0,0 +1,153 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.models.job import JobRecord, JobStatus
+from app.services.retention import JobArchive, RetentionManager, read_archived_job
+
+NOW = datetime(2024, 6, 1)
+
+
+@pytest.fixture(autouse=True)
+def retention_settings(monkeypatch):
+    monkeypatch.setattr(settings, "retention_max_age_days", 14.0)
+    monkeypatch.setattr(settings, "retention_status_max_age_days", {})
+    monkeypatch.setattr(settings, "retention_max_jobs", None)
+
+
+def job(job_id, status=JobStatus.COMPLETED, age_days=30, now=NOW):
+    finished_at = now - timedelta(days=age_days)
+    completed_at = finished_at if status != JobStatus.PENDING else None
+    return JobRecord(job_id, status, "DEVELOPER", "test", finished_at - timedelta(hours=1), completed_at=completed_at)
+
+
+def manager(running=(), dependents=None, waiting=None, archive=None, jobs=()):
+    forgotten = []
+
+    async def list_jobs():
+        return list(jobs)
+
+    async def forget_jobs(job_ids):
+        forgotten.extend(job_ids)
+
+    return SimpleNamespace(
+        archive=archive, running_tasks={job_id: None for job_id in running},
+        dependents=dependents or {}, waiting=waiting or {},
+        list_jobs=list_jobs, forget_jobs=forget_jobs, forgotten=forgotten
+    )
+
+
+def test_select_archives_finished_jobs_past_their_max_age(monkeypatch):
+    monkeypatch.setattr(settings, "retention_status_max_age_days", {"failed": 60})
+    jobs = [
+        job("old"), job("recent", age_days=1), job("old-failed", JobStatus.FAILED),
+        job("very-old-failed", JobStatus.FAILED, age_days=90), job("pending", JobStatus.PENDING, age_days=90)
+    ]
+
+    assert sorted(RetentionManager(manager()).select(jobs, NOW)) == ["old", "very-old-failed"]
+
+
+def test_select_keeps_only_the_newest_finished_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "retention_max_age_days", None)
+    monkeypatch.setattr(settings, "retention_max_jobs", 2)
+    jobs = [job(f"job-{age}", age_days=age) for age in (5, 1, 3, 4)]
+
+    assert sorted(RetentionManager(manager()).select(jobs, NOW)) == ["job-4", "job-5"]
+
+
+def test_select_keeps_jobs_that_are_running_or_still_needed(monkeypatch):
+    jobs = [job("running"), job("upstream"), job("unmet"), job("done")]
+    job_manager = manager(
+        running=["running"],
+        dependents={"upstream": {"downstream"}},
+        waiting={"downstream": ({"unmet"}, None)}
+    )
+
+    assert RetentionManager(job_manager).select(jobs, NOW) == ["done"]
+
+
+def test_archive_round_trip_and_stats(tmp_path):
+    archive = JobArchive(str(tmp_path), segment_max_bytes=1)
+    archive.append([record("job-1")])
+    archive.append([record("job-2"), record("job-3")])
+
+    assert archive.read("job-2")["result"]["output"] == "output of job-2"
+    assert archive.read("missing") is None
+    assert archive.contains("job-3")
+    # The first segment filled up, so the second write started another
+    assert archive.get_stats()["archived_jobs"] == 3
+    assert archive.get_stats()["segments"] == 2
+
+    segment = sorted(name for name in os.listdir(tmp_path) if name.startswith("segment-"))[-1]
+    with gzip.open(tmp_path / segment) as f:
+        assert [json.loads(line)["job_id"] for line in f] == ["job-2", "job-3"]
+
+    archive.close()
+    reopened = JobArchive(str(tmp_path), segment_max_bytes=1)
+    assert reopened.get_stats() == archive.get_stats()
+    reopened.close()
+
+
+def test_run_once_moves_job_files_into_the_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "jobs_storage_path", str(tmp_path))
+    jobs_dir = tmp_path / "jobs"
+    jobs_dir.mkdir()
+    for job_id in ("old", "recent"):
+        stored = record(job_id)
+        for suffix in ("info", "request", "result"):
+            (jobs_dir / f"{job_id}_{suffix}.json").write_text(json.dumps(stored[suffix]))
+    (tmp_path / "runs" / "old").mkdir(parents=True)
+
+    archive = JobArchive(str(tmp_path / "archive"), segment_max_bytes=1 << 20)
+    now = datetime.utcnow()
+    job_manager = manager(archive=archive, jobs=[job("old", now=now), job("recent", age_days=1, now=now)])
+    retention = RetentionManager(job_manager)
+
+    assert asyncio.run(retention.run_once()) == 1
+    assert job_manager.forgotten == ["old"]
+    assert sorted(os.listdir(jobs_dir)) == ["recent_info.json", "recent_request.json", "recent_result.json"]
+    assert not (tmp_path / "runs" / "old").exists()
+    assert archive.read("old")["info"]["job_id"] == "old"
+    archive.close()
+
+
+def test_legacy_info_takes_the_status_of_its_result(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "jobs_storage_path", str(tmp_path))
+    jobs_dir = tmp_path / "jobs"
+    jobs_dir.mkdir()
+    now = datetime.utcnow()
+    completed = job("legacy", now=now)
+    # Info files written before results updated them keep the status the job was created with
+    info = {**completed.to_dict(), "status": "pending", "started_at": None, "completed_at": None}
+    result = {
+        "job_id": "legacy", "status": "completed", "role": "DEVELOPER", "task_type": "bug_fix",
+        "started_at": str(completed.completed_at - timedelta(minutes=5)), "completed_at": str(completed.completed_at),
+        "output": "done"
+    }
+    (jobs_dir / "legacy_info.json").write_text(json.dumps(info))
+    (jobs_dir / "legacy_result.json").write_text(json.dumps(result))
+
+    archive = JobArchive(str(tmp_path / "archive"), segment_max_bytes=1 << 20)
+    assert asyncio.run(RetentionManager(manager(archive=archive, jobs=[completed])).run_once()) == 1
+
+    job_info, job_result = read_archived_job(archive, "legacy")
+    assert job_info.status == JobStatus.COMPLETED
+    assert job_info.completed_at == completed.completed_at
+    assert job_info.started_at == completed.completed_at - timedelta(minutes=5)
+    assert archive.db.execute("SELECT status FROM archived WHERE job_id = 'legacy'").fetchone() == ("completed",)
+    archive.close()
+
+
+def record(job_id):
+    return {
+        "job_id": job_id,
+        "info": job(job_id).to_dict(),
+        "request": {"role": "DEVELOPER"},
+        "result": {"output": f"output of {job_id}"}
+    }
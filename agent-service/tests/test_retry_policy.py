@@ -0,0 +1,79 @@
+import os
+from datetime import datetime
+
+import pytest
+import yaml
+
+from app.config import validate_role_config
+from app.models.job import JobResult, JobStatus, TaskType
+from app.services.retry_policy import FailureKind, RetryPolicy, classify_failure
+
+CLASSIFICATION = {
+    "failure_classification": {
+        "transient_patterns": ["rate.?limit", "\\b50[234]\\b"],
+        "permanent_patterns": ["invalid api key"],
+        "transient_returncodes": [75],
+        "timeouts_are_transient": True
+    }
+}
+
+
+def failed(error="", **metadata):
+    return JobResult(
+        job_id="job", status=JobStatus.FAILED, role="DEVELOPER", task_type=TaskType.BUG_FIX,
+        started_at=datetime.utcnow(), error=error, metadata=metadata
+    )
+
+
+@pytest.mark.parametrize("result, kind", [
+    (failed("API error: Rate limit exceeded"), FailureKind.TRANSIENT),
+    (failed("upstream returned 503"), FailureKind.TRANSIENT),
+    (failed("Invalid API key after rate limit"), FailureKind.PERMANENT),
+    (failed("syntax error"), FailureKind.PERMANENT),
+    (failed("killed", timeout=300), FailureKind.TRANSIENT),
+    (failed("exited", returncode=75), FailureKind.TRANSIENT),
+    (failed("exited", returncode=1), FailureKind.PERMANENT),
+])
+def test_classify_failure(configure, result, kind):
+    configure(role_config=CLASSIFICATION)
+    assert classify_failure(result) == kind
+
+
+def test_only_the_tail_of_the_error_is_scanned(configure):
+    configure(role_config=CLASSIFICATION)
+    assert classify_failure(failed("rate limit" + "x" * 10000)) == FailureKind.PERMANENT
+
+
+def test_retry_config_layers_task_overrides_over_role_and_defaults(configure):
+    configure(role_config={
+        "retry_defaults": {"max_attempts": 2, "backoff_base": 10},
+        "roles": {"DEVELOPER": {"retry": {"max_attempts": 3, "task_types": {"code_review": {"max_attempts": 1}}}}}
+    })
+
+    assert RetryPolicy.for_job("DEVELOPER", "bug_fix").max_attempts == 3
+    assert RetryPolicy.for_job("DEVELOPER", "code_review").max_attempts == 1
+    assert RetryPolicy.for_job("ANALYST", "bug_fix").max_attempts == 2
+    assert RetryPolicy.for_job("ANALYST", "bug_fix").backoff_base == 10
+
+
+def test_retries_only_transient_failures_within_the_limit():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry(1, FailureKind.TRANSIENT)
+    assert policy.should_retry(2, FailureKind.TRANSIENT)
+    assert not policy.should_retry(3, FailureKind.TRANSIENT)
+    assert not policy.should_retry(1, FailureKind.PERMANENT)
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(backoff_base=10, backoff_multiplier=2, backoff_max=35, jitter=0)
+    assert [policy.backoff_delay(attempt) for attempt in (1, 2, 3, 4)] == [10, 20, 35, 35]
+
+    jittered = RetryPolicy(backoff_base=10, jitter=0.2)
+    assert all(8 <= jittered.backoff_delay(1) <= 12 for _ in range(100))
+
+
+def test_shipped_classification_is_valid():
+    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "roles.yml")
+    with open(path) as f:
+        config = validate_role_config(yaml.safe_load(f))
+    assert config["failure_classification"]["transient_patterns"]
@@ -0,0 +1,65 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.models.job import JobRecord, JobResult, JobStatus, TaskType
+from app.services.search_index import SearchIndex, match_expression
+
+
+@pytest.mark.parametrize("query, expression", [
+    ("timeout", '"timeout"'),
+    ("db conn*", '"db" AND "conn"*'),
+    ("app/db.py KeyError:", '"app/db.py" AND "KeyError:"'),
+    ('say "hi"', '"say" AND """hi"""'),
+    ("* a**", '"*" AND "a"*'),
+])
+def test_match_expression(query, expression):
+    assert match_expression(query) == expression
+
+
+def test_empty_query_is_rejected():
+    with pytest.raises(ValueError):
+        match_expression("   ")
+
+
+@pytest.fixture
+def index(tmp_path):
+    try:
+        index = SearchIndex(str(tmp_path / "search.db"))
+    except sqlite3.OperationalError:
+        pytest.skip("SQLite was built without FTS5")
+    yield index
+    index.close()
+
+
+def record(job_id, description, status=JobStatus.PENDING):
+    return JobRecord(job_id, status, "DEVELOPER", description, datetime(2024, 1, 1))
+
+
+def test_search_matches_all_terms_and_filters(index, make_request):
+    index.index_job(record("job-1", "Fix KeyError in app/db.py"), make_request(repository="org/a"))
+    index.index_job(record("job-2", "Document the db module"), make_request(repository="org/b"))
+
+    assert [hit.job_id for hit in index.search("db")] in (["job-1", "job-2"], ["job-2", "job-1"])
+    assert [hit.job_id for hit in index.search("app/db.py KeyError:")] == ["job-1"]
+    assert [hit.job_id for hit in index.search("doc*")] == ["job-2"]
+    assert [hit.job_id for hit in index.search("db", repository="org/a")] == ["job-1"]
+    assert index.search("db", status=JobStatus.COMPLETED) == []
+
+
+def test_results_are_searchable_and_counted_once(index, make_request):
+    job_info = record("job-1", "Review the parser")
+    index.index_job(job_info, make_request())
+    index.index_job(job_info, make_request())
+    assert index.get_stats()["indexed_jobs"] == 1
+
+    job_info.status = JobStatus.COMPLETED
+    index.index_result(job_info, JobResult(
+        job_id="job-1", status=JobStatus.COMPLETED, role="DEVELOPER", task_type=TaskType.CODE_REVIEW,
+        started_at=datetime(2024, 1, 1), output="Found an off-by-one in tokenize"
+    ))
+    hits = index.search("tokenize", status=JobStatus.COMPLETED)
+    assert [hit.job_id for hit in hits] == ["job-1"]
+    assert "[tokenize]" in hits[0].snippet
+    assert index.missing(["job-1", "job-2"]) == ["job-2"]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load test for agent-service.
+
+Runs the service in-process (default) with CLAUDE_CLI_PATH pointed at
+fake_claude.py, or against a running instance with --url, and drives
+job creation, status/listing reads and /agent/stats at a fixed concurrency.
+
+    python benchmarks/bench_agent_service.py --jobs 200 --concurrency 20
+    python benchmarks/bench_agent_service.py --url http://localhost:4045 --pid 12345
+
+When using --url, start the service with CLAUDE_CLI_PATH and the FAKE_CLAUDE_*
+variables set so it runs the fake CLI.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import REPO_ROOT, load_service_app, open_client, peak_rss_mb, print_report, rss_mb, run_load  # noqa: E402
+
+ROLES = {
+    "DEVELOPER": ["bug_fix", "feature_implementation", "testing", "code_review"],
+    "ARCHITECT": ["architecture_design", "optimization"],
+    "ANALYST": ["code_analysis", "documentation", "code_review"]
+}
+
+
+def job_payload(index: int, repositories: int) -> dict:
+    rng = random.Random(index)
+    role = rng.choice(list(ROLES))
+    return {
+        "role": role,
+        "context": {
+            "repository": f"bench-org/repo-{index % repositories}",
+            "issue_number": rng.randint(1, 500),
+            "branch": "main"
+        },
+        "task": {
+            "type": rng.choice(ROLES[role]),
+            "description": f"Benchmark task {index}: review the webhook handler and report latency issues",
+            "priority": rng.choice(["low", "normal", "normal", "high"]),
+            "requirements": ["Keep changes minimal", "Add tests"]
+        },
+        "metadata": {"benchmark": True}
+    }
+
+
+async def wait_for_drain(client, timeout: float) -> float:
+    """Poll stats until no jobs are running or queued; returns seconds waited"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        stats = (await client.get("/agent/stats")).json()
+        active = stats.get("running_jobs", 0) + stats.get("queued_jobs", 0) + stats.get("retrying_jobs", 0)
+        if active == 0:
+            break
+        await asyncio.sleep(0.2)
+    return time.perf_counter() - started
+
+
+async def run(args) -> None:
+    app = None
+    if not args.url:
+        storage = tempfile.mkdtemp(prefix="agent-bench-")
+        app = load_service_app(os.path.join(REPO_ROOT, "agent-service"), {
+            "CLAUDE_CLI_PATH": os.path.join(REPO_ROOT, "benchmarks", "fake_claude.py"),
+            "JOBS_STORAGE_PATH": storage,
+            "MAX_CONCURRENT_JOBS": str(args.max_concurrent_jobs),
+            "LOG_LEVEL": "WARNING",
+            "FAKE_CLAUDE_SLEEP": args.sleep,
+            "FAKE_CLAUDE_OUTPUT_MB": str(args.output_mb),
+            "FAKE_CLAUDE_FAIL_RATE": str(args.fail_rate)
+        })
+
+    pid = args.pid or (None if args.url else os.getpid())
+    rss_before = rss_mb(pid)
+    job_ids = []
+    results = []
+
+    async with open_client(app=app, url=args.url) as client:
+        async def create(index):
+            response = await client.post("/agent/jobs", json=job_payload(index, args.repositories))
+            if response.status_code == 200:
+                job_ids.append(response.json()["job_id"])
+            return response
+
+        results.append(await run_load("POST /agent/jobs", create, args.jobs, args.concurrency))
+        results.append(await run_load(
+            "GET /agent/stats", lambda i: client.get("/agent/stats"), args.reads, args.concurrency
+        ))
+        results.append(await run_load(
+            "GET /agent/jobs", lambda i: client.get("/agent/jobs"), args.reads, args.concurrency
+        ))
+        if job_ids:
+            results.append(await run_load(
+                "GET /agent/jobs/{id}",
+                lambda i: client.get(f"/agent/jobs/{job_ids[i % len(job_ids)]}"),
+                args.reads,
+                args.concurrency
+            ))
+
+        drained = await wait_for_drain(client, args.drain_timeout) if args.wait else None
+        stats = (await client.get("/agent/stats")).json()
+
+    extra = {
+        "jobs_completed": stats.get("completed_jobs"),
+        "jobs_failed": stats.get("failed_jobs"),
+        "drain_seconds": round(drained, 2) if drained is not None else None,
+        "rss_mb_before": rss_before,
+        "rss_mb_after": rss_mb(pid)
+    }
+    if not args.url:
+        extra["peak_rss_mb"] = peak_rss_mb()
+    print_report("agent-service benchmark", results, extra, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running service instead of an in-process app")
+    parser.add_argument("--pid", type=int, help="PID of the running service, for RSS reporting with --url")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs to create")
+    parser.add_argument("--reads", type=int, default=500, help="Requests per read endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    parser.add_argument("--repositories", type=int, default=5, help="Distinct repositories the jobs are spread over")
+    parser.add_argument("--max-concurrent-jobs", type=int, default=10, help="MAX_CONCURRENT_JOBS for in-process runs")
+    parser.add_argument("--sleep", default="0.2-1.0", help="Fake CLI runtime in seconds, or a min-max range")
+    parser.add_argument("--output-mb", type=float, default=0.05, help="Fake CLI stdout size in MB")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of fake CLI runs that fail")
+    parser.add_argument("--wait", action="store_true", help="Wait for all jobs to finish and report drain time")
+    parser.add_argument("--drain-timeout", type=float, default=600.0, help="Maximum seconds to wait with --wait")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
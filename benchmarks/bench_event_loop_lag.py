@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Event loop lag of agent-service while many jobs finish at once.
+
+Runs the service in-process with CLAUDE_CLI_PATH pointed at fake_claude.py,
+starts --jobs jobs that all run for the same time and write --output-mb of
+output each, and samples how late a heartbeat on the event loop wakes up
+while their results are collected and persisted. Lag here is time during
+which no request can be served.
+
+    python benchmarks/bench_event_loop_lag.py --jobs 50 --output-mb 2
+    python benchmarks/bench_event_loop_lag.py --jobs 50 --output-mb 2 --json > after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_agent_service import job_payload, wait_for_drain  # noqa: E402
+from common import REPO_ROOT, LatencyRecorder, load_service_app, open_client  # noqa: E402
+
+
+async def sample_lag(recorder: LatencyRecorder, interval: float, stop: asyncio.Event):
+    """Record how much later than ``interval`` each heartbeat wakes up"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        recorder.record(max(time.perf_counter() - started - interval, 0.0))
+
+
+async def run(args) -> None:
+    storage = tempfile.mkdtemp(prefix="agent-bench-")
+    app = load_service_app(os.path.join(REPO_ROOT, "agent-service"), {
+        "CLAUDE_CLI_PATH": os.path.join(REPO_ROOT, "benchmarks", "fake_claude.py"),
+        "JOBS_STORAGE_PATH": storage,
+        "MAX_CONCURRENT_JOBS": str(args.jobs),
+        "LOG_LEVEL": "WARNING",
+        "LOOP_LAG_THRESHOLD": "0",
+        "RETENTION_ENABLED": "false",
+        "CONFIG_WATCH": "false",
+        "FAKE_CLAUDE_SLEEP": str(args.sleep),
+        "FAKE_CLAUDE_OUTPUT_MB": str(args.output_mb)
+    })
+
+    recorder = LatencyRecorder("event loop lag")
+    stop = asyncio.Event()
+
+    async with open_client(app=app) as client:
+        responses = await asyncio.gather(*(
+            client.post("/agent/jobs", json=job_payload(index, args.jobs)) for index in range(args.jobs)
+        ))
+        created = sum(1 for response in responses if response.status_code == 200)
+
+        # Sample from the moment the jobs are running until the last result is stored
+        sampler = asyncio.create_task(sample_lag(recorder, args.interval, stop))
+        drained = await wait_for_drain(client, args.drain_timeout)
+        stop.set()
+        await sampler
+        stats = (await client.get("/agent/stats")).json()
+
+    lags = recorder.samples
+    report = {
+        "jobs": created,
+        "jobs_completed": stats.get("completed_jobs"),
+        "output_mb_per_job": args.output_mb,
+        "drain_seconds": round(drained, 2),
+        "heartbeats": len(lags),
+        "lag_p50_ms": _ms(recorder.percentile(0.50)),
+        "lag_p99_ms": _ms(recorder.percentile(0.99)),
+        "lag_max_ms": _ms(max(lags)) if lags else None,
+        # Heartbeats late by more than 50 ms, i.e. requests that would have stalled visibly
+        "stalls_over_50ms": sum(1 for lag in lags if lag > 0.05),
+        "blocked_ms": _ms(sum(lag for lag in lags if lag > 0.05))
+    }
+
+    if args.json:
+        print(json.dumps({"benchmark": "agent-service event loop lag", **report}, indent=2))
+        return
+    title = "agent-service event loop lag"
+    print(f"\n{title}")
+    print("=" * len(title))
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs started together, all running concurrently")
+    parser.add_argument("--sleep", type=float, default=1.0, help="Fake CLI runtime in seconds, the same for every job")
+    parser.add_argument("--output-mb", type=float, default=2.0, help="Fake CLI stdout size in MB per job")
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between heartbeats")
+    parser.add_argument("--drain-timeout", type=float, default=600.0, help="Maximum seconds to wait for the jobs")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
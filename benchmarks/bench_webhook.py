@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Load test for the main-agent webhook endpoint.
+
+Sends signed ``issues``, ``issue_comment`` and ``pull_request`` deliveries to
+POST /webhook/github, in-process (default) or against --url, and reports
+throughput, latency percentiles and RSS.
+
+    python benchmarks/bench_webhook.py --requests 2000 --concurrency 50
+    python benchmarks/bench_webhook.py --url http://localhost:4044 --secret "$GITHUB_WEBHOOK_SECRET"
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import REPO_ROOT, load_service_app, open_client, peak_rss_mb, print_report, rss_mb, run_load  # noqa: E402
+from github_payloads import build_delivery, sign  # noqa: E402
+
+EVENT_MIX = ["issue_comment"] * 5 + ["issues"] * 3 + ["pull_request"] * 2
+
+
+async def run(args) -> None:
+    app = None
+    if not args.url:
+        app = load_service_app(os.path.join(REPO_ROOT, "main-agent"), {
+            "GITHUB_WEBHOOK_SECRET": args.secret,
+            "LOG_LEVEL": "WARNING"
+        })
+
+    # Pre-build deliveries so payload generation is not measured
+    rng = random.Random(args.seed)
+    deliveries = []
+    for _ in range(min(args.requests, args.distinct)):
+        headers, body = build_delivery(rng.choice(EVENT_MIX), args.repository, rng, args.body_bytes)
+        headers["X-Hub-Signature-256"] = sign(body, args.secret)
+        deliveries.append((headers, body))
+
+    pid = args.pid or (None if args.url else os.getpid())
+    rss_before = rss_mb(pid)
+
+    async with open_client(app=app, url=args.url) as client:
+        async def send(index):
+            headers, body = deliveries[index % len(deliveries)]
+            return await client.post("/webhook/github", content=body, headers=headers)
+
+        results = [await run_load("POST /webhook/github", send, args.requests, args.concurrency)]
+
+    extra = {"rss_mb_before": rss_before, "rss_mb_after": rss_mb(pid)}
+    if not args.url:
+        extra["peak_rss_mb"] = peak_rss_mb()
+    print_report("main-agent webhook benchmark", results, extra, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running service instead of an in-process app")
+    parser.add_argument("--pid", type=int, help="PID of the running service, for RSS reporting with --url")
+    parser.add_argument("--secret", default="benchmark-secret", help="Webhook secret used to sign deliveries")
+    parser.add_argument("--repository", default="vinay4appsentinels/agent-development-army",
+                        help="Repository full name in payloads (must be whitelisted to exercise parsing)")
+    parser.add_argument("--requests", type=int, default=2000, help="Deliveries to send")
+    parser.add_argument("--distinct", type=int, default=200, help="Distinct payloads to cycle through")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight")
+    parser.add_argument("--body-bytes", type=int, default=2048, help="Approximate issue/comment/PR body size")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for payload generation")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
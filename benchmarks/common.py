@@ -0,0 +1,153 @@
+"""
+Shared helpers for the benchmark scripts: load generation, latency
+percentiles, RSS sampling and report output.
+"""
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LatencyRecorder:
+    """Collects per-request latencies and failures for one endpoint"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def record(self, seconds: float, status: Optional[int] = None, error: Optional[str] = None):
+        self.samples.append(seconds)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        elif status is not None and status >= 400:
+            self.errors[str(status)] = self.errors.get(str(status), 0) + 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        count = len(self.samples)
+        return {
+            "endpoint": self.name,
+            "requests": count,
+            "errors": self.errors,
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput_rps": round(count / wall_seconds, 1) if wall_seconds > 0 else None,
+            "mean_ms": _ms(sum(self.samples) / count) if count else None,
+            "p50_ms": _ms(self.percentile(0.50)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+            "max_ms": _ms(max(self.samples)) if count else None
+        }
+
+
+async def run_load(
+    name: str,
+    send: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Issue ``total`` requests with at most ``concurrency`` in flight"""
+    recorder = LatencyRecorder(name)
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                response = await send(index)
+                recorder.record(time.perf_counter() - started, status=response.status_code)
+            except Exception as e:
+                recorder.record(time.perf_counter() - started, error=type(e).__name__)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return recorder.summary(time.perf_counter() - started)
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Current resident set size of a process in MB (Linux), or None"""
+    path = f"/proc/{pid or os.getpid()}/status"
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def load_service_app(service_dir: str, env: Dict[str, str]):
+    """Import a service's FastAPI app in-process with the given environment.
+
+    Both services use a top-level ``app`` package, so only one service can
+    be loaded per benchmark process.
+    """
+    os.environ.update(env)
+    os.chdir(service_dir)
+    sys.path.insert(0, service_dir)
+    from app.main import app
+    return app
+
+
+@asynccontextmanager
+async def open_client(app=None, url: Optional[str] = None, timeout: float = 60.0) -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP client against a live URL, or in-process against an ASGI app with its lifespan running"""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            yield client
+        return
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout) as client:
+            yield client
+
+
+def print_report(title: str, results: List[Dict[str, Any]], extra: Dict[str, Any], as_json: bool = False):
+    """Print benchmark results as a table, or as JSON for comparing runs"""
+    if as_json:
+        print(json.dumps({"benchmark": title, "results": results, **extra}, indent=2))
+        return
+
+    print(f"\n{title}")
+    print("=" * len(title))
+    header = f"{'endpoint':<28}{'reqs':>7}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        errors = sum(row["errors"].values())
+        print(
+            f"{row['endpoint']:<28}{row['requests']:>7}{errors:>8}{_fmt(row['throughput_rps']):>9}"
+            f"{_fmt(row['p50_ms']):>9}{_fmt(row['p95_ms']):>9}{_fmt(row['p99_ms']):>9}{_fmt(row['max_ms']):>9}"
+        )
+    for key, value in extra.items():
+        print(f"{key}: {value}")
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
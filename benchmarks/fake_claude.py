@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Claude CLI used by the benchmarks.
+
+Point agent-service's CLAUDE_CLI_PATH at this script. Behaviour is controlled
+through environment variables inherited from the service:
+
+    FAKE_CLAUDE_SLEEP      Seconds to run, or a "min-max" range (default: 0.5)
+    FAKE_CLAUDE_OUTPUT_MB  Megabytes written to stdout (default: 0.01)
+    FAKE_CLAUDE_FAIL_RATE  Probability of exiting non-zero, 0.0-1.0 (default: 0)
+    FAKE_CLAUDE_ERROR      stderr message printed on failure
+"""
+import os
+import random
+import sys
+import time
+
+CHUNK = (
+    "## Findings\n"
+    "- [HIGH] app/services/job_manager.py:120 blocking write on the event loop\n"
+    "```python\n"
+    "def example(value):\n"
+    "    return value * 2\n"
+    "```\n"
+    "The implementation looks reasonable overall; see notes above.\n"
+)
+
+
+def parse_sleep(value: str) -> float:
+    if "-" in value:
+        low, high = value.split("-", 1)
+        return random.uniform(float(low), float(high))
+    return float(value)
+
+
+def main() -> int:
+    time.sleep(parse_sleep(os.environ.get("FAKE_CLAUDE_SLEEP", "0.5")))
+
+    if random.random() < float(os.environ.get("FAKE_CLAUDE_FAIL_RATE", "0")):
+        sys.stderr.write(os.environ.get("FAKE_CLAUDE_ERROR", "Error: simulated failure") + "\n")
+        return 1
+
+    remaining = int(float(os.environ.get("FAKE_CLAUDE_OUTPUT_MB", "0.01")) * 1024 * 1024)
+    prompt = sys.argv[-1] if len(sys.argv) > 1 else ""
+    sys.stdout.write(f"Task received ({len(prompt)} prompt characters)\n")
+    while remaining > 0:
+        piece = CHUNK[:remaining]
+        sys.stdout.write(piece)
+        remaining -= len(piece)
+    sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
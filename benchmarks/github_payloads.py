@@ -0,0 +1,142 @@
+"""
+Realistic GitHub webhook deliveries for benchmarking main-agent.
+
+Payloads follow the shape GitHub sends for ``issues``, ``issue_comment`` and
+``pull_request`` events, including the nested user/repository objects the
+parser walks, and are signed the way GitHub signs them.
+"""
+import hashlib
+import hmac
+import json
+import random
+import uuid
+import zlib
+from typing import Any, Dict, Tuple
+
+USERS = ["octocat", "hubot", "monalisa", "dev-bot", "alice", "bob"]
+LABELS = ["bug", "enhancement", "documentation", "urgent", "good first issue", "security"]
+WORDS = (
+    "the webhook handler should retry failed deliveries and report latency "
+    "per repository while keeping the queue bounded under bursty load"
+).split()
+
+
+def sign(body: bytes, secret: str) -> str:
+    """X-Hub-Signature-256 header value for a payload"""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def _user(login: str) -> Dict[str, Any]:
+    return {
+        "login": login,
+        "id": zlib.crc32(login.encode("utf-8")) % 10_000_000,
+        "type": "Bot" if login.endswith("bot") else "User",
+        "html_url": f"https://github.com/{login}",
+        "site_admin": False
+    }
+
+
+def _repository(full_name: str) -> Dict[str, Any]:
+    owner, name = full_name.split("/", 1)
+    return {
+        "id": zlib.crc32(full_name.encode("utf-8")),
+        "name": name,
+        "full_name": full_name,
+        "private": False,
+        "owner": _user(owner),
+        "html_url": f"https://github.com/{full_name}",
+        "default_branch": "main"
+    }
+
+
+def _text(rng: random.Random, size_bytes: int) -> str:
+    words = []
+    length = 0
+    while length < size_bytes:
+        word = rng.choice(WORDS)
+        if rng.random() < 0.03:
+            word = f"@{rng.choice(USERS)}"
+        elif rng.random() < 0.02:
+            word = f"#{rng.choice(LABELS).replace(' ', '-')}"
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _issue(rng: random.Random, full_name: str, number: int, body_bytes: int) -> Dict[str, Any]:
+    author = rng.choice(USERS)
+    return {
+        "id": rng.randint(1, 10**9),
+        "number": number,
+        "title": f"Issue {number}: {_text(rng, 40)}",
+        "body": _text(rng, body_bytes),
+        "state": "open",
+        "user": _user(author),
+        "labels": [{"name": name} for name in rng.sample(LABELS, rng.randint(0, 3))],
+        "assignees": [_user(login) for login in rng.sample(USERS, rng.randint(0, 2))],
+        "created_at": "2025-06-28T19:45:51Z",
+        "updated_at": "2025-06-28T19:47:44Z",
+        "html_url": f"https://github.com/{full_name}/issues/{number}"
+    }
+
+
+def build_delivery(
+    event: str,
+    full_name: str,
+    rng: random.Random,
+    body_bytes: int = 2048
+) -> Tuple[Dict[str, str], bytes]:
+    """Build unsigned headers and raw body for one delivery of ``event``"""
+    number = rng.randint(1, 500)
+    sender = _user(rng.choice(USERS))
+
+    if event == "issues":
+        payload = {
+            "action": rng.choice(["opened", "edited", "labeled", "closed"]),
+            "issue": _issue(rng, full_name, number, body_bytes)
+        }
+    elif event == "issue_comment":
+        payload = {
+            "action": rng.choice(["created", "edited"]),
+            "issue": _issue(rng, full_name, number, 256),
+            "comment": {
+                "id": rng.randint(1, 10**9),
+                "body": _text(rng, body_bytes),
+                "user": sender,
+                "created_at": "2025-06-28T19:45:51Z",
+                "updated_at": "2025-06-28T19:45:51Z",
+                "html_url": f"https://github.com/{full_name}/issues/{number}#issuecomment-1"
+            }
+        }
+    elif event == "pull_request":
+        payload = {
+            "action": rng.choice(["opened", "synchronize", "edited"]),
+            "number": number,
+            "pull_request": {
+                "id": rng.randint(1, 10**9),
+                "number": number,
+                "title": f"PR {number}: {_text(rng, 40)}",
+                "body": _text(rng, body_bytes),
+                "state": "open",
+                "user": sender,
+                "created_at": "2025-06-28T19:45:51Z",
+                "updated_at": "2025-06-28T19:47:44Z",
+                "html_url": f"https://github.com/{full_name}/pull/{number}",
+                "head": {"ref": f"feature/{number}", "sha": f"{rng.getrandbits(160):040x}"},
+                "base": {"ref": "main", "sha": f"{rng.getrandbits(160):040x}"}
+            }
+        }
+    else:
+        payload = {"zen": "Keep it logically awesome.", "hook_id": rng.randint(1, 10**6)}
+
+    payload["repository"] = _repository(full_name)
+    payload["sender"] = sender
+
+    body = json.dumps(payload).encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "GitHub-Hookshot/benchmark",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": str(uuid.UUID(int=rng.getrandbits(128)))
+    }
+    return headers, body
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Replay recorded GitHub deliveries against main-agent.
+
+Reads a log written with RECORD_DELIVERIES=true, re-signs every body with a
+test secret and sends it to POST /webhook/github, in-process through the ASGI
+app (default) or over HTTP with --url.
+
+    # As fast as the concurrency allows
+    python benchmarks/replay_webhooks.py logs/deliveries.jsonl --concurrency 50
+
+    # Fixed rate, or the recorded timing sped up 10x to reproduce a burst
+    python benchmarks/replay_webhooks.py logs/deliveries.jsonl --rate 200
+    python benchmarks/replay_webhooks.py logs/deliveries.jsonl --speed 10
+
+The in-process app is started with the same secret, so signatures verify.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (  # noqa: E402
+    REPO_ROOT, LatencyRecorder, load_service_app, open_client, peak_rss_mb, print_report, rss_mb, run_load
+)
+from github_payloads import sign  # noqa: E402
+
+MAIN_AGENT_DIR = os.path.join(REPO_ROOT, "main-agent")
+
+
+def load_deliveries(path: str, secret: str, limit: Optional[int]) -> List[Dict]:
+    """Read a delivery log and sign each body with ``secret``"""
+    sys.path.insert(0, MAIN_AGENT_DIR)
+    from app.utils.recorder import iter_deliveries
+
+    deliveries = []
+    for delivery in iter_deliveries(path):
+        headers = dict(delivery["headers"])
+        headers["X-Hub-Signature-256"] = sign(delivery["body"], secret)
+        deliveries.append({"timestamp": delivery["timestamp"], "headers": headers, "body": delivery["body"]})
+        if limit and len(deliveries) >= limit:
+            break
+    return deliveries
+
+
+def send_offsets(deliveries: List[Dict], rate: Optional[float], speed: Optional[float]) -> Optional[List[float]]:
+    """Seconds after start at which each delivery is sent, or None for unpaced replay"""
+    if rate:
+        return [index / rate for index in range(len(deliveries))]
+    if speed:
+        first = deliveries[0]["timestamp"]
+        return [max(delivery["timestamp"] - first, 0.0) / speed for delivery in deliveries]
+    return None
+
+
+async def paced_replay(client, deliveries: List[Dict], offsets: List[float], concurrency: int):
+    """Send deliveries on schedule; returns latency summary and worst send lag"""
+    recorder = LatencyRecorder("POST /webhook/github")
+    semaphore = asyncio.Semaphore(concurrency)
+    max_lag = 0.0
+
+    async def send(delivery):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/webhook/github", content=delivery["body"], headers=delivery["headers"])
+                recorder.record(time.perf_counter() - started, status=response.status_code)
+            except Exception as e:
+                recorder.record(time.perf_counter() - started, error=type(e).__name__)
+
+    tasks = []
+    started = time.perf_counter()
+    for delivery, offset in zip(deliveries, offsets):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        tasks.append(asyncio.create_task(send(delivery)))
+
+    await asyncio.gather(*tasks)
+    return recorder.summary(time.perf_counter() - started), max_lag
+
+
+async def run(args) -> None:
+    deliveries = load_deliveries(args.log, args.secret, args.limit) * args.repeat
+    if not deliveries:
+        print(f"No deliveries found in {args.log}")
+        return
+
+    app = None
+    if not args.url:
+        app = load_service_app(MAIN_AGENT_DIR, {
+            "GITHUB_WEBHOOK_SECRET": args.secret,
+            "RECORD_DELIVERIES": "false",
+            "LOG_LEVEL": "WARNING"
+        })
+
+    events: Dict[str, int] = {}
+    for delivery in deliveries:
+        event = delivery["headers"].get("X-GitHub-Event", "unknown")
+        events[event] = events.get(event, 0) + 1
+
+    offsets = send_offsets(deliveries, args.rate, args.speed)
+    pid = args.pid or (None if args.url else os.getpid())
+    extra = {"deliveries": len(deliveries), "events": events, "rss_mb_before": rss_mb(pid)}
+
+    async with open_client(app=app, url=args.url) as client:
+        if offsets is None:
+            async def send(index):
+                delivery = deliveries[index]
+                return await client.post("/webhook/github", content=delivery["body"], headers=delivery["headers"])
+
+            result = await run_load("POST /webhook/github", send, len(deliveries), args.concurrency)
+        else:
+            result, max_lag = await paced_replay(client, deliveries, offsets, args.concurrency)
+            extra["max_send_lag_ms"] = round(max_lag * 1000, 2)
+
+    extra["rss_mb_after"] = rss_mb(pid)
+    if not args.url:
+        extra["peak_rss_mb"] = peak_rss_mb()
+    print_report("webhook replay", [result], extra, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="Delivery log written by main-agent with RECORD_DELIVERIES=true")
+    parser.add_argument("--url", help="Replay against a running service instead of an in-process app")
+    parser.add_argument("--pid", type=int, help="PID of the running service, for RSS reporting with --url")
+    parser.add_argument("--secret", default="replay-secret", help="Secret used to re-sign deliveries")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--rate", type=float, help="Send at a fixed rate (deliveries per second)")
+    pacing.add_argument("--speed", type=float, help="Follow recorded timing, sped up by this factor")
+    parser.add_argument("--concurrency", type=int, default=50, help="Maximum requests in flight")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the log this many times")
+    parser.add_argument("--limit", type=int, help="Only replay the first N deliveries of the log")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import hashlib
+import logging
 import os
-from typing import List, Optional
-from pydantic import BaseSettings, Field
+from typing import List, Optional, Tuple
+from pydantic import BaseSettings, Field, PrivateAttr
 import yaml
 
+logger = logging.getLogger(__name__)
+
 
 class WebhookConfig(BaseSettings):
     secret: str = Field(..., env="GITHUB_WEBHOOK_SECRET")
@@ -14,6 +18,9 @@ class WebhookConfig(BaseSettings):
 class Settings(BaseSettings):
     port: int = Field(default=4044, env="PORT")
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_file: Optional[str] = Field(default=None, env="LOG_FILE")  # Rotated log file; stderr when unset
+    log_max_bytes: int = Field(default=10 * 1024 * 1024, env="LOG_MAX_BYTES")
+    log_backup_count: int = Field(default=5, env="LOG_BACKUP_COUNT")
     debug: bool = Field(default=False, env="DEBUG")
     
     github_webhook_secret: str = Field(..., env="GITHUB_WEBHOOK_SECRET")
@@ -22,28 +29,116 @@ class Settings(BaseSettings):
     
     repository_whitelist: List[str] = []
     
+    # Delivery recording for offline replay (see benchmarks/replay_webhooks.py)
+    record_deliveries: bool = Field(default=False, env="RECORD_DELIVERIES")
+    delivery_log_path: str = Field(default="logs/deliveries.jsonl", env="DELIVERY_LOG_PATH")
+    
+    # Issue and pull request enrichment ("github", "local" fixture files, or "none" for payload data only)
+    enrichment_fetcher: str = Field(default="none", env="ENRICHMENT_FETCHER")
+    github_token: Optional[str] = Field(default=None, env="GITHUB_TOKEN")
+    github_api_url: str = Field(default="https://api.github.com", env="GITHUB_API_URL")
+    enrichment_fixtures_dir: str = Field(default="fixtures/github", env="ENRICHMENT_FIXTURES_DIR")
+    enrichment_max_age: float = Field(default=60.0, env="ENRICHMENT_MAX_AGE")  # Seconds before revalidating
+    enrichment_cache_size: int = Field(default=1000, env="ENRICHMENT_CACHE_SIZE")  # Issues and pull requests kept
+    
+    # Bursts of events on one issue or pull request are coalesced into one dispatch (0 and 0 disable)
+    debounce_quiet_period: float = Field(default=5.0, env="DEBOUNCE_QUIET_PERIOD")  # Seconds without events
+    debounce_max_wait: float = Field(default=30.0, env="DEBOUNCE_MAX_WAIT")  # Seconds after the first event at most
+    
+    # Admission control for webhook intake (events per second; unset disables a limit).
+    # GitHub does not redeliver events refused with 429; they must be redelivered by hand
+    # from the webhook settings page or with benchmarks/replay_webhooks.py.
+    webhook_client_rate_limit: Optional[float] = Field(default=None, env="WEBHOOK_CLIENT_RATE_LIMIT")  # Invalid deliveries per sender address
+    webhook_client_rate_burst: int = Field(default=50, env="WEBHOOK_CLIENT_RATE_BURST")
+    webhook_repository_rate_limit: Optional[float] = Field(default=None, env="WEBHOOK_REPOSITORY_RATE_LIMIT")
+    webhook_repository_rate_burst: int = Field(default=30, env="WEBHOOK_REPOSITORY_RATE_BURST")
+    max_pending_dispatches: Optional[int] = Field(default=None, env="MAX_PENDING_DISPATCHES")  # Open windows and running dispatches
+    normal_priority_shed_fraction: float = Field(default=0.8, env="NORMAL_PRIORITY_SHED_FRACTION")  # Of the maximum, for non-high events
+    
+    # Tracing: spans from webhook receipt to dispatch ("none", "stdout" or "file" as JSON lines)
+    tracing_exporter: str = Field(default="none", env="TRACING_EXPORTER")
+    tracing_file: str = Field(default="logs/traces.jsonl", env="TRACING_FILE")
+    
+    # Admin endpoints (/debug/profile, /debug/loop) require this token in X-Admin-Token; unset disables them
+    admin_token: Optional[str] = Field(default=None, env="ADMIN_TOKEN")
+    profile_max_seconds: float = Field(default=60.0, env="PROFILE_MAX_SECONDS")
+    loop_lag_threshold: float = Field(default=0.5, env="LOOP_LAG_THRESHOLD")  # Seconds; 0 disables the watchdog
+    
+    # Hot reload of config.yml
+    config_watch: bool = Field(default=True, env="CONFIG_WATCH")
+    config_poll_interval: float = Field(default=2.0, env="CONFIG_POLL_INTERVAL")  # Seconds, without inotify
+    _config_version: str = PrivateAttr(default="")
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
     
     def __init__(self, **values):
         super().__init__(**values)
-        self._load_config_file()
-    
-    def _load_config_file(self):
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), self.config_file)
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
-                if config_data and 'webhook' in config_data:
-                    webhook_config = config_data['webhook']
-                    if 'github' in webhook_config and 'repositories' in webhook_config['github']:
-                        repos = webhook_config['github']['repositories']
-                        self.repository_whitelist = [
-                            f"{repo['owner']}/{repo['repo']}" 
-                            for repo in repos 
-                            if repo.get('enabled', True)
-                        ]
+        self.apply_config(self.read_config())
+    
+    @property
+    def config_path(self) -> str:
+        return os.path.join(os.path.dirname(os.path.dirname(__file__)), self.config_file)
+    
+    @property
+    def config_version(self) -> str:
+        """Content hash of the active config.yml"""
+        return self._config_version
+    
+    def read_config(self) -> Tuple[List[str], str]:
+        """
+        Read and validate config.yml without applying it.
+        
+        Returns:
+            Tuple of (repository whitelist, config version)
+        
+        Raises:
+            ValueError: If the file cannot be parsed or is malformed
+        """
+        content = b""
+        if os.path.exists(self.config_path):
+            with open(self.config_path, 'rb') as f:
+                content = f.read()
+        version = hashlib.sha256(content).hexdigest()[:12]
+        
+        try:
+            config_data = yaml.safe_load(content) or {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {self.config_file}: {e}")
+        if not isinstance(config_data, dict):
+            raise ValueError(f"{self.config_file} must contain a mapping")
+        
+        repository_whitelist = []
+        github_config = (config_data.get('webhook') or {}).get('github') or {}
+        if 'repositories' in github_config:
+            repos = github_config['repositories'] or []
+            if not isinstance(repos, list):
+                raise ValueError("webhook.github.repositories must be a list")
+            for index, repo in enumerate(repos):
+                if not isinstance(repo, dict) or not isinstance(repo.get('owner'), str) or not isinstance(repo.get('repo'), str):
+                    raise ValueError(f"webhook.github.repositories[{index}] needs string 'owner' and 'repo' keys")
+                if repo.get('enabled', True):
+                    repository_whitelist.append(f"{repo['owner']}/{repo['repo']}")
+        
+        return repository_whitelist, version
+    
+    def apply_config(self, config: Tuple[List[str], str]):
+        """
+        Swap in configuration returned by read_config.
+        
+        Args:
+            config: Tuple of (repository whitelist, config version)
+        """
+        repository_whitelist, version = config
+        previous_version = self._config_version
+        self.repository_whitelist = repository_whitelist
+        self._config_version = version
+        if previous_version and previous_version != version:
+            logger.info(
+                f"Applied configuration version {version} (was {previous_version}), "
+                f"{len(repository_whitelist)} whitelisted repositories"
+            )
 
 
 settings = Settings()
\ No newline at end of file
@@ -1,15 +1,31 @@
 import logging
+import os
+from logging.handlers import RotatingFileHandler
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app.config import settings
-from app.routers import webhook
+from app.routers import debug, enrichment, webhook
+from app.utils.config_watcher import ConfigWatcher
+from app.utils.debounce import EventDebouncer
+from app.utils.enrichment import EnrichmentCache, create_fetcher
+from app.utils.profiler import LoopWatchdog, SamplingProfiler
+from app.utils.tracing import TracingMiddleware, tracer
+
+log_handlers = None
+if settings.log_file:
+    # Size-capped rotation; uvicorn's loggers propagate here when run through __main__
+    os.makedirs(os.path.dirname(os.path.abspath(settings.log_file)), exist_ok=True)
+    log_handlers = [RotatingFileHandler(
+        settings.log_file, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count
+    )]
 
 logging.basicConfig(
     level=getattr(logging, settings.log_level.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=log_handlers
 )
 
 logger = logging.getLogger(__name__)
@@ -18,9 +34,54 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting GitHub Webhook Service")
+    loop_watchdog = None
+    if settings.loop_lag_threshold:
+        loop_watchdog = LoopWatchdog(settings.loop_lag_threshold)
+        await loop_watchdog.start()
+    app.state.loop_watchdog = loop_watchdog
+    app.state.profiler = SamplingProfiler()
     logger.info(f"Service running on port {settings.port}")
+    logger.info(f"Configuration version {settings.config_version}")
+    if webhook.delivery_recorder is not None:
+        logger.info(f"Recording verified deliveries to {settings.delivery_log_path}")
+    
+    config_watcher = None
+    if settings.config_watch:
+        config_watcher = ConfigWatcher(
+            [settings.config_path],
+            load=settings.read_config,
+            apply=settings.apply_config,
+            poll_interval=settings.config_poll_interval
+        )
+        await config_watcher.start()
+    app.state.config_watcher = config_watcher
+    
+    app.state.enrichment = EnrichmentCache(
+        create_fetcher(
+            settings.enrichment_fetcher, settings.github_token, settings.github_api_url, settings.enrichment_fixtures_dir
+        ),
+        max_age=settings.enrichment_max_age,
+        max_entries=settings.enrichment_cache_size
+    )
+    logger.info(f"Issue enrichment fetcher: {settings.enrichment_fetcher}")
+    
+    app.state.debouncer = EventDebouncer(
+        webhook.dispatch_event,
+        quiet_period=settings.debounce_quiet_period,
+        max_wait=settings.debounce_max_wait
+    )
     yield
     logger.info("Shutting down GitHub Webhook Service")
+    # Open windows are dispatched rather than dropped
+    await app.state.debouncer.close()
+    if config_watcher is not None:
+        await config_watcher.stop()
+    if webhook.delivery_recorder is not None:
+        webhook.delivery_recorder.close()
+    await app.state.enrichment.close()
+    tracer.close()
+    if loop_watchdog is not None:
+        await loop_watchdog.stop()
 
 
 app = FastAPI(
@@ -37,8 +98,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so request spans include the time spent in other middleware
+app.add_middleware(TracingMiddleware, tracer=tracer)
 
 app.include_router(webhook.router, prefix="/webhook", tags=["webhook"])
+app.include_router(enrichment.router, prefix="/enrichment", tags=["enrichment"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 
 @app.get("/")
@@ -54,7 +119,27 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "service": "GitHub Webhook Service"
+        "service": "GitHub Webhook Service",
+        "config_version": settings.config_version
+    }
+
+
+@app.get("/config")
+async def config_status():
+    watcher = app.state.config_watcher
+    return {
+        "version": settings.config_version,
+        "repository_whitelist": settings.repository_whitelist,
+        "watcher": watcher.get_stats() if watcher is not None else None
+    }
+
+
+@app.get("/events")
+async def event_status():
+    return {
+        **app.state.debouncer.get_stats(),
+        "admission": webhook.admission_stats(),
+        "tracing": tracer.get_stats()
     }
 
 
@@ -72,5 +157,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        log_config=None if settings.log_file else uvicorn.config.LOGGING_CONFIG
     )
\ No newline at end of file
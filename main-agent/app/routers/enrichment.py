@@ -0,0 +1,67 @@
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def enrichment_stats(request: Request) -> Dict[str, Any]:
+    """
+    Enrichment cache counters.
+    
+    Returns:
+        Dict with the fetcher, entry count and hit/request counters
+    """
+    return request.app.state.enrichment.get_stats()
+
+
+@router.get("/{owner}/{repo}/issues/{number}")
+async def get_issue(request: Request, owner: str, repo: str, number: int, comments: bool = True) -> Dict[str, Any]:
+    """
+    Issue with its comment thread, from the cache or revalidated against GitHub.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        number: Issue or pull request number
+        comments: Include the comment thread
+    
+    Returns:
+        Dict with "issue" and "comments"
+    """
+    try:
+        issue = await request.app.state.enrichment.get_issue(f"{owner}/{repo}", number, comments=comments)
+    except Exception as e:
+        logger.error(f"Error fetching issue {owner}/{repo}#{number}: {e}")
+        raise HTTPException(status_code=502, detail=f"Could not fetch issue: {e}")
+    if issue is None:
+        raise HTTPException(status_code=404, detail=f"Issue {owner}/{repo}#{number} not found")
+    return issue
+
+
+@router.get("/{owner}/{repo}/pulls/{number}")
+async def get_pull_request(request: Request, owner: str, repo: str, number: int, diff: bool = True) -> Dict[str, Any]:
+    """
+    Pull request with the diff of its current head.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        number: Pull request number
+        diff: Include the unified diff
+    
+    Returns:
+        Dict with "pull_request" and "diff"
+    """
+    try:
+        pull_request = await request.app.state.enrichment.get_pull_request(f"{owner}/{repo}", number, diff=diff)
+    except Exception as e:
+        logger.error(f"Error fetching pull request {owner}/{repo}#{number}: {e}")
+        raise HTTPException(status_code=502, detail=f"Could not fetch pull request: {e}")
+    if pull_request is None:
+        raise HTTPException(status_code=404, detail=f"Pull request {owner}/{repo}#{number} not found")
+    return pull_request
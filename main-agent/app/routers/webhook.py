@@ -4,13 +4,78 @@ from fastapi import APIRouter, Request, HTTPException, Header
 from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.utils.debounce import CoalescedEvent
 from app.utils.github import verify_webhook_signature
 from app.utils.parser import parse_github_event
+from app.utils.rate_limit import create_limiter, retry_after
+from app.utils.recorder import DeliveryRecorder
+from app.utils.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+delivery_recorder = DeliveryRecorder(settings.delivery_log_path) if settings.record_deliveries else None
+
+client_limiter = create_limiter(settings.webhook_client_rate_limit, settings.webhook_client_rate_burst)
+repository_limiter = create_limiter(settings.webhook_repository_rate_limit, settings.webhook_repository_rate_burst)
+shed_events: Dict[str, int] = {"normal": 0, "high": 0}
+
+
+def too_many_requests(message: str, wait: float) -> JSONResponse:
+    """
+    429 response asking the sender to retry later.
+    
+    Args:
+        message: Reason for the refusal
+        wait: Seconds until the event would be accepted
+    
+    Returns:
+        JSONResponse with a Retry-After header
+    """
+    logger.warning(message)
+    return JSONResponse(
+        status_code=429,
+        content={"status": "rejected", "message": message},
+        headers={"Retry-After": retry_after(wait)}
+    )
+
+
+def admission_stats() -> Dict[str, Any]:
+    """
+    Rate limit and shedding counters.
+    
+    Returns:
+        Dict with refusals per limit
+    """
+    return {
+        "client_rate_limited": client_limiter.limited if client_limiter is not None else None,
+        "repository_rate_limited": repository_limiter.limited if repository_limiter is not None else None,
+        "max_pending_dispatches": settings.max_pending_dispatches,
+        "shed_events": dict(shed_events)
+    }
+
+
+async def dispatch_event(event: CoalescedEvent):
+    """
+    Act on a debounced window of events.
+    
+    Args:
+        event: Coalesced events of one (repository, number, rule) window
+    """
+    repository, number, rule = event.key
+    with tracer.span(
+        "webhook.dispatch", parent=event.traceparents[0] if event.traceparents else None,
+        repository=repository, number=number, rule=rule, events=event.count, links=event.traceparents[1:]
+    ):
+        logger.info(
+            f"Dispatching {rule} on {repository}#{number}: {event.count} event(s) coalesced, "
+            f"actions: {', '.join(event.actions)}, mentions: {event.mentions}"
+        )
+        
+        # TODO: In Stage 2, this is where we'll implement tag matching and command execution;
+        # send tracer.inject(headers) with job requests so agent-service spans join this trace
+
 
 @router.post("/github")
 async def handle_github_webhook(
@@ -32,18 +97,35 @@ async def handle_github_webhook(
         JSONResponse with status and message
     """
     try:
+        # Refuse senders of forged or misconfigured deliveries before spending time on signature checks.
+        # Only failed verifications are charged: GitHub shares a few sender addresses across all
+        # repositories (or the address is a proxy's), and it does not redeliver refused events.
+        client = request.client.host if request.client else "unknown"
+        if client_limiter is not None:
+            wait = client_limiter.check(client)
+            if wait:
+                return too_many_requests(f"Too many invalid deliveries from client {client}", wait)
+        
         # Get raw payload
         payload_bytes = await request.body()
         
         # Verify webhook signature
-        if not verify_webhook_signature(
-            payload_bytes, 
-            x_hub_signature_256, 
-            settings.github_webhook_secret
-        ):
+        with tracer.span("webhook.verify_signature", size=len(payload_bytes)):
+            verified = verify_webhook_signature(
+                payload_bytes, 
+                x_hub_signature_256, 
+                settings.github_webhook_secret
+            )
+        if not verified:
+            if client_limiter is not None:
+                client_limiter.take(client)
             logger.warning(f"Invalid webhook signature for delivery: {x_github_delivery}")
             raise HTTPException(status_code=401, detail="Invalid signature")
         
+        # Record the verified delivery for offline replay
+        if delivery_recorder is not None:
+            delivery_recorder.record(request.headers, payload_bytes)
+        
         # Parse JSON payload
         payload = await request.json()
         
@@ -78,8 +160,14 @@ async def handle_github_webhook(
                 }
             )
         
+        if repository_limiter is not None:
+            wait = repository_limiter.take(repo_full_name)
+            if wait:
+                return too_many_requests(f"Rate limit exceeded for repository {repo_full_name}", wait)
+        
         # Parse the GitHub event
-        parsed_event = parse_github_event(x_github_event, payload)
+        with tracer.span("webhook.parse", event=x_github_event):
+            parsed_event = parse_github_event(x_github_event, payload)
         if not parsed_event:
             logger.error(f"Failed to parse {x_github_event} event")
             return JSONResponse(
@@ -90,6 +178,25 @@ async def handle_github_webhook(
                 }
             )
         
+        # Shed new work when dispatches back up, normal priority before high;
+        # events joining an open window add no dispatch and are always taken
+        debouncer = request.app.state.debouncer
+        if settings.max_pending_dispatches is not None and not debouncer.joins_open_window(parsed_event):
+            limit = settings.max_pending_dispatches
+            priority = parsed_event.get("attention", {}).get("priority", "normal")
+            if priority != "high":
+                limit = max(1, int(limit * settings.normal_priority_shed_fraction))
+            if debouncer.pending >= limit:
+                shed_events["high" if priority == "high" else "normal"] += 1
+                return too_many_requests(
+                    f"Too many pending dispatches ({debouncer.pending}), shedding "
+                    f"{priority} priority {x_github_event} event",
+                    settings.debounce_quiet_period or 5.0
+                )
+        
+        # Keep cached issue and pull request data current without refetching
+        request.app.state.enrichment.observe(x_github_event, payload)
+        
         # Log parsed event details
         action = parsed_event.get("action", "")
         mentions = parsed_event.get("mentions", [])
@@ -134,7 +241,10 @@ async def handle_github_webhook(
                 f"({pr_info.get('head_branch')} → {pr_info.get('base_branch')})"
             )
         
-        # TODO: In Stage 2, this is where we'll implement tag matching and command execution
+        # Coalesce bursts (pushes, edit storms) into one dispatch with the latest state
+        with tracer.span("webhook.debounce", rule=x_github_event) as span:
+            window = debouncer.submit(parsed_event, x_github_delivery, tracer.current_traceparent())
+            span.set_attribute("coalesced_events", window.count if window is not None else 1)
         
         return JSONResponse(
             status_code=200,
@@ -148,10 +258,14 @@ async def handle_github_webhook(
                 "mentions": mentions,
                 "attention_required": attention.get("requires_attention", False),
                 "priority": attention.get("priority", "normal"),
+                "coalesced_events": window.count if window is not None else 1,
                 "parsed_data": parsed_event
             }
         )
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
         logger.error(f"Failed to parse webhook payload: {e}")
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
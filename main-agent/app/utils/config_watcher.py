@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from watchfiles import awatch
+except ImportError:  # Installed with uvicorn[standard]; poll when it is missing
+    awatch = None
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigWatcher:
+    """
+    Reload configuration when watched files change.
+
+    Uses inotify through watchfiles when available and falls back to polling
+    modification times. New configuration is loaded and validated in a worker
+    thread and only swapped in when valid, so a bad edit leaves the active
+    configuration in place.
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        load: Callable[[], Any],
+        apply: Callable[[Any], None],
+        poll_interval: float = 2.0
+    ):
+        """
+        Args:
+            paths: Files or directories to watch
+            load: Reads and validates the configuration, raising on invalid input
+            apply: Swaps a loaded configuration in (called on the event loop)
+            poll_interval: Seconds between checks when polling
+        """
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.load = load
+        self.apply = apply
+        self.poll_interval = poll_interval
+        self.backend = "inotify" if awatch is not None else "polling"
+        self.reloads = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self.last_reload_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._initial_signature: List[Tuple[str, int, int]] = []
+
+    async def start(self):
+        """Start watching in the background."""
+        if self._task is None:
+            self._stop_event = asyncio.Event()
+            # Taken now so changes made while the watcher task spins up are not missed
+            self._initial_signature = self._signature()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop watching."""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reload(self) -> bool:
+        """
+        Load and validate the configuration, then swap it in.
+
+        Returns:
+            bool: True if the new configuration was applied
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            config = await loop.run_in_executor(None, self.load)
+        except Exception as e:
+            self.rejected += 1
+            self.last_error = str(e)
+            logger.error(f"Rejected configuration change, keeping the active config: {e}")
+            return False
+
+        self.apply(config)
+        self.reloads += 1
+        self.last_error = None
+        self.last_reload_at = datetime.utcnow()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Watcher state for status endpoints.
+
+        Returns:
+            Dict with the watch backend, paths and reload counters
+        """
+        return {
+            "backend": self.backend,
+            "paths": self.paths,
+            "reloads": self.reloads,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+            "last_reload_at": self.last_reload_at.isoformat() if self.last_reload_at else None
+        }
+
+    async def _run(self):
+        if self.backend == "inotify":
+            try:
+                await self._watch_events()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. the inotify watch limit is exhausted
+                logger.warning(f"File events unavailable ({e}), polling for config changes")
+                self.backend = "polling"
+        await self._watch_polling()
+
+    async def _watch_events(self):
+        # Watch parent directories so editors that replace files by rename are picked up
+        directories = sorted({path if os.path.isdir(path) else os.path.dirname(path) for path in self.paths})
+        directories = [directory for directory in directories if os.path.isdir(directory)]
+        if not directories:
+            raise RuntimeError("no existing directories to watch")
+
+        async for _ in awatch(
+            *directories,
+            watch_filter=lambda change, path: self._is_watched(path),
+            stop_event=self._stop_event,
+            recursive=False
+        ):
+            await self.reload()
+
+    async def _watch_polling(self):
+        loop = asyncio.get_running_loop()
+        signature = self._initial_signature
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            current = await loop.run_in_executor(None, self._signature)
+            if current != signature:
+                signature = current
+                await self.reload()
+
+    def _is_watched(self, path: str) -> bool:
+        path = os.path.abspath(path)
+        return any(path == watched or path.startswith(watched + os.sep) for watched in self.paths)
+
+    def _signature(self) -> List[Tuple[str, int, int]]:
+        files = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+            else:
+                files.append(path)
+
+        signature = []
+        for path in files:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, -1, -1))
+        return signature
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DebounceKey = Tuple[str, int, str]
+
+
+def debounce_key(parsed_event: Dict[str, Any]) -> Optional[DebounceKey]:
+    """
+    Key of the debounce window an event belongs to.
+
+    Issue comments and issue events on the same number are separate rules,
+    so a comment burst never delays the reaction to an issue edit. Comments
+    on a pull request share the pull request's number.
+
+    Args:
+        parsed_event: Event as returned by parse_github_event
+
+    Returns:
+        Tuple of (repository, issue or pull request number, rule), or None
+        if the event has no number
+    """
+    event_type = parsed_event.get("event_type", "")
+    subject = parsed_event.get("pull_request" if event_type == "pull_request" else "issue") or {}
+    number = subject.get("number")
+    if number is None:
+        return None
+    return parsed_event.get("repository", {}).get("full_name", ""), number, event_type
+
+
+class CoalescedEvent:
+    """Events of one debounce window, dispatched as a single event carrying the latest state."""
+
+    __slots__ = (
+        "key", "latest", "deliveries", "actions", "mentions", "traceparents", "first_at", "last_at", "first_seen", "count"
+    )
+
+    def __init__(
+        self,
+        key: DebounceKey,
+        parsed_event: Dict[str, Any],
+        delivery_id: Optional[str],
+        traceparent: Optional[str] = None
+    ):
+        self.key = key
+        self.latest = parsed_event
+        self.deliveries: List[str] = []
+        self.actions: List[str] = []
+        self.mentions: List[str] = []
+        self.traceparents: List[str] = []
+        self.first_at = time.monotonic()
+        self.last_at = self.first_at
+        self.first_seen = datetime.utcnow()
+        self.count = 0
+        self.add(parsed_event, delivery_id, traceparent)
+
+    def add(self, parsed_event: Dict[str, Any], delivery_id: Optional[str], traceparent: Optional[str] = None):
+        self.latest = parsed_event
+        self.last_at = time.monotonic()
+        self.count += 1
+        if delivery_id:
+            self.deliveries.append(delivery_id)
+        # Trace of each delivery; the dispatch continues the first and links the rest
+        if traceparent:
+            self.traceparents.append(traceparent)
+        action = parsed_event.get("action", "")
+        if action not in self.actions:
+            self.actions.append(action)
+        # Mentions of earlier comments still need attention after a later one arrives
+        for mention in parsed_event.get("mentions", []):
+            if mention not in self.mentions:
+                self.mentions.append(mention)
+
+    def to_dict(self) -> Dict[str, Any]:
+        repository, number, rule = self.key
+        return {
+            "repository": repository,
+            "number": number,
+            "rule": rule,
+            "events": self.count,
+            "actions": self.actions,
+            "mentions": self.mentions,
+            "deliveries": self.deliveries,
+            "first_seen": self.first_seen.isoformat(),
+            "latest": self.latest
+        }
+
+
+class EventDebouncer:
+    """
+    Coalesce bursts of webhook events into one dispatch per window.
+
+    Events are grouped by (repository, number, rule). A window is flushed
+    once no event arrived for ``quiet_period`` seconds, or ``max_wait``
+    seconds after its first event at the latest, so a steady stream of
+    pushes or edits still dispatches regularly.
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[CoalescedEvent], Awaitable[None]],
+        quiet_period: float = 5.0,
+        max_wait: float = 30.0
+    ):
+        """
+        Args:
+            dispatch: Called with each flushed window
+            quiet_period: Seconds without events before a window is flushed
+            max_wait: Upper bound on seconds between a window's first event and its dispatch
+        """
+        self.dispatch = dispatch
+        self.quiet_period = quiet_period
+        self.max_wait = max_wait
+        self._windows: Dict[DebounceKey, CoalescedEvent] = {}
+        self._timers: Dict[DebounceKey, asyncio.TimerHandle] = {}
+        self._dispatching: Set[asyncio.Task] = set()
+        self.received = 0
+        self.dispatched = 0
+
+    def submit(
+        self,
+        parsed_event: Dict[str, Any],
+        delivery_id: Optional[str] = None,
+        traceparent: Optional[str] = None
+    ) -> Optional[CoalescedEvent]:
+        """
+        Add an event to its window, opening one if needed.
+
+        Args:
+            parsed_event: Event as returned by parse_github_event
+            delivery_id: X-GitHub-Delivery header value
+            traceparent: Trace context of the webhook request that delivered the event
+
+        Returns:
+            The window the event joined, or None if it was dispatched directly
+        """
+        self.received += 1
+        key = debounce_key(parsed_event)
+        if key is None or (self.quiet_period <= 0 and self.max_wait <= 0):
+            self._start_dispatch(CoalescedEvent(key or ("", 0, ""), parsed_event, delivery_id, traceparent))
+            return None
+
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = CoalescedEvent(key, parsed_event, delivery_id, traceparent)
+        else:
+            window.add(parsed_event, delivery_id, traceparent)
+            self._timers.pop(key).cancel()
+
+        delay = min(self.quiet_period, window.first_at + self.max_wait - time.monotonic())
+        self._timers[key] = asyncio.get_running_loop().call_later(max(delay, 0.0), self._flush, key)
+        return window
+
+    @property
+    def pending(self) -> int:
+        """Dispatches not finished yet: open windows and dispatches in progress."""
+        return len(self._windows) + len(self._dispatching)
+
+    def joins_open_window(self, parsed_event: Dict[str, Any]) -> bool:
+        """
+        Whether an event would be coalesced into a window that is already open.
+
+        Args:
+            parsed_event: Event as returned by parse_github_event
+
+        Returns:
+            bool: True if the event adds no new dispatch
+        """
+        return debounce_key(parsed_event) in self._windows
+
+    async def close(self):
+        """Dispatch every open window now and wait for dispatches in progress."""
+        for key in list(self._windows):
+            self._timers.pop(key).cancel()
+            self._flush(key)
+        if self._dispatching:
+            await asyncio.gather(*self._dispatching, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Debouncer state for status endpoints.
+
+        Returns:
+            Dict with the window settings, counters and open windows
+        """
+        return {
+            "quiet_period": self.quiet_period,
+            "max_wait": self.max_wait,
+            "received": self.received,
+            "dispatched": self.dispatched,
+            "coalesced": self.received - self.dispatched - sum(window.count for window in self._windows.values()),
+            "dispatching": len(self._dispatching),
+            "open_windows": [
+                {"repository": repository, "number": number, "rule": rule, "events": window.count}
+                for (repository, number, rule), window in self._windows.items()
+            ]
+        }
+
+    def _flush(self, key: DebounceKey):
+        self._timers.pop(key, None)
+        window = self._windows.pop(key, None)
+        if window is not None:
+            self._start_dispatch(window)
+
+    def _start_dispatch(self, window: CoalescedEvent):
+        self.dispatched += 1
+        task = asyncio.create_task(self._dispatch(window))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, window: CoalescedEvent):
+        try:
+            await self.dispatch(window)
+        except Exception as e:
+            repository, number, rule = window.key
+            logger.error(f"Error dispatching {rule} events for {repository}#{number}: {e}", exc_info=True)
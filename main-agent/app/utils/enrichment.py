@@ -0,0 +1,388 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # Only needed by the GitHub fetcher
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DIFF_MEDIA_TYPE = "application/vnd.github.v3.diff"
+
+
+class EnrichmentFetcher:
+    """
+    Source of issue and pull request data for the enrichment cache.
+
+    Subclasses implement fetch(); a 304-style "not modified" answer is
+    signalled by returning None.
+    """
+
+    name = "none"
+
+    async def fetch(
+        self,
+        path: str,
+        etag: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        diff: bool = False
+    ) -> Optional[Tuple[Any, Optional[str]]]:
+        """
+        Fetch one API resource, revalidating a cached copy.
+
+        Args:
+            path: API path, e.g. "repos/owner/repo/issues/1"
+            etag: ETag of the cached copy, sent as If-None-Match
+            params: Query parameters
+            diff: Fetch the resource as a unified diff instead of JSON
+
+        Returns:
+            Tuple of (data, etag), or None if the cached copy is still current
+
+        Raises:
+            LookupError: If the resource does not exist
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections."""
+
+
+class GitHubFetcher(EnrichmentFetcher):
+    """Fetches from the GitHub REST API with conditional requests."""
+
+    name = "github"
+
+    def __init__(self, token: Optional[str], api_url: str = "https://api.github.com", timeout: float = 10.0):
+        if httpx is None:
+            raise RuntimeError("The github enrichment fetcher requires httpx")
+        headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self.client = httpx.AsyncClient(base_url=api_url.rstrip("/") + "/", headers=headers, timeout=timeout)
+
+    async def fetch(
+        self,
+        path: str,
+        etag: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        diff: bool = False
+    ) -> Optional[Tuple[Any, Optional[str]]]:
+        headers = {}
+        if etag:
+            # 304 answers do not count against the rate limit
+            headers["If-None-Match"] = etag
+        if diff:
+            headers["Accept"] = DIFF_MEDIA_TYPE
+        response = await self.client.get(path, params=params, headers=headers)
+        if response.status_code == 304:
+            return None
+        if response.status_code == 404:
+            raise LookupError(path)
+        response.raise_for_status()
+        return (response.text if diff else response.json()), response.headers.get("ETag")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class LocalFetcher(EnrichmentFetcher):
+    """
+    Serves resources from files, for tests and offline replay.
+
+    ``<directory>/<path>.json`` holds a JSON resource and ``<path>.diff`` a
+    diff; the ETag is a hash of the file content, so editing a file acts
+    like a change on GitHub.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    async def fetch(
+        self,
+        path: str,
+        etag: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        diff: bool = False
+    ) -> Optional[Tuple[Any, Optional[str]]]:
+        file_path = os.path.join(self.directory, path + (".diff" if diff else ".json"))
+        try:
+            with open(file_path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            raise LookupError(path)
+        current = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        if etag == current:
+            return None
+        text = content.decode("utf-8")
+        return (text if diff else json.loads(text)), current
+
+
+def create_fetcher(kind: str, token: Optional[str], api_url: str, fixtures_dir: str) -> Optional[EnrichmentFetcher]:
+    """
+    Build the configured fetcher.
+
+    Args:
+        kind: "github", "local" or "none" (payload data only)
+        token: GitHub token for the github fetcher
+        api_url: GitHub API base URL
+        fixtures_dir: Directory served by the local fetcher
+
+    Returns:
+        The fetcher, or None when fetching is disabled
+    """
+    if kind == "github":
+        return GitHubFetcher(token, api_url)
+    if kind == "local":
+        return LocalFetcher(fixtures_dir)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown enrichment fetcher: {kind}")
+
+
+class EnrichmentCache:
+    """
+    Issue and pull request data beyond what a webhook payload carries.
+
+    Entries are keyed by (repository, number). Webhook payloads update
+    entries in place (issue fields, added/edited/deleted comments, pull
+    request head), so a busy issue is kept current without refetching.
+    Data older than ``max_age`` is revalidated with its ETag, and comments
+    are refreshed with ``since`` so only new or edited ones are transferred.
+    Diffs are cached per head commit.
+    """
+
+    def __init__(self, fetcher: Optional[EnrichmentFetcher], max_age: float = 60.0, max_entries: int = 1000):
+        """
+        Args:
+            fetcher: Source for data not in the cache, or None to use webhook data only
+            max_age: Seconds before cached data is revalidated
+            max_entries: Entries kept, least recently used evicted first
+        """
+        self.fetcher = fetcher
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+        self.hits = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.webhook_updates = 0
+
+    def observe(self, event_type: str, payload: Dict[str, Any]):
+        """
+        Apply the issue, comment or pull request data carried by a webhook payload.
+
+        Args:
+            event_type: X-GitHub-Event header value
+            payload: Raw webhook payload
+        """
+        repository = (payload.get("repository") or {}).get("full_name")
+        if not repository:
+            return
+        now = time.monotonic()
+
+        if event_type in ("issues", "issue_comment") and payload.get("issue"):
+            issue = payload["issue"]
+            entry = self._entry(repository, issue.get("number"))
+            # Payload issues have the same shape as the REST representation
+            entry["issue"] = issue
+            entry["issue_at"] = now
+            if event_type == "issue_comment" and payload.get("comment") and entry["comments"] is not None:
+                comment = payload["comment"]
+                if payload.get("action") == "deleted":
+                    entry["comments"].pop(comment.get("id"), None)
+                else:
+                    entry["comments"][comment.get("id")] = comment
+            self.webhook_updates += 1
+
+        elif event_type == "pull_request" and payload.get("pull_request"):
+            pull_request = payload["pull_request"]
+            entry = self._entry(repository, pull_request.get("number"))
+            entry["pull_request"] = pull_request
+            entry["pull_request_at"] = now
+            self.webhook_updates += 1
+
+    async def get_issue(self, repository: str, number: int, comments: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Issue with its comment thread.
+
+        Args:
+            repository: Full repository name (owner/repo)
+            number: Issue or pull request number
+            comments: Include the comment thread
+
+        Returns:
+            Dict with "issue" and "comments", or None if unknown and not fetchable
+        """
+        async with self._lock(repository, number):
+            entry = self._entry(repository, number)
+            await self._refresh(entry, "issue", f"repos/{repository}/issues/{number}")
+            if entry["issue"] is None:
+                return None
+            if comments:
+                await self._refresh_comments(entry, repository, number)
+            thread = sorted((entry["comments"] or {}).values(), key=lambda comment: comment.get("created_at") or "")
+            return {"issue": entry["issue"], "comments": thread if comments else None}
+
+    async def get_pull_request(self, repository: str, number: int, diff: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Pull request with the diff of its current head.
+
+        Args:
+            repository: Full repository name (owner/repo)
+            number: Pull request number
+            diff: Include the unified diff
+
+        Returns:
+            Dict with "pull_request" and "diff", or None if unknown and not fetchable
+        """
+        async with self._lock(repository, number):
+            entry = self._entry(repository, number)
+            path = f"repos/{repository}/pulls/{number}"
+            await self._refresh(entry, "pull_request", path)
+            pull_request = entry["pull_request"]
+            if pull_request is None:
+                return None
+            if not diff:
+                return {"pull_request": pull_request, "diff": None}
+
+            # A push moves the head, so a cached diff is current as long as the head is unchanged
+            head = (pull_request.get("head") or {}).get("sha")
+            cached = entry["diff"]
+            if cached is not None and cached["head"] == head:
+                self.hits += 1
+            elif self.fetcher is not None:
+                try:
+                    fetched = await self._fetch(path, None, diff=True)
+                except Exception as e:
+                    # The pull request itself is still worth returning; a diff of another head is not
+                    logger.warning(f"Could not fetch the diff of {path}: {e}")
+                    fetched = None
+                cached = {"head": head, "text": fetched[0]} if fetched is not None else None
+                if cached is not None:
+                    entry["diff"] = cached
+            else:
+                cached = None
+            return {"pull_request": pull_request, "diff": cached["text"] if cached else None}
+
+    async def close(self):
+        if self.fetcher is not None:
+            await self.fetcher.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Cache counters for status endpoints.
+
+        Returns:
+            Dict with the fetcher, entry count and hit/request counters
+        """
+        return {
+            "fetcher": self.fetcher.name if self.fetcher is not None else "none",
+            "entries": len(self._entries),
+            "max_age": self.max_age,
+            "hits": self.hits,
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "webhook_updates": self.webhook_updates
+        }
+
+    def _entry(self, repository: str, number: int) -> Dict[str, Any]:
+        key = (repository, number)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {
+                "issue": None, "issue_etag": None, "issue_at": None,
+                "pull_request": None, "pull_request_etag": None, "pull_request_at": None,
+                # None until the thread has been fetched once; webhook comments are merged after that
+                "comments": None, "comments_at": None, "comments_since": None,
+                "diff": None
+            }
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                lock = self._locks.get(evicted)
+                if lock is not None and not lock.locked():
+                    del self._locks[evicted]
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _lock(self, repository: str, number: int) -> asyncio.Lock:
+        # Concurrent lookups of one issue share a single fetch
+        return self._locks.setdefault((repository, number), asyncio.Lock())
+
+    def _fresh(self, fetched_at: Optional[float]) -> bool:
+        return fetched_at is not None and time.monotonic() - fetched_at < self.max_age
+
+    async def _fetch(
+        self,
+        path: str,
+        etag: Optional[str],
+        params: Optional[Dict[str, str]] = None,
+        diff: bool = False
+    ) -> Optional[Tuple[Any, Optional[str]]]:
+        self.requests += 1
+        fetched = await self.fetcher.fetch(path, etag, params=params, diff=diff)
+        if fetched is None:
+            self.not_modified += 1
+        return fetched
+
+    async def _refresh(self, entry: Dict[str, Any], kind: str, path: str):
+        """Revalidate the issue or pull request of an entry if it is stale"""
+        if entry[kind] is not None and (self.fetcher is None or self._fresh(entry[f"{kind}_at"])):
+            self.hits += 1
+            return
+        if self.fetcher is None:
+            return
+        try:
+            fetched = await self._fetch(path, entry[f"{kind}_etag"] if entry[kind] is not None else None)
+        except LookupError:
+            return
+        except Exception as e:
+            if entry[kind] is None:
+                raise
+            logger.warning(f"Serving cached {path} after failed revalidation: {e}")
+            return
+        if fetched is not None:
+            entry[kind], entry[f"{kind}_etag"] = fetched
+        entry[f"{kind}_at"] = time.monotonic()
+
+    async def _refresh_comments(self, entry: Dict[str, Any], repository: str, number: int):
+        if entry["comments"] is not None and (self.fetcher is None or self._fresh(entry["comments_at"])):
+            self.hits += 1
+            return
+        if self.fetcher is None:
+            if entry["comments"] is None:
+                entry["comments"] = {}
+            return
+
+        comments = {} if entry["comments"] is None else entry["comments"]
+        params = {"per_page": "100"}
+        if entry["comments_since"]:
+            # Only comments created or edited since the last fetch
+            params["since"] = entry["comments_since"]
+        page = 1
+        while True:
+            params["page"] = str(page)
+            fetched = await self._fetch(f"repos/{repository}/issues/{number}/comments", None, params=params)
+            batch: List[Dict[str, Any]] = fetched[0] if fetched is not None else []
+            for comment in batch:
+                comments[comment.get("id")] = comment
+            if len(batch) < 100:
+                break
+            page += 1
+
+        entry["comments"] = comments
+        entry["comments_at"] = time.monotonic()
+        updated = [comment.get("updated_at") for comment in comments.values() if comment.get("updated_at")]
+        entry["comments_since"] = max(updated) if updated else None
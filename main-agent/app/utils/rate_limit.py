@@ -0,0 +1,140 @@
+import math
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Spend one token if available.
+
+        Args:
+            now: time.monotonic() value
+
+        Returns:
+            float: 0 if a token was spent, otherwise seconds until one is available
+        """
+        wait = self.wait_time(now)
+        if not wait:
+            self.tokens -= 1
+        return wait
+
+    def wait_time(self, now: float) -> float:
+        """
+        Seconds until a token is available, without spending it.
+
+        Args:
+            now: time.monotonic() value
+
+        Returns:
+            float: 0 if a token is available now
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Token buckets per key, e.g. per repository or client address.
+
+    Buckets that have refilled completely are dropped once ``max_keys`` is
+    reached, so one-off senders do not accumulate.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket size
+            max_keys: Buckets kept before idle ones are dropped
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.limited = 0
+
+    def take(self, key: str) -> float:
+        """
+        Spend a token from the bucket of ``key``.
+
+        Args:
+            key: Bucket key
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the next token
+        """
+        now = time.monotonic()
+        wait = self._bucket(key, now).take(now)
+        if wait:
+            self.limited += 1
+        return wait
+
+    def check(self, key: str) -> float:
+        """
+        Whether ``key`` has a token left, without spending it.
+
+        Args:
+            key: Bucket key
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the next token
+        """
+        now = time.monotonic()
+        wait = self._bucket(key, now).wait_time(now)
+        if wait:
+            self.limited += 1
+        return wait
+
+    def _bucket(self, key: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self._prune(now)
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.burst, now)
+        return bucket
+
+    def _prune(self, now: float):
+        for key in [key for key, bucket in self.buckets.items()
+                    if bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.burst]:
+            del self.buckets[key]
+
+
+def create_limiter(rate: Optional[float], burst: float) -> Optional[RateLimiter]:
+    """
+    Build a limiter, or None when no rate is configured.
+
+    Args:
+        rate: Tokens per second, or None to disable
+        burst: Bucket size
+
+    Returns:
+        The limiter, or None
+    """
+    return RateLimiter(rate, burst) if rate else None
+
+
+def retry_after(seconds: float) -> str:
+    """
+    Retry-After header value for a wait in seconds.
+
+    Args:
+        seconds: Seconds until the request may succeed
+
+    Returns:
+        str: Whole seconds, at least 1
+    """
+    return str(max(1, math.ceil(min(seconds, 3600))))
@@ -0,0 +1,109 @@
+import base64
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Headers worth keeping for replay; the signature is recomputed on replay
+RECORDED_HEADERS = (
+    "X-GitHub-Event",
+    "X-GitHub-Delivery",
+    "X-GitHub-Hook-ID",
+    "User-Agent",
+    "Content-Type",
+)
+
+
+class DeliveryRecorder:
+    """
+    Append-only log of verified webhook deliveries.
+
+    Each line is a compact JSON record holding the receive time, the
+    replay-relevant headers and the raw body, so deliveries can be replayed
+    byte-for-byte with a freshly computed signature. Lines are written and
+    flushed on a thread of their own, in the order they were recorded, so a
+    slow disk does not hold up webhook intake.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[TextIO] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="delivery-recorder")
+        self.recorded = 0
+
+    def record(self, headers: Dict[str, str], body: bytes):
+        """
+        Append one delivery to the log.
+
+        Args:
+            headers: Request headers (case-insensitive mapping)
+            body: Raw request body as received
+        """
+        record: Dict[str, Any] = {
+            "t": round(time.time(), 3),
+            "h": {name: headers[name] for name in RECORDED_HEADERS if headers.get(name) is not None},
+        }
+        try:
+            record["b"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            record["b64"] = base64.b64encode(body).decode("ascii")
+
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        self._executor.submit(self._write, line)
+
+    def _write(self, line: str):
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+        except OSError as e:
+            logger.error(f"Failed to record delivery to {self.path}: {e}")
+
+    def close(self):
+        """Write pending deliveries and close the log file"""
+        self._executor.shutdown(wait=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def iter_deliveries(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read deliveries back from a recorder log.
+
+    Args:
+        path: Path to a log written by DeliveryRecorder
+
+    Yields:
+        Dicts with "timestamp", "headers" and raw "body" bytes
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping malformed record on line {line_number} of {path}")
+                continue
+
+            if "b64" in record:
+                body = base64.b64decode(record["b64"])
+            else:
+                body = record.get("b", "").encode("utf-8")
+
+            yield {
+                "timestamp": record.get("t", 0.0),
+                "headers": record.get("h", {}),
+                "body": body,
+            }
@@ -0,0 +1,296 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "main-agent"
+
+# W3C trace context: version-trace_id-parent_id-flags
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: "ContextVar[Optional[Span]]" = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation of a trace, exported when it ends"""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "error")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None):
+        """
+        End the span and export it; later calls do nothing.
+
+        Args:
+            error: Exception that ended the operation, if any
+        """
+        if self.end is not None:
+            return
+        self.end = time.time()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "service": self.tracer.service,
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time": self.start,
+            "duration_ms": round(((self.end or time.time()) - self.start) * 1000, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off"""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def finish(self, error: Optional[BaseException] = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+AnySpan = Union[Span, _NoopSpan]
+
+
+class SpanExporter:
+    """Writes finished spans as JSON lines"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def close(self):
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(open(path, "a", encoding="utf-8"))
+
+    def close(self):
+        with self._lock:
+            self._stream.close()
+
+
+class Tracer:
+    """OpenTelemetry-style spans with W3C ``traceparent`` propagation.
+
+    Without an exporter every call returns the shared no-op span, so
+    instrumented code costs next to nothing while tracing is off. Spans
+    opened with ``span()`` become the current span of the running task,
+    which is the default parent of spans opened inside it.
+    """
+
+    def __init__(self, service: str, exporter: Optional[SpanExporter] = None):
+        self.service = service
+        self.exporter = exporter
+        self.exported = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, parent: Union[AnySpan, str, None] = None, **attributes) -> AnySpan:
+        """
+        Start a span that the caller finishes.
+
+        Args:
+            name: Operation name
+            parent: Parent span or ``traceparent`` header value; defaults to the current span
+            **attributes: Span attributes
+
+        Returns:
+            The span, or the no-op span when tracing is off
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        if parent is None:
+            parent = _current_span.get()
+        if isinstance(parent, str):
+            context = parse_traceparent(parent)
+            trace_id, parent_id = context if context else (os.urandom(16).hex(), None)
+        elif isinstance(parent, Span):
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+        return Span(self, name, trace_id, parent_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, parent: Union[AnySpan, str, None] = None, **attributes) -> Iterator[AnySpan]:
+        """
+        Span around a block, current for the block's duration.
+
+        Args:
+            name: Operation name
+            parent: Parent span or ``traceparent`` header value; defaults to the current span
+            **attributes: Span attributes
+
+        Yields:
+            The span, or the no-op span when tracing is off
+        """
+        span = self.start_span(name, parent, **attributes)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    def current_traceparent(self) -> Optional[str]:
+        """
+        ``traceparent`` of the current span.
+
+        Returns:
+            Header value, or None outside a span or when tracing is off
+        """
+        span = _current_span.get()
+        return span.traceparent if span is not None else None
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """
+        Add the current trace context to outgoing request headers.
+
+        Args:
+            headers: Headers of a request to the agent service
+
+        Returns:
+            The same dict, with ``traceparent`` set when inside a span
+        """
+        traceparent = self.current_traceparent()
+        if traceparent is not None:
+            headers["traceparent"] = traceparent
+        return headers
+
+    def export(self, span: Span):
+        try:
+            self.exporter.export(span)
+            self.exported += 1
+        except Exception as e:
+            logger.warning(f"Could not export span {span.name}: {e}")
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"exporter": settings.tracing_exporter, "exported_spans": self.exported}
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a span per HTTP request, continuing the caller's ``traceparent``"""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with self.tracer.span(
+            f"{scope['method']} {scope['path']}", parent=traceparent,
+            **{"http.method": scope["method"], "http.path": scope["path"]}
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def parse_traceparent(value: Optional[str]):
+    """
+    Parse a W3C ``traceparent`` header.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Tuple of (trace_id, parent span_id), or None if the value is malformed
+    """
+    match = TRACEPARENT_PATTERN.match((value or "").strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+def create_tracer() -> Tracer:
+    """
+    Create the tracer for the configured exporter.
+
+    Returns:
+        Tracer exporting to stdout or TRACING_FILE, or a no-op tracer for "none"
+    """
+    kind = settings.tracing_exporter
+    if kind == "stdout":
+        exporter: Optional[SpanExporter] = SpanExporter(sys.stdout)
+    elif kind == "file":
+        exporter = FileSpanExporter(settings.tracing_file)
+    else:
+        if kind != "none":
+            logger.warning(f"Unknown tracing exporter '{kind}'; tracing is off")
+        exporter = None
+    return Tracer(SERVICE_NAME, exporter)
+
+
+tracer = create_tracer()
@@ -0,0 +1,119 @@
+import asyncio
+
+from app.utils.debounce import EventDebouncer, debounce_key
+
+
+def event(number=7, event_type="issue_comment", action="created", mentions=(), repository="org/repo"):
+    subject = "pull_request" if event_type == "pull_request" else "issue"
+    return {
+        "event_type": event_type,
+        "action": action,
+        "repository": {"full_name": repository},
+        subject: {"number": number},
+        "mentions": list(mentions)
+    }
+
+
+def test_debounce_key_separates_rules_on_the_same_number():
+    assert debounce_key(event()) == ("org/repo", 7, "issue_comment")
+    assert debounce_key(event(event_type="issues")) == ("org/repo", 7, "issues")
+    assert debounce_key(event(event_type="pull_request")) == ("org/repo", 7, "pull_request")
+    assert debounce_key({"event_type": "push", "repository": {"full_name": "org/repo"}}) is None
+
+
+def run(scenario, quiet_period=0.05, max_wait=1.0):
+    dispatched = []
+
+    async def dispatch(window):
+        dispatched.append(window)
+
+    async def main():
+        debouncer = EventDebouncer(dispatch, quiet_period=quiet_period, max_wait=max_wait)
+        await scenario(debouncer)
+        await debouncer.close()
+        return debouncer
+
+    return asyncio.run(main()), dispatched
+
+
+def test_burst_is_dispatched_once_with_the_latest_state():
+    async def scenario(debouncer):
+        debouncer.submit(event(mentions=["@dev"]), "d1")
+        debouncer.submit(event(action="edited", mentions=["@dev", "@ops"]), "d2")
+        assert debouncer.joins_open_window(event())
+        debouncer.submit(event(action="edited"), "d3")
+        await asyncio.sleep(0.2)
+
+    debouncer, dispatched = run(scenario)
+    assert len(dispatched) == 1
+    window = dispatched[0]
+    assert window.count == 3
+    assert window.deliveries == ["d1", "d2", "d3"]
+    assert window.actions == ["created", "edited"]
+    assert window.mentions == ["@dev", "@ops"]
+    assert window.latest["action"] == "edited"
+    assert debouncer.get_stats()["coalesced"] == 2
+
+
+def test_separate_windows_per_key():
+    async def scenario(debouncer):
+        debouncer.submit(event(number=1))
+        debouncer.submit(event(number=2))
+        debouncer.submit(event(number=1, event_type="issues"))
+        assert debouncer.pending == 3
+        await asyncio.sleep(0.2)
+
+    _, dispatched = run(scenario)
+    assert sorted(window.key for window in dispatched) == [
+        ("org/repo", 1, "issue_comment"), ("org/repo", 1, "issues"), ("org/repo", 2, "issue_comment")
+    ]
+
+
+def test_steady_stream_is_flushed_after_max_wait():
+    async def scenario(debouncer):
+        for _ in range(8):
+            debouncer.submit(event())
+            await asyncio.sleep(0.05)
+
+    # Events arrive faster than the quiet period, so only max_wait flushes the window
+    _, dispatched = run(scenario, quiet_period=0.1, max_wait=0.2)
+    assert len(dispatched) >= 2
+    assert sum(window.count for window in dispatched) == 8
+
+
+def test_events_without_a_number_or_with_debouncing_off_dispatch_directly():
+    async def scenario(debouncer):
+        assert debouncer.submit({"event_type": "push", "repository": {"full_name": "org/repo"}}) is None
+        await asyncio.sleep(0)
+
+    _, dispatched = run(scenario)
+    assert len(dispatched) == 1
+
+    async def burst(debouncer):
+        debouncer.submit(event())
+        debouncer.submit(event())
+        await asyncio.sleep(0)
+
+    _, dispatched = run(burst, quiet_period=0, max_wait=0)
+    assert len(dispatched) == 2
+
+
+def test_close_flushes_open_windows_and_survives_dispatch_errors():
+    dispatched = []
+
+    async def dispatch(window):
+        dispatched.append(window.key)
+        if window.key[1] == 1:
+            raise RuntimeError("agent service unavailable")
+
+    async def main():
+        debouncer = EventDebouncer(dispatch, quiet_period=60, max_wait=60)
+        debouncer.submit(event(number=1))
+        debouncer.submit(event(number=2))
+        await debouncer.close()
+        return debouncer
+
+    debouncer = asyncio.run(main())
+    assert sorted(dispatched) == [("org/repo", 1, "issue_comment"), ("org/repo", 2, "issue_comment")]
+    assert debouncer.pending == 0
+    assert debouncer.dispatched == 2
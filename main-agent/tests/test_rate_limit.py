@@ -0,0 +1,39 @@
+import pytest
+
+from app.utils.rate_limit import RateLimiter, TokenBucket, create_limiter, retry_after
+
+
+def test_token_bucket_take_and_refill():
+    bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+    assert bucket.take(0.0) == 0.0
+    assert bucket.take(0.0) == 0.0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0.0
+    assert bucket.take(100.0) == 0.0 and bucket.tokens == 1
+
+
+def test_check_does_not_spend_tokens():
+    limiter = RateLimiter(rate=0.001, burst=1)
+    assert limiter.check("203.0.113.5") == 0.0
+    assert limiter.check("203.0.113.5") == 0.0
+    assert limiter.take("203.0.113.5") == 0.0
+
+    assert limiter.check("203.0.113.5") > 0
+    assert limiter.take("203.0.113.5") > 0
+    assert limiter.limited == 2
+
+
+def test_full_buckets_are_pruned_at_max_keys():
+    limiter = RateLimiter(rate=0.001, burst=1, max_keys=2)
+    limiter.take("spent")
+    limiter.check("idle")
+    limiter.check("new")
+    assert sorted(limiter.buckets) == ["new", "spent"]
+
+
+def test_helpers():
+    assert create_limiter(None, 10) is None
+    assert create_limiter(1.0, 10).burst == 10
+    assert retry_after(0.01) == "1"
+    assert retry_after(1.2) == "2"
+    assert retry_after(1e9) == "3600"
@@ -0,0 +1,44 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routers import webhook
+from app.utils.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(webhook, "client_limiter", RateLimiter(rate=0.001, burst=2))
+    app = FastAPI()
+    app.include_router(webhook.router, prefix="/webhook")
+    return TestClient(app)
+
+
+def deliver(client, signature=None):
+    body = json.dumps({"zen": "Keep it logically awesome."}).encode()
+    if signature is None:
+        digest = hmac.new(settings.github_webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+        signature = f"sha256={digest}"
+    return client.post("/webhook/github", content=body, headers={
+        "X-GitHub-Event": "ping", "X-GitHub-Delivery": "delivery", "X-Hub-Signature-256": signature
+    })
+
+
+def test_valid_deliveries_are_not_charged(client):
+    for _ in range(5):
+        assert deliver(client).status_code == 200
+    assert webhook.client_limiter.limited == 0
+
+
+def test_sender_of_invalid_deliveries_is_refused(client):
+    assert deliver(client, "sha256=forged").status_code == 401
+    assert deliver(client, "sha256=forged").status_code == 401
+
+    response = deliver(client)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
@@ -87,7 +87,8 @@ start_service() {
     export INSTANCE_ID="$INSTANCE"
     
     # Start the service in background
-    nohup python -m app.main > "$LOG_FILE" 2>&1 &
+    # The service writes and rotates its own log; the .out file only catches crashes before logging starts
+    LOG_FILE="$LOG_FILE" nohup python -m app.main > "${LOG_FILE%.log}.out" 2>&1 &
     local pid=$!
     
     # Save PID
@@ -122,9 +123,11 @@ stop_service() {
     
     kill "$pid"
     
-    # Wait for graceful shutdown
+    # Wait for graceful shutdown; the service drains running jobs for DRAIN_TIMEOUT
+    # seconds (default 20) before handing the rest off to the next instance
+    local stop_timeout="${STOP_TIMEOUT:-30}"
     local count=0
-    while [ $count -lt 10 ] && ps -p "$pid" > /dev/null 2>&1; do
+    while [ $count -lt "$stop_timeout" ] && ps -p "$pid" > /dev/null 2>&1; do
         sleep 1
         count=$((count + 1))
     done
@@ -47,7 +47,8 @@ start_service() {
     }
 
     # Start the service in background
-    nohup python -m app.main > "$LOG_FILE" 2>&1 &
+    # The service writes and rotates its own log; the .out file only catches crashes before logging starts
+    LOG_FILE="$LOG_FILE" nohup python -m app.main > "${LOG_FILE%.log}.out" 2>&1 &
     local pid=$!
     
     # Save PID